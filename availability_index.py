@@ -0,0 +1,394 @@
+#!/usr/bin/env python3
+"""
+Booking Availability Index for Rent My Vroom
+Interval-tree reference engine for overlap queries, plus a booking contention benchmark
+"""
+
+import argparse
+import asyncio
+import heapq
+import json
+import random
+import time
+from array import array
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Any, List, Optional, Iterable, Iterator, Set
+
+import aiohttp
+
+from latency_stats import LatencyHistogram, LatencyRecorder
+from load_test import AsyncRentMyVroomAPITester
+from seed_data import COLUMNS
+from token_pool import TokenPool
+
+# Statuses that hold a vehicle, as in VehiclesService.findOne
+BLOCKING_STATUSES = ("PENDING", "ACCEPTED")
+
+
+def to_timestamp(value: Any) -> float:
+    """Epoch seconds for a datetime, ISO string (API JSON) or COPY timestamp"""
+    if isinstance(value, (int, float)):
+        return float(value)
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.timestamp()
+
+
+class _SortedRun:
+    """One static augmented interval tree over half-open [start, end) intervals
+
+    Intervals are kept sorted by start in flat arrays; the tree is implicit
+    (the node for a range is its midpoint) and each node stores the largest
+    end in its subtree, so a query skips every subtree that ends before the
+    window opens and every right subtree that starts after it closes.
+    """
+
+    def __init__(self, rows: List[tuple]):
+        self.starts = array("d", (r[0] for r in rows))
+        self.ends = array("d", (r[1] for r in rows))
+        self.ids = array("q", (r[2] for r in rows))
+        self.max_end = array("d", self.ends)
+        self._augment(0, len(rows))
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+    def rows(self) -> Iterator[tuple]:
+        return zip(self.starts, self.ends, self.ids)
+
+    def _augment(self, lo: int, hi: int) -> float:
+        if lo >= hi:
+            return float("-inf")
+        mid = (lo + hi) // 2
+        best = max(self.ends[mid], self._augment(lo, mid), self._augment(mid + 1, hi))
+        self.max_end[mid] = best
+        return best
+
+    def overlapping(self, start: float, end: float, found: List[int], removed: Set[int],
+                    first_only: bool) -> bool:
+        """Append live ids overlapping [start, end) to found; True once first_only is met"""
+        starts, ends, ids, max_end = self.starts, self.ends, self.ids, self.max_end
+        stack = [(0, len(starts))]
+        while stack:
+            lo, hi = stack.pop()
+            if lo >= hi:
+                continue
+            mid = (lo + hi) // 2
+            if max_end[mid] <= start:
+                continue  # everything below ends before the window opens
+            if starts[mid] < end:
+                if ends[mid] > start and ids[mid] not in removed:
+                    found.append(ids[mid])
+                    if first_only:
+                        return True
+                stack.append((mid + 1, hi))
+            stack.append((lo, mid))
+        return False
+
+
+class IntervalTree:
+    """Dynamic interval tree built from static sorted runs (the logarithmic method)
+
+    Inserts go to a small unsorted buffer. Every REBUILD_AFTER inserts the
+    buffer is sorted into a run and merged with any existing runs no larger
+    than it, so run sizes at least double from newest to oldest: a bulk-loaded
+    500k-booking tree is not touched by a handful of inserts, each interval
+    is merged O(log n) times over its life, and a query visits O(log n) runs.
+    Removals are tombstones, dropped when their run is next merged.
+    """
+
+    REBUILD_AFTER = 64
+
+    def __init__(self, intervals: Iterable[tuple] = ()):
+        self.pending: List[tuple] = []
+        self.removed: Set[int] = set()
+        rows = sorted(intervals)
+        self.runs: List[_SortedRun] = [_SortedRun(rows)] if rows else []
+
+    def __len__(self) -> int:
+        return sum(len(run) for run in self.runs) + len(self.pending) - len(self.removed)
+
+    def add(self, start: float, end: float, interval_id: int):
+        if interval_id in self.removed:
+            self._compact()  # purge the old copy so the tombstone cannot hide the new one
+        self.pending.append((start, end, interval_id))
+        if len(self.pending) >= self.REBUILD_AFTER:
+            self._flush()
+
+    def remove(self, interval_id: int):
+        """Drop a stored interval by id (the caller tracks which ids are stored)"""
+        for n, row in enumerate(self.pending):
+            if row[2] == interval_id:
+                del self.pending[n]
+                return
+        self.removed.add(interval_id)
+        if len(self.removed) * 2 > len(self):
+            self._compact()
+
+    def _live(self, rows: Iterable[tuple]) -> Iterator[tuple]:
+        removed = self.removed
+        for row in rows:
+            if row[2] in removed:
+                removed.discard(row[2])
+            else:
+                yield row
+
+    def _flush(self):
+        rows = sorted(self.pending)
+        self.pending = []
+        while self.runs and len(self.runs[-1]) <= 2 * len(rows):
+            rows = list(self._live(heapq.merge(self.runs.pop().rows(), rows)))
+        if rows:
+            self.runs.append(_SortedRun(rows))
+
+    def _compact(self):
+        """Fold the buffer and every run into a single run without tombstones"""
+        rows = list(self._live(heapq.merge(*(run.rows() for run in self.runs),
+                                           sorted(self.pending))))
+        self.pending = []
+        self.runs = [_SortedRun(rows)] if rows else []
+
+    def bounds(self) -> Optional[tuple]:
+        """(earliest start, latest end) over every stored interval, or None when empty"""
+        starts = [run.starts[0] for run in self.runs] + [r[0] for r in self.pending]
+        ends = [run.max_end[len(run) // 2] for run in self.runs] + \
+            [r[1] for r in self.pending]
+        return (min(starts), max(ends)) if starts else None
+
+    def overlapping(self, start: float, end: float, first_only: bool = False) -> List[int]:
+        """Ids of intervals overlapping [start, end)"""
+        found = [i for s, e, i in self.pending if s < end and e > start]
+        if found and first_only:
+            return found[:1]
+        for run in reversed(self.runs):
+            if run.overlapping(start, end, found, self.removed, first_only):
+                break
+        return found
+
+
+class AvailabilityIndex:
+    """Blocking bookings indexed per vehicle and across the whole fleet"""
+
+    def __init__(self, vehicle_ids: Iterable[int] = ()):
+        self.vehicle_ids: Set[int] = set(vehicle_ids)
+        self.by_vehicle: Dict[int, IntervalTree] = {}
+        self.fleet = IntervalTree()
+        self.booking_vehicle: Dict[int, int] = {}
+
+    @classmethod
+    def from_bookings(cls, bookings: Iterable[Dict[str, Any]],
+                      vehicle_ids: Iterable[int] = ()) -> "AvailabilityIndex":
+        """Build in one pass from booking dicts (id, vehicleId, startDate, endDate, status)"""
+        index = cls(vehicle_ids)
+        per_vehicle: Dict[int, List[tuple]] = {}
+        fleet = []
+        for booking in bookings:
+            index.vehicle_ids.add(booking["vehicleId"])
+            if booking.get("status", "PENDING") not in BLOCKING_STATUSES:
+                continue
+            row = (to_timestamp(booking["startDate"]), to_timestamp(booking["endDate"]),
+                   booking["id"])
+            per_vehicle.setdefault(booking["vehicleId"], []).append(row)
+            fleet.append(row)
+            index.booking_vehicle[booking["id"]] = booking["vehicleId"]
+        index.by_vehicle = {vid: IntervalTree(rows) for vid, rows in per_vehicle.items()}
+        index.fleet = IntervalTree(fleet)
+        return index
+
+    def add(self, booking: Dict[str, Any]):
+        """Index a new booking, or apply a status change to one already seen
+
+        A booking that leaves PENDING/ACCEPTED (rejected, cancelled,
+        completed) is dropped so it stops blocking its slot.
+        """
+        vehicle_id = booking["vehicleId"]
+        self.vehicle_ids.add(vehicle_id)
+        if booking.get("status", "PENDING") not in BLOCKING_STATUSES:
+            self.remove(booking["id"])
+            return
+        if booking["id"] in self.booking_vehicle:
+            return
+        start, end = to_timestamp(booking["startDate"]), to_timestamp(booking["endDate"])
+        self.by_vehicle.setdefault(vehicle_id, IntervalTree()).add(start, end, booking["id"])
+        self.fleet.add(start, end, booking["id"])
+        self.booking_vehicle[booking["id"]] = vehicle_id
+
+    def remove(self, booking_id: int):
+        """Stop a booking blocking its vehicle; unknown ids are ignored"""
+        vehicle_id = self.booking_vehicle.pop(booking_id, None)
+        if vehicle_id is None:
+            return
+        self.by_vehicle[vehicle_id].remove(booking_id)
+        self.fleet.remove(booking_id)
+
+    def conflicts(self, vehicle_id: int, start: Any, end: Any) -> List[int]:
+        """Blocking booking ids a new request for vehicle_id over [start, end) would overlap"""
+        tree = self.by_vehicle.get(vehicle_id)
+        if tree is None:
+            return []
+        return tree.overlapping(to_timestamp(start), to_timestamp(end))
+
+    def is_free(self, vehicle_id: int, start: Any, end: Any) -> bool:
+        tree = self.by_vehicle.get(vehicle_id)
+        return tree is None or not tree.overlapping(to_timestamp(start), to_timestamp(end),
+                                                    first_only=True)
+
+    def free_vehicles(self, start: Any, end: Any,
+                      candidates: Optional[Iterable[int]] = None) -> Set[int]:
+        """Vehicles with no blocking booking in [start, end)
+
+        With a candidate list (say, one page of search results) each vehicle
+        is probed on its own tree; otherwise one fleet-wide query finds the
+        busy set, costing O(log n + bookings overlapping the window).
+        """
+        if candidates is not None:
+            return {vid for vid in candidates if self.is_free(vid, start, end)}
+        busy = {self.booking_vehicle[bid] for bid in
+                self.fleet.overlapping(to_timestamp(start), to_timestamp(end))}
+        return self.vehicle_ids - busy
+
+
+def load_booking_dump(path: str) -> Iterator[Dict[str, Any]]:
+    """Bookings from a seed_data.py Booking.copy file or a JSON array of API bookings"""
+    if path.endswith(".copy"):
+        columns = COLUMNS["Booking"]
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                row = dict(zip(columns, line.rstrip("\n").split("\t")))
+                yield {"id": int(row["id"]), "vehicleId": int(row["vehicleId"]),
+                       "startDate": row["startDate"], "endDate": row["endDate"],
+                       "status": row["status"]}
+    else:
+        with open(path, encoding="utf-8") as f:
+            yield from json.load(f)
+
+
+def benchmark_index(path: str, queries: int = 10_000, seed: int = 42):
+    """Build from a dump, then time conflict and free-vehicle queries"""
+    started = time.perf_counter()
+    index = AvailabilityIndex.from_bookings(load_booking_dump(path))
+    build = time.perf_counter() - started
+    print(f"Indexed {len(index.fleet):,} blocking bookings over "
+          f"{len(index.vehicle_ids):,} vehicles in {build:.2f}s")
+
+    rng = random.Random(seed)
+    vehicles = sorted(index.vehicle_ids)
+    lo, hi = index.fleet.bounds() or (0, 86400)
+    conflict_times = LatencyHistogram()
+    free_times = LatencyHistogram()
+    for n in range(queries):
+        start = rng.uniform(lo, hi)
+        end = start + rng.choice([3600 * 4, 86400, 86400 * 3, 86400 * 7])
+        t0 = time.perf_counter()
+        index.conflicts(rng.choice(vehicles), start, end)
+        conflict_times.record(int((time.perf_counter() - t0) * 1_000_000))
+        if n % 100 == 0:
+            t0 = time.perf_counter()
+            index.free_vehicles(start, end)
+            free_times.record(int((time.perf_counter() - t0) * 1_000_000))
+
+    for name, h in (("conflicts for request", conflict_times),
+                    ("free vehicles in window", free_times)):
+        print(f"{name:<24} n={h.count:<6} p50 {h.percentile(50)}µs  "
+              f"p99 {h.percentile(99)}µs  max {h.max}µs")
+
+
+async def benchmark_contention(base_url: str, pool_path: str, renters: int = 50,
+                               rounds: int = 5) -> Dict[str, Any]:
+    """Fire concurrent, fully overlapping POST /bookings for one vehicle per round
+
+    With an overlap guard in BookingsService.create exactly one request per
+    round should win; every extra 2xx is a double booking.
+    """
+    pool = TokenPool(pool_path, base_url)
+    recorder = LatencyRecorder()
+    outcomes: Dict[int, int] = {}
+    double_bookings = 0
+
+    connector = aiohttp.TCPConnector(limit=renters * 2, limit_per_host=0)
+    async with aiohttp.ClientSession(connector=connector) as session:
+        merchant = AsyncRentMyVroomAPITester(session, 0, base_url, recorder=recorder,
+                                             token_pool=pool)
+        await merchant.lease_pool_users()
+        clients = []
+        for i in range(renters):
+            client = AsyncRentMyVroomAPITester(session, i, base_url, recorder=recorder,
+                                               token_pool=pool)
+            await client.lease_pool_users()
+            clients.append(client)
+
+        for round_no in range(rounds):
+            response = await merchant.make_request("POST", "/vehicles", {
+                "make": "Honda", "model": "Civic", "year": 2023, "color": "Blue",
+                "licensePlate": f"CT{merchant.run_tag}-{round_no}",
+                "pricePerHour": 15, "pricePerDay": 100, "seats": 5, "fuelType": "Petrol",
+                "transmission": "Manual",
+            }, token=merchant.tokens["merchant"])
+            if response is None or response.status_code not in (200, 201):
+                print(f"❌ Could not create contention vehicle for round {round_no}")
+                continue
+            vehicle_id = response.json()["id"]
+            start = datetime.now() + timedelta(days=30 + round_no)
+            booking = {"vehicleId": vehicle_id, "startDate": start.isoformat(),
+                       "endDate": (start + timedelta(days=2)).isoformat(),
+                       "renterNotes": "Contention benchmark"}
+
+            responses = await asyncio.gather(*(
+                client.make_request("POST", "/bookings", booking, token=client.tokens["renter"])
+                for client in clients))
+            winners = 0
+            for response in responses:
+                status = response.status_code if response is not None else 0
+                outcomes[status] = outcomes.get(status, 0) + 1
+                winners += status in (200, 201)
+            double_bookings += max(0, winners - 1)
+
+    pool.save()
+    return {"recorder": recorder, "outcomes": outcomes, "double_bookings": double_bookings,
+            "rounds": rounds, "renters": renters}
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Booking availability index and contention benchmark")
+    sub = parser.add_subparsers(dest="command", required=True)
+    index_cmd = sub.add_parser("index", help="benchmark the interval-tree index on a booking dump")
+    index_cmd.add_argument("dump", help="Booking.copy from seed_data.py or a JSON array of bookings")
+    index_cmd.add_argument("--queries", type=int, default=10_000)
+    index_cmd.add_argument("--seed", type=int, default=42)
+    contention = sub.add_parser("contention", help="concurrent conflicting POST /bookings")
+    contention.add_argument("--base-url", default="http://localhost:4000")
+    contention.add_argument("--token-pool", default="token_pool.json",
+                            help="pool with at least --renters approved renters and merchants")
+    contention.add_argument("--renters", type=int, default=50, help="concurrent requests per round")
+    contention.add_argument("--rounds", type=int, default=5)
+    args = parser.parse_args()
+
+    if args.command == "index":
+        benchmark_index(args.dump, args.queries, args.seed)
+        return
+
+    capacity = TokenPool(args.token_pool, args.base_url).capacity()
+    if args.renters > capacity:
+        parser.error(f"--renters {args.renters} exceeds the token pool's {capacity} "
+                     f"renter/merchant pairs; top it up with token_pool.py")
+
+    print("🚀 Starting booking contention benchmark")
+    started = time.perf_counter()
+    results = asyncio.run(benchmark_contention(args.base_url, args.token_pool,
+                                               args.renters, args.rounds))
+    print("\n" + "=" * 60)
+    print("🏁 CONTENTION SUMMARY")
+    print("=" * 60)
+    print(f"Rounds: {results['rounds']} x {results['renters']} overlapping requests")
+    for status, count in sorted(results["outcomes"].items()):
+        print(f"   HTTP {status or 'no response'}: {count}")
+    status = "✅" if results["double_bookings"] == 0 else "❌"
+    print(f"{status} Double bookings: {results['double_bookings']}")
+    results["recorder"].print_report(time.perf_counter() - started)
+
+
+if __name__ == "__main__":
+    main()
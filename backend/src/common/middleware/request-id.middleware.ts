@@ -0,0 +1,17 @@
+import { Injectable, NestMiddleware } from "@nestjs/common";
+import { randomUUID } from "crypto";
+import { NextFunction, Request, Response } from "express";
+import { requestContext } from "../request-context";
+
+export const REQUEST_ID_HEADER = "x-request-id";
+
+@Injectable()
+export class RequestIdMiddleware implements NestMiddleware {
+  use(req: Request, res: Response, next: NextFunction) {
+    const header = req.headers[REQUEST_ID_HEADER];
+    const requestId = (Array.isArray(header) ? header[0] : header) || randomUUID();
+
+    res.setHeader(REQUEST_ID_HEADER, requestId);
+    requestContext.run({ requestId }, next);
+  }
+}
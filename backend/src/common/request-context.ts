@@ -0,0 +1,8 @@
+import { AsyncLocalStorage } from "async_hooks";
+
+export interface RequestContext {
+  requestId: string;
+}
+
+// Carries the current request's ID through guards, services and Prisma calls
+export const requestContext = new AsyncLocalStorage<RequestContext>();
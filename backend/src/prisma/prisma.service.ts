@@ -1,11 +1,42 @@
 import { Injectable, OnModuleInit, OnModuleDestroy } from "@nestjs/common";
 import { PrismaClient } from "@prisma/client";
+import { createWriteStream } from "fs";
+import { performance } from "perf_hooks";
+import { requestContext } from "../common/request-context";
 
 @Injectable()
 export class PrismaService
   extends PrismaClient
   implements OnModuleInit, OnModuleDestroy
 {
+  constructor() {
+    super();
+
+    // Profiling: one JSON line per Prisma operation, tagged with the request
+    // that issued it (see query_profile.py)
+    const queryLogFile = process.env.QUERY_LOG_FILE;
+    if (queryLogFile) {
+      const queryLog = createWriteStream(queryLogFile, { flags: "a" });
+      this.$use(async (params, next) => {
+        const startedAt = Date.now();
+        const started = performance.now();
+        try {
+          return await next(params);
+        } finally {
+          queryLog.write(
+            JSON.stringify({
+              requestId: requestContext.getStore()?.requestId ?? null,
+              model: params.model,
+              action: params.action,
+              timestamp: new Date(startedAt).toISOString(),
+              durationMs: Number((performance.now() - started).toFixed(3)),
+            }) + "\n",
+          );
+        }
+      });
+    }
+  }
+
   async onModuleInit() {
     await this.$connect();
   }
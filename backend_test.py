@@ -7,10 +7,14 @@ Tests all authentication, user management, vehicle, booking, messaging, and revi
 import requests
 import json
 import base64
+import os
 import time
 from datetime import datetime, timedelta
 from typing import Dict, Any, Optional
 
+from latency_stats import LatencyRecorder
+from query_profile import REQUEST_ID_HEADER
+
 class RentMyVroomAPITester:
     def __init__(self, base_url: str = "http://localhost:4000"):
         self.base_url = base_url
@@ -20,10 +24,15 @@ class RentMyVroomAPITester:
         self.vehicle_ids = []
         self.booking_ids = []
         self.merchant_ids = []
+        self.recorder = LatencyRecorder()
         
         # Test data with unique timestamps to avoid conflicts
         import time
         timestamp = str(int(time.time()))
+        # Prefix of every X-Request-Id this tester sends; the pid keeps testers
+        # started in the same second apart
+        self.run_tag = f"{timestamp}p{os.getpid()}"
+        self.request_count = 0
         
         self.renter_data = {
             "email": f"renter{timestamp}@example.com",
@@ -65,7 +74,10 @@ class RentMyVroomAPITester:
             request_headers.update(headers)
         if token:
             request_headers["Authorization"] = f"Bearer {token}"
+        self.request_count += 1
+        request_headers[REQUEST_ID_HEADER] = f"{self.run_tag}-{self.request_count}"
             
+        started = time.perf_counter()
         try:
             if method.upper() == "GET":
                 response = self.session.get(url, headers=request_headers)
@@ -80,9 +92,13 @@ class RentMyVroomAPITester:
             else:
                 raise ValueError(f"Unsupported HTTP method: {method}")
                 
+            self.recorder.record(method, endpoint, response.status_code,
+                                 time.perf_counter() - started,
+                                 len(response.request.body or b""), len(response.content))
             return response
         except requests.exceptions.RequestException as e:
             print(f"Request failed: {e}")
+            self.recorder.record(method, endpoint, None, time.perf_counter() - started)
             return None
 
     def test_basic_connectivity(self):
@@ -485,6 +501,7 @@ class RentMyVroomAPITester:
         
         # Track overall results
         test_results = {}
+        started = time.perf_counter()
         
         # Run all test categories
         test_results['connectivity'] = self.test_basic_connectivity()
@@ -516,6 +533,8 @@ class RentMyVroomAPITester:
         else:
             print("⚠️  Some tests failed. Check individual test results above.")
         
+        self.recorder.print_report(time.perf_counter() - started)
+        
         return test_results
 
 if __name__ == "__main__":
@@ -0,0 +1,327 @@
+#!/usr/bin/env python3
+"""
+Chat Throughput Benchmark for Rent My Vroom NestJS Application
+Simulates many active booking threads whose participants send and poll like the mobile app
+"""
+
+import argparse
+import asyncio
+import random
+import time
+from datetime import datetime, timedelta
+from typing import Dict, Any, List, Optional
+
+import aiohttp
+
+from latency_stats import LatencyRecorder
+from load_test import AsyncRentMyVroomAPITester
+from token_pool import TokenPool
+
+# Upper bounds of the thread-length buckets poll latency is reported in
+LENGTH_BUCKETS = [10, 100, 1_000, 10_000]
+
+PARTICIPANTS = ("renter", "merchant")
+
+
+def length_bucket(length: int) -> str:
+    for bound in LENGTH_BUCKETS:
+        if length <= bound:
+            return f"poll ≤{bound:,} msgs"
+    return f"poll >{LENGTH_BUCKETS[-1]:,} msgs"
+
+
+class ReadReceiptStats:
+    """What each GET /messages/:bookingId costs against what it delivers
+
+    Every poll runs one UPDATE for read receipts and returns the whole
+    thread. The response is serialized before the update, so messages
+    addressed to the poller that still show isRead=false are exactly the
+    rows that poll's UPDATE flips.
+    """
+
+    def __init__(self):
+        self.polls = 0
+        self.rows_returned = 0
+        self.rows_new = 0
+        self.rows_flipped = 0
+        self.idle_polls = 0
+        self.bytes_returned = 0
+
+    def record(self, returned: int, new: int, flipped: int, size: int):
+        self.polls += 1
+        self.rows_returned += returned
+        self.rows_new += new
+        self.rows_flipped += flipped
+        self.idle_polls += flipped == 0
+        self.bytes_returned += size
+
+
+class ChatThread:
+    """One booking and the client holding both participants' tokens"""
+
+    def __init__(self, client: AsyncRentMyVroomAPITester, booking_id: int):
+        self.client = client
+        self.booking_id = booking_id
+        self.length = 0
+        self.last_seen = {role: 0 for role in PARTICIPANTS}
+
+
+class ChatBenchmark:
+    """Builds booking threads from a token pool and drives chat traffic on them
+
+    Two phases: a ladder of threads prefilled to fixed lengths, polled to
+    show how poll latency grows with thread length, then `threads` live
+    threads where both participants send every `send_interval` seconds and
+    poll every `poll_interval` seconds (both exponentially jittered).
+    """
+
+    def __init__(self, token_pool: TokenPool, base_url: str = "http://localhost:4000",
+                 threads: int = 1_000, duration: float = 60.0, send_interval: float = 20.0,
+                 poll_interval: float = 3.0, lengths: Optional[List[int]] = None,
+                 ladder_polls: int = 20, connections: int = 500, setup_concurrency: int = 50,
+                 backend_dir: str = "/app/backend", seed: Optional[int] = None):
+        self.token_pool = token_pool
+        self.base_url = base_url
+        self.threads = threads
+        self.duration = duration
+        self.send_interval = send_interval
+        self.poll_interval = poll_interval
+        self.lengths = lengths if lengths is not None else [10, 100, 1_000, 10_000]
+        self.ladder_polls = ladder_polls
+        self.connections = connections
+        self.setup_concurrency = setup_concurrency
+        self.backend_dir = backend_dir
+        self.rng = random.Random(seed)
+
+        self.setup_recorder = LatencyRecorder()
+        self.recorder = LatencyRecorder()
+        self.length_recorder = LatencyRecorder()
+        self.ladder_recorder = LatencyRecorder()
+        self.receipts = ReadReceiptStats()
+        self.sent = 0
+        self.setup_failures = 0
+
+    async def _create_thread(self, session: aiohttp.ClientSession, index: int,
+                             semaphore: asyncio.Semaphore) -> Optional[ChatThread]:
+        async with semaphore:
+            client = AsyncRentMyVroomAPITester(session, index, self.base_url,
+                                               recorder=self.setup_recorder,
+                                               token_pool=self.token_pool)
+            await client.lease_pool_users()
+            response = await client.make_request("POST", "/vehicles", {
+                "make": "Toyota", "model": "Corolla", "year": 2022, "color": "White",
+                "licensePlate": f"CH{client.run_tag}", "pricePerHour": 12, "pricePerDay": 80,
+                "seats": 5, "fuelType": "Petrol", "transmission": "Automatic",
+            }, token=client.tokens["merchant"])
+            if not client._check("Chat Vehicle", response, [200, 201]):
+                return None
+            start = datetime.now() + timedelta(days=30)
+            response = await client.make_request("POST", "/bookings", {
+                "vehicleId": response.json()["id"], "startDate": start.isoformat(),
+                "endDate": (start + timedelta(days=2)).isoformat(),
+                "renterNotes": "Chat benchmark",
+            }, token=client.tokens["renter"])
+            if not client._check("Chat Booking", response, [200, 201]):
+                return None
+            client.recorder = self.recorder
+            return ChatThread(client, response.json()["id"])
+
+    async def _create_threads(self, session: aiohttp.ClientSession, count: int,
+                              first_index: int) -> List[ChatThread]:
+        semaphore = asyncio.Semaphore(self.setup_concurrency)
+        created = await asyncio.gather(*(self._create_thread(session, first_index + i, semaphore)
+                                         for i in range(count)))
+        threads = [thread for thread in created if thread is not None]
+        self.setup_failures += count - len(threads)
+        return threads
+
+    async def _prefill(self, thread: ChatThread, length: int) -> bool:
+        """Insert `length` alternating messages straight into the database
+
+        Posting 10k messages through the API per ladder thread would turn
+        the setup into the benchmark; one INSERT ... generate_series is instant.
+        """
+        renter, merchant = thread.client.user_ids["renter"], thread.client.user_ids["merchant"]
+        sql = (f'INSERT INTO "Message" ("bookingId", "senderId", "receiverId", "content", '
+               f'"isRead", "createdAt") '
+               f"SELECT {thread.booking_id}, "
+               f"CASE WHEN g % 2 = 0 THEN {renter} ELSE {merchant} END, "
+               f"CASE WHEN g % 2 = 0 THEN {merchant} ELSE {renter} END, "
+               f"'Prefilled chat message ' || g, false, "
+               f"NOW() - ({length} - g) * INTERVAL '1 second' "
+               f"FROM generate_series(1, {length}) AS g;")
+        try:
+            process = await asyncio.create_subprocess_exec(
+                "npx", "prisma", "db", "execute", "--stdin", cwd=self.backend_dir,
+                stdin=asyncio.subprocess.PIPE, stdout=asyncio.subprocess.DEVNULL,
+                stderr=asyncio.subprocess.DEVNULL)
+        except OSError:
+            return False
+        await process.communicate(sql.encode())
+        thread.length = length
+        return process.returncode == 0
+
+    async def _poll(self, thread: ChatThread, role: str,
+                    recorder: LatencyRecorder) -> Optional[float]:
+        """One GET of the thread; returns its latency in seconds, None on failure"""
+        client = thread.client
+        started = time.perf_counter()
+        response = await client.make_request("GET", f"/messages/{thread.booking_id}",
+                                             token=client.tokens[role])
+        elapsed = time.perf_counter() - started
+        if response is None or response.status_code != 200:
+            client.log_test("Chat Poll", False,
+                            f"Status: {response.status_code if response is not None else 'No response'}")
+            return None
+
+        messages = response.json()
+        user_id = client.user_ids[role]
+        last_seen = thread.last_seen[role]
+        new = flipped = 0
+        for message in messages:
+            if message["id"] > last_seen:
+                new += 1
+            if message["receiverId"] == user_id and not message["isRead"]:
+                flipped += 1
+        if messages:
+            thread.last_seen[role] = max(last_seen, messages[-1]["id"])
+        thread.length = len(messages)
+        self.receipts.record(len(messages), new, flipped, len(response.content))
+        recorder.record_route(length_bucket(len(messages)), response.status_code,
+                              int(elapsed * 1_000_000), 0, len(response.content))
+        return elapsed
+
+    async def run_ladder(self, session: aiohttp.ClientSession):
+        """Poll threads of fixed length; the first poll also flips half the thread to read"""
+        threads = await self._create_threads(session, len(self.lengths), self.threads)
+        for thread, length in zip(threads, self.lengths):
+            # Keep ladder polls out of the live-thread latency report
+            thread.client.recorder = self.setup_recorder
+            if not await self._prefill(thread, length):
+                print(f"❌ Could not prefill a {length}-message thread "
+                      f"(needs npx prisma in {self.backend_dir})")
+                continue
+            for poll in range(self.ladder_polls):
+                label = "first poll" if poll == 0 else "repeat poll"
+                polled = await self._poll(thread, "renter", self.length_recorder)
+                if polled is None:
+                    break
+                self.ladder_recorder.record_route(f"{length:>6,} msgs {label}", 200,
+                                                  int(polled * 1_000_000))
+
+    async def _participant(self, thread: ChatThread, role: str, deadline: float):
+        client = thread.client
+        now = time.perf_counter()
+        next_send = now + self.rng.expovariate(1.0 / self.send_interval)
+        next_poll = now + self.rng.uniform(0, self.poll_interval)
+        while True:
+            wake = min(next_send, next_poll)
+            if wake >= deadline:
+                return
+            await asyncio.sleep(max(0.0, wake - time.perf_counter()))
+            await client.refresh_tokens()
+            if next_send <= next_poll:
+                response = await client.make_request(
+                    "POST", f"/messages/{thread.booking_id}",
+                    {"content": f"{role} message {self.sent}"}, token=client.tokens[role])
+                if client._check("Chat Send", response, [200, 201]):
+                    self.sent += 1
+                next_send = time.perf_counter() + self.rng.expovariate(1.0 / self.send_interval)
+            else:
+                await self._poll(thread, role, self.length_recorder)
+                next_poll = time.perf_counter() + self.rng.expovariate(1.0 / self.poll_interval)
+
+    async def run(self) -> Dict[str, Any]:
+        connector = aiohttp.TCPConnector(limit=self.connections, limit_per_host=0)
+        timeout = aiohttp.ClientTimeout(total=120)
+        async with aiohttp.ClientSession(connector=connector, timeout=timeout) as session:
+            print(f"🔧 Creating {self.threads} booking threads...")
+            threads = await self._create_threads(session, self.threads, 0)
+            if self.lengths:
+                print(f"🪜 Polling prefilled threads of {', '.join(map(str, self.lengths))} messages...")
+                await self.run_ladder(session)
+
+            print(f"💬 Chatting on {len(threads)} threads for {self.duration:.0f}s...")
+            started = time.perf_counter()
+            deadline = started + self.duration
+            await asyncio.gather(*(self._participant(thread, role, deadline)
+                                   for thread in threads for role in PARTICIPANTS))
+            elapsed = time.perf_counter() - started
+
+        self.token_pool.save()
+        failures = {}
+        for thread in threads:
+            for name, count in thread.client.failures.items():
+                failures[name] = failures.get(name, 0) + count
+        return {"threads": len(threads), "elapsed": elapsed, "failures": failures}
+
+    def print_summary(self, results: Dict[str, Any]):
+        print("\n" + "=" * 60)
+        print("🏁 CHAT BENCHMARK SUMMARY")
+        print("=" * 60)
+        print(f"Active threads:  {results['threads']} ({self.setup_failures} failed setup)")
+        print(f"Messages sent:   {self.sent} ({self.sent / results['elapsed']:.1f}/s)")
+        for name, count in sorted(results["failures"].items()):
+            print(f"   ❌ {name}: {count}")
+
+        receipts = self.receipts
+        if receipts.polls:
+            print("\nRead receipts (one UPDATE per poll):")
+            print(f"   Polls / UPDATE statements: {receipts.polls}")
+            print(f"   Rows flipped to read:      {receipts.rows_flipped}")
+            print(f"   Polls that flipped nothing: {receipts.idle_polls} "
+                  f"({100 * receipts.idle_polls / receipts.polls:.1f}%)")
+            per_flip = receipts.polls / receipts.rows_flipped if receipts.rows_flipped else float("inf")
+            print(f"   UPDATE statements per row actually flipped: {per_flip:.2f}")
+            per_new = receipts.rows_returned / receipts.rows_new if receipts.rows_new else float("inf")
+            print(f"   Rows returned per new message: {per_new:.1f} "
+                  f"({receipts.bytes_returned / max(1, receipts.rows_new) / 1024:.1f} KB per new message)")
+
+        print("\nSend and poll latency (live threads):")
+        self.recorder.print_report(results["elapsed"])
+        print("\nPoll latency by thread length:")
+        self.length_recorder.print_report(results["elapsed"])
+        if self.ladder_recorder.endpoints:
+            print("\nPrefilled thread ladder (renter polls):")
+            self.ladder_recorder.print_report(results["elapsed"])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rent My Vroom chat throughput benchmark")
+    parser.add_argument("--base-url", default="http://localhost:4000")
+    parser.add_argument("--token-pool", default="token_pool.json",
+                        help="approved renters and merchants (see token_pool.py)")
+    parser.add_argument("--threads", type=int, default=1_000, help="active booking threads")
+    parser.add_argument("--duration", type=float, default=60.0, help="seconds of live chat")
+    parser.add_argument("--send-interval", type=float, default=20.0,
+                        help="mean seconds between messages per participant")
+    parser.add_argument("--poll-interval", type=float, default=3.0,
+                        help="mean seconds between polls per participant")
+    parser.add_argument("--lengths", default="10,100,1000,10000",
+                        help="prefilled ladder thread lengths ('' to skip the ladder)")
+    parser.add_argument("--ladder-polls", type=int, default=20, help="polls per ladder thread")
+    parser.add_argument("--connections", type=int, default=500, help="HTTP connection pool size")
+    parser.add_argument("--backend-dir", default="/app/backend",
+                        help="backend checkout used for prisma db execute")
+    parser.add_argument("--seed", type=int)
+    args = parser.parse_args()
+
+    lengths = [int(length) for length in args.lengths.split(",") if length]
+    pool = TokenPool(args.token_pool, args.base_url)
+    # Every live and ladder thread holds a renter/merchant pair of its own
+    if args.threads + len(lengths) > pool.capacity():
+        parser.error(f"--threads {args.threads} plus {len(lengths)} ladder threads exceeds the "
+                     f"token pool's {pool.capacity()} renter/merchant pairs; "
+                     f"top it up with token_pool.py")
+    benchmark = ChatBenchmark(pool, args.base_url,
+                              args.threads, args.duration, args.send_interval,
+                              args.poll_interval, lengths, args.ladder_polls,
+                              args.connections, backend_dir=args.backend_dir, seed=args.seed)
+    print("🚀 Starting Rent My Vroom Chat Benchmark")
+    print("=" * 60)
+    results = asyncio.run(benchmark.run())
+    benchmark.print_summary(results)
+
+
+if __name__ == "__main__":
+    main()
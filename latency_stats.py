@@ -0,0 +1,194 @@
+#!/usr/bin/env python3
+"""
+Latency Statistics for the Rent My Vroom API Testers
+Streaming per-endpoint latency histograms and percentile reports
+"""
+
+import re
+from array import array
+from typing import Dict, Optional
+
+# Numeric path segments are ids: /messages/42 -> /messages/:id
+_ID_SEGMENT = re.compile(r"/\d+(?=/|$)")
+
+
+def route_template(method: str, endpoint: str) -> str:
+    """Key a concrete request by method plus route template"""
+    path = endpoint.split("?", 1)[0]
+    return f"{method.upper()} {_ID_SEGMENT.sub('/:id', path)}"
+
+
+class LatencyHistogram:
+    """HDR-style log-linear histogram of integer microsecond latencies
+
+    Values below 2**SUB_BUCKET_BITS are counted exactly; above that each
+    power-of-two range is split into 2**(SUB_BUCKET_BITS - 1) linear buckets,
+    so every recorded value is kept within ~1.6% relative error whatever its
+    magnitude. An hour-long max needs under 2k counters.
+    """
+
+    SUB_BUCKET_BITS = 7
+    SUB_BUCKETS = 1 << SUB_BUCKET_BITS
+    HALF = SUB_BUCKETS >> 1
+
+    def __init__(self):
+        self.counts = array("Q")
+        self.count = 0
+        self.total = 0
+        self.min = None
+        self.max = 0
+
+    @classmethod
+    def _index(cls, value: int) -> int:
+        if value < cls.SUB_BUCKETS:
+            return value
+        shift = value.bit_length() - cls.SUB_BUCKET_BITS
+        return cls.SUB_BUCKETS + (shift - 1) * cls.HALF + ((value >> shift) - cls.HALF)
+
+    @classmethod
+    def _bounds(cls, index: int):
+        if index < cls.SUB_BUCKETS:
+            return index, index
+        shift = (index - cls.SUB_BUCKETS) // cls.HALF + 1
+        mantissa = (index - cls.SUB_BUCKETS) % cls.HALF + cls.HALF
+        return mantissa << shift, ((mantissa + 1) << shift) - 1
+
+    def record(self, value_us: int, count: int = 1):
+        """Add count samples of value_us microseconds"""
+        value_us = max(0, int(value_us))
+        index = self._index(value_us)
+        if index >= len(self.counts):
+            self.counts.extend([0] * (index + 1 - len(self.counts)))
+        self.counts[index] += count
+        self.count += count
+        self.total += value_us * count
+        if self.min is None or value_us < self.min:
+            self.min = value_us
+        if value_us > self.max:
+            self.max = value_us
+
+    def merge(self, other: "LatencyHistogram"):
+        """Fold another histogram's samples into this one"""
+        if len(other.counts) > len(self.counts):
+            self.counts.extend([0] * (len(other.counts) - len(self.counts)))
+        for index, count in enumerate(other.counts):
+            if count:
+                self.counts[index] += count
+        self.count += other.count
+        self.total += other.total
+        if other.min is not None and (self.min is None or other.min < self.min):
+            self.min = other.min
+        self.max = max(self.max, other.max)
+
+    def percentile(self, percent: float) -> int:
+        """Value in microseconds at the given percentile (0-100)"""
+        if not self.count:
+            return 0
+        target = max(1, int(round(self.count * percent / 100.0)))
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if seen >= target:
+                low, high = self._bounds(index)
+                return min((low + high) // 2, self.max)
+        return self.max
+
+    def cumulative_counts(self, bounds_us) -> list:
+        """Samples at or below each of the ascending bounds (for Prometheus-style buckets)
+
+        A bucket is counted once its upper edge is within the bound, so
+        counts are exact at bucket edges and otherwise undercount slightly.
+        """
+        result = []
+        seen = 0
+        index = 0
+        for bound in bounds_us:
+            while index < len(self.counts) and self._bounds(index)[1] <= bound:
+                seen += self.counts[index]
+                index += 1
+            result.append(seen)
+        return result
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.count if self.count else 0.0
+
+
+class EndpointStats:
+    """Latency histogram plus request, error and byte counters for one route"""
+
+    def __init__(self):
+        self.histogram = LatencyHistogram()
+        self.errors = 0
+        self.bytes_sent = 0
+        self.bytes_received = 0
+
+    @property
+    def count(self) -> int:
+        return self.histogram.count
+
+    def merge(self, other: "EndpointStats"):
+        self.histogram.merge(other.histogram)
+        self.errors += other.errors
+        self.bytes_sent += other.bytes_sent
+        self.bytes_received += other.bytes_received
+
+
+class LatencyRecorder:
+    """Per-endpoint statistics keyed by route template"""
+
+    def __init__(self):
+        self.endpoints: Dict[str, EndpointStats] = {}
+        self.in_flight = 0
+
+    def record(self, method: str, endpoint: str, status: Optional[int], latency_s: float,
+               bytes_sent: int = 0, bytes_received: int = 0):
+        """Record one call; a missing status or any 4xx/5xx counts as an error"""
+        self.record_route(route_template(method, endpoint), status,
+                          int(latency_s * 1_000_000), bytes_sent, bytes_received)
+
+    def record_route(self, route: str, status: Optional[int], latency_us: int,
+                     bytes_sent: int = 0, bytes_received: int = 0):
+        """Record one call already keyed by its route template"""
+        stats = self.endpoints.get(route)
+        if stats is None:
+            stats = self.endpoints[route] = EndpointStats()
+        stats.histogram.record(latency_us)
+        stats.bytes_sent += bytes_sent
+        stats.bytes_received += bytes_received
+        if not status or status >= 400:
+            stats.errors += 1
+
+    def merge(self, other: "LatencyRecorder"):
+        for route, stats in other.endpoints.items():
+            if route not in self.endpoints:
+                self.endpoints[route] = EndpointStats()
+            self.endpoints[route].merge(stats)
+
+    def print_report(self, elapsed: float):
+        """Print p50/p90/p99/p99.9, max, throughput and error rate per endpoint"""
+        print("\n" + "=" * 60)
+        print("⏱️  LATENCY REPORT (ms)")
+        print("=" * 60)
+        header = (f"{'Endpoint':<36} {'count':>7} {'p50':>8} {'p90':>8} {'p99':>8} "
+                  f"{'p99.9':>8} {'max':>8} {'req/s':>8} {'err%':>6} {'KB in':>9}")
+        print(header)
+        print("-" * len(header))
+
+        total = EndpointStats()
+        for route in sorted(self.endpoints):
+            stats = self.endpoints[route]
+            total.merge(stats)
+            self._print_row(route, stats, elapsed)
+        print("-" * len(header))
+        self._print_row("ALL", total, elapsed)
+
+    @staticmethod
+    def _print_row(route: str, stats: EndpointStats, elapsed: float):
+        h = stats.histogram
+        rps = stats.count / elapsed if elapsed else 0.0
+        error_rate = 100.0 * stats.errors / stats.count if stats.count else 0.0
+        print(f"{route:<36} {stats.count:>7} {h.percentile(50) / 1000:>8.1f} "
+              f"{h.percentile(90) / 1000:>8.1f} {h.percentile(99) / 1000:>8.1f} "
+              f"{h.percentile(99.9) / 1000:>8.1f} {h.max / 1000:>8.1f} {rps:>8.1f} "
+              f"{error_rate:>6.1f} {stats.bytes_received / 1024:>9.1f}")
@@ -0,0 +1,213 @@
+#!/usr/bin/env python3
+"""
+Streaming List Crawler for Rent My Vroom NestJS Application
+Walks list endpoints page by page, parsing each response incrementally with constant memory
+"""
+
+import argparse
+import json
+import sys
+import time
+from typing import Dict, Any, Optional, Iterator
+
+import ijson
+import requests
+
+from token_pool import TokenPool
+
+# Endpoint -> (role whose token it needs, ijson prefix of the record array)
+LIST_ENDPOINTS = {
+    "/vehicles": (None, "item"),
+    "/bookings/renter": ("renter", "item"),
+    "/bookings/merchant": ("merchant", "item"),
+    "/reviews/merchant/{merchant_id}": (None, "reviews.item"),
+}
+
+
+class CountingReader:
+    """File-like wrapper over a streamed body that counts bytes as the parser pulls them"""
+
+    def __init__(self, raw):
+        self.raw = raw
+        self.bytes_read = 0
+
+    def read(self, size: int = -1) -> bytes:
+        chunk = self.raw.read(size)
+        self.bytes_read += len(chunk)
+        return chunk
+
+
+class CrawlStats:
+    """Per-endpoint crawl counters"""
+
+    def __init__(self, endpoint: str):
+        self.endpoint = endpoint
+        self.pages = 0
+        self.records = 0
+        self.invalid = 0
+        self.bytes = 0
+        self.time_to_first_record: Optional[float] = None
+        self.elapsed = 0.0
+        self.paginated = True
+        self.error: Optional[str] = None
+
+
+class ListCrawler:
+    """Yields records from list endpoints one at a time, never holding a whole page
+
+    Pages are requested with `page`/`limit` or, in cursor mode, with
+    `cursor` (the last id seen) and `limit`. The backend currently ignores
+    both and returns the full table; the crawler notices a page that does
+    not advance, stops after the first one and flags the endpoint as
+    unpaginated instead of looping forever.
+
+    Authenticated endpoints use lease 0 of each role from `token_pool`; the
+    token is checked before every page, so a crawl that outlives the
+    15-minute access token refreshes it instead of failing with 401.
+    """
+
+    def __init__(self, base_url: str = "http://localhost:4000", page_size: int = 100,
+                 mode: str = "page", token_pool: Optional[TokenPool] = None,
+                 timeout: float = 300.0):
+        if mode not in ("page", "cursor"):
+            raise ValueError(f"Unknown pagination mode: {mode}")
+        self.base_url = base_url
+        self.page_size = page_size
+        self.mode = mode
+        self.token_pool = token_pool
+        self.timeout = timeout
+        self.session = requests.Session()
+
+    def _token(self, role: str) -> str:
+        """Access token for the role's pool user, refreshed first if close to expiry"""
+        return self.token_pool.token_sync(self.session, self.token_pool.lease(role, 0))
+
+    def _page_url(self, endpoint: str, page: int, cursor: Any) -> str:
+        separator = "&" if "?" in endpoint else "?"
+        query = f"limit={self.page_size}"
+        if self.mode == "page":
+            query += f"&page={page}"
+        elif cursor is not None:
+            query += f"&cursor={cursor}"
+        return f"{self.base_url}{endpoint}{separator}{query}"
+
+    def crawl(self, endpoint: str, stats: CrawlStats, role: Optional[str] = None,
+              prefix: str = "item") -> Iterator[Dict[str, Any]]:
+        """Yield every record of a list endpoint, following pages until exhausted"""
+        started = time.perf_counter()
+        page, cursor = 1, None
+        first_ids = set()
+        try:
+            while True:
+                headers = {"Authorization": f"Bearer {self._token(role)}"} if role else {}
+                with self.session.get(self._page_url(endpoint, page, cursor), headers=headers,
+                                      stream=True, timeout=self.timeout) as response:
+                    if response.status_code != 200:
+                        stats.error = f"HTTP {response.status_code} on page {stats.pages + 1}"
+                        return
+                    response.raw.decode_content = True
+                    body = CountingReader(response.raw)
+                    in_page = 0
+                    last_id = None
+                    for record in ijson.items(body, prefix, use_float=True):
+                        record_id = record.get("id") if isinstance(record, dict) else None
+                        if in_page == 0:
+                            # Same first record as an earlier page: the server ignored paging
+                            if record_id is not None and record_id in first_ids:
+                                stats.paginated = False
+                                break
+                            first_ids.add(record_id)
+                        if stats.time_to_first_record is None:
+                            stats.time_to_first_record = time.perf_counter() - started
+                        in_page += 1
+                        stats.records += 1
+                        if record_id is None:
+                            stats.invalid += 1
+                        else:
+                            last_id = record_id
+                        yield record
+                    stats.bytes += body.bytes_read
+                    stats.pages += 1
+
+                if not stats.paginated or in_page < self.page_size:
+                    return
+                if in_page > self.page_size:
+                    # A page larger than asked for means the whole list came back at once
+                    stats.paginated = False
+                    return
+                page += 1
+                cursor = last_id
+        finally:
+            stats.elapsed = time.perf_counter() - started
+
+
+def print_stats(all_stats):
+    print("\n" + "=" * 60)
+    print("🕷️  CRAWL REPORT")
+    print("=" * 60)
+    header = (f"{'Endpoint':<32} {'pages':>6} {'records':>10} {'invalid':>8} "
+              f"{'MB':>9} {'TTFR ms':>9} {'secs':>7} {'rec/s':>9}")
+    print(header)
+    print("-" * len(header))
+    for stats in all_stats:
+        ttfr = f"{stats.time_to_first_record * 1000:.1f}" if stats.time_to_first_record else "-"
+        rate = stats.records / stats.elapsed if stats.elapsed else 0.0
+        print(f"{stats.endpoint:<32} {stats.pages:>6} {stats.records:>10} {stats.invalid:>8} "
+              f"{stats.bytes / 1_048_576:>9.2f} {ttfr:>9} {stats.elapsed:>7.2f} {rate:>9.0f}")
+        if stats.error:
+            print(f"   ❌ {stats.error}")
+        elif not stats.paginated:
+            print("   ⚠️  endpoint ignored pagination and returned every row in one response")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Stream every record from Rent My Vroom list endpoints")
+    parser.add_argument("endpoints", nargs="*", default=list(LIST_ENDPOINTS),
+                        help="list endpoints to crawl (default: all)")
+    parser.add_argument("--base-url", default="http://localhost:4000")
+    parser.add_argument("--page-size", type=int, default=100)
+    parser.add_argument("--mode", choices=["page", "cursor"], default="page")
+    parser.add_argument("--token-pool", help="token pool file; its first renter and merchant "
+                                             "are used for authenticated endpoints")
+    parser.add_argument("--merchant-id", type=int, help="merchant for /reviews/merchant/{merchant_id}")
+    parser.add_argument("--export", help="write every record as JSON lines to this file ('-' = stdout)")
+    args = parser.parse_args()
+
+    pool = TokenPool(args.token_pool, args.base_url) if args.token_pool else None
+    merchant_id = args.merchant_id
+    if merchant_id is None and pool is not None and pool.entries["merchant"]:
+        merchant_id = pool.lease("merchant", 0)["userId"]
+
+    crawler = ListCrawler(args.base_url, args.page_size, args.mode, pool)
+    export = None
+    if args.export:
+        export = sys.stdout if args.export == "-" else open(args.export, "w", encoding="utf-8")
+
+    all_stats = []
+    try:
+        for endpoint in args.endpoints:
+            role, prefix = LIST_ENDPOINTS.get(endpoint, (None, "item"))
+            stats = CrawlStats(endpoint)
+            all_stats.append(stats)
+            if role and (pool is None or not pool.entries[role]):
+                stats.error = f"needs a {role} token (--token-pool)"
+                continue
+            if "{merchant_id}" in endpoint:
+                if merchant_id is None:
+                    stats.error = "needs --merchant-id or --token-pool"
+                    continue
+                endpoint = endpoint.replace("{merchant_id}", str(merchant_id))
+            for record in crawler.crawl(endpoint, stats, role, prefix):
+                if export:
+                    export.write(json.dumps(record) + "\n")
+    finally:
+        if export and export is not sys.stdout:
+            export.close()
+        if pool is not None:
+            pool.save()
+
+    print_stats(all_stats)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,292 @@
+#!/usr/bin/env python3
+"""
+Live Metrics for the Rent My Vroom Load Tools
+Per-second windows of throughput, errors and rolling percentiles, a Prometheus endpoint and a terminal view
+"""
+
+import asyncio
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Tuple
+
+from latency_stats import LatencyHistogram, LatencyRecorder
+from run_results import SampleRecorder
+
+# Prometheus histogram bucket edges in microseconds (5 ms .. 10 s)
+BUCKETS_US = [5_000, 10_000, 25_000, 50_000, 100_000, 250_000, 500_000,
+              1_000_000, 2_500_000, 5_000_000, 10_000_000]
+QUANTILES = (50, 90, 99)
+
+
+class _Window:
+    """One second of samples: a histogram per route and counts per (route, status)"""
+
+    __slots__ = ("second", "histograms", "statuses")
+
+    def __init__(self):
+        self.second = -1
+        self.histograms: Dict[str, LatencyHistogram] = {}
+        self.statuses: Dict[Tuple[str, int], int] = {}
+
+    def reset(self, second: int):
+        self.second = second
+        self.histograms = {}
+        self.statuses = {}
+
+
+class LiveRecorder(LatencyRecorder):
+    """LatencyRecorder that also keeps a ring of per-second windows
+
+    Recording stays on the event loop thread and touches only the current
+    window (a dict lookup and a histogram bump), so there is nothing to
+    lock; the ring slot for a second is recycled in place when the clock
+    reaches it again. Readers fold the last `window` seconds once per tick.
+    In the multiprocess driver every worker records into its own recorder
+    and this one only sees the merged stream, so workers never share state.
+    """
+
+    def __init__(self, window: int = 10):
+        super().__init__()
+        self.window = window
+        self.ring = [_Window() for _ in range(window + 2)]
+        self.status_counts: Dict[Tuple[str, int], int] = {}
+        self.started = time.monotonic()
+
+    def record_route(self, route: str, status: Optional[int], latency_us: int,
+                     bytes_sent: int = 0, bytes_received: int = 0):
+        super().record_route(route, status, latency_us, bytes_sent, bytes_received)
+        second = int(time.monotonic())
+        slot = self.ring[second % len(self.ring)]
+        if slot.second != second:
+            slot.reset(second)
+        histogram = slot.histograms.get(route)
+        if histogram is None:
+            histogram = slot.histograms[route] = LatencyHistogram()
+        histogram.record(latency_us)
+        key = (route, status or 0)
+        slot.statuses[key] = slot.statuses.get(key, 0) + 1
+        self.status_counts[key] = self.status_counts.get(key, 0) + 1
+
+    def windows(self, seconds: int) -> List[_Window]:
+        """The windows of the last `seconds` complete seconds that saw any samples"""
+        now = int(time.monotonic())
+        slots = (self.ring[second % len(self.ring)] for second in range(now - seconds, now))
+        return [slot for slot in slots if slot.second >= now - seconds]
+
+    def snapshot(self) -> "LiveSnapshot":
+        return LiveSnapshot(self, time.monotonic() - self.started)
+
+
+class LiveSampleRecorder(LiveRecorder, SampleRecorder):
+    """Live windows plus the raw samples --save-results writes out"""
+
+
+class LiveSnapshot:
+    """Rates and rolling percentiles folded from a recorder's recent windows"""
+
+    def __init__(self, recorder: LiveRecorder, uptime: float):
+        self.uptime = uptime
+        self.in_flight = recorder.in_flight
+        last = recorder.windows(1)
+        rolling = recorder.windows(recorder.window)
+
+        self.rps = sum(h.count for slot in last for h in slot.histograms.values())
+        self.errors: Dict[int, int] = {}
+        for slot in last:
+            for (route, status), count in slot.statuses.items():
+                if not status or status >= 400:
+                    self.errors[status] = self.errors.get(status, 0) + count
+
+        # route -> (req/s over the rolling window, errors/s, merged histogram)
+        self.routes: Dict[str, Tuple[float, float, LatencyHistogram]] = {}
+        seconds = max(1, min(recorder.window, int(uptime)))
+        merged: Dict[str, LatencyHistogram] = {}
+        errors: Dict[str, int] = {}
+        for slot in rolling:
+            for route, histogram in slot.histograms.items():
+                if route not in merged:
+                    merged[route] = LatencyHistogram()
+                merged[route].merge(histogram)
+            for (route, status), count in slot.statuses.items():
+                if not status or status >= 400:
+                    errors[route] = errors.get(route, 0) + count
+        for route, histogram in merged.items():
+            self.routes[route] = (histogram.count / seconds, errors.get(route, 0) / seconds,
+                                  histogram)
+
+
+def _label(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def prometheus_text(recorder: LiveRecorder, snapshot: LiveSnapshot) -> str:
+    """Render the recorder in the Prometheus text exposition format"""
+    lines = [
+        "# HELP rmv_requests_total Requests completed, by route template and status (0 = no response)",
+        "# TYPE rmv_requests_total counter",
+    ]
+    for (route, status), count in sorted(recorder.status_counts.items()):
+        lines.append(f'rmv_requests_total{{route="{_label(route)}",status="{status}"}} {count}')
+
+    lines += ["# HELP rmv_request_duration_seconds Client-observed request latency",
+              "# TYPE rmv_request_duration_seconds histogram"]
+    for route in sorted(recorder.endpoints):
+        histogram = recorder.endpoints[route].histogram
+        label = _label(route)
+        for bound, count in zip(BUCKETS_US, histogram.cumulative_counts(BUCKETS_US)):
+            lines.append(f'rmv_request_duration_seconds_bucket{{route="{label}",'
+                         f'le="{bound / 1_000_000:g}"}} {count}')
+        lines.append(f'rmv_request_duration_seconds_bucket{{route="{label}",le="+Inf"}} '
+                     f'{histogram.count}')
+        lines.append(f'rmv_request_duration_seconds_sum{{route="{label}"}} '
+                     f'{histogram.total / 1_000_000:.6f}')
+        lines.append(f'rmv_request_duration_seconds_count{{route="{label}"}} {histogram.count}')
+
+    lines += ["# HELP rmv_in_flight_requests Requests sent and not yet answered",
+              "# TYPE rmv_in_flight_requests gauge",
+              f"rmv_in_flight_requests {snapshot.in_flight}",
+              "# HELP rmv_window_requests_per_second Requests per second over the rolling window",
+              "# TYPE rmv_window_requests_per_second gauge"]
+    for route, (rps, _, _) in sorted(snapshot.routes.items()):
+        lines.append(f'rmv_window_requests_per_second{{route="{_label(route)}"}} {rps:.2f}')
+    lines += ["# HELP rmv_window_errors_per_second Failed requests per second over the rolling window",
+              "# TYPE rmv_window_errors_per_second gauge"]
+    for route, (_, errors, _) in sorted(snapshot.routes.items()):
+        lines.append(f'rmv_window_errors_per_second{{route="{_label(route)}"}} {errors:.2f}')
+    lines += ["# HELP rmv_window_latency_seconds Latency percentiles over the rolling window",
+              "# TYPE rmv_window_latency_seconds gauge"]
+    for route, (_, _, histogram) in sorted(snapshot.routes.items()):
+        for quantile in QUANTILES:
+            lines.append(f'rmv_window_latency_seconds{{route="{_label(route)}",'
+                         f'quantile="{quantile / 100:g}"}} '
+                         f'{histogram.percentile(quantile) / 1_000_000:.6f}')
+    return "\n".join(lines) + "\n"
+
+
+class MetricsServer:
+    """Serves the last published exposition on /metrics from a daemon thread
+
+    The load loop renders the text once per tick and swaps in the new bytes
+    object; the server thread only ever reads that reference, so scrapes
+    never touch the recorder while it is being written.
+    """
+
+    def __init__(self, port: int, host: str = "127.0.0.1"):
+        self.body = b""
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split("?", 1)[0] != "/metrics":
+                    self.send_error(404)
+                    return
+                body = server.body
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer((host, port), Handler)
+        self.httpd.daemon_threads = True
+        self.port = self.httpd.server_address[1]
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self.thread.start()
+
+    def publish(self, text: str):
+        self.body = text.encode()
+
+    def close(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+class LiveView:
+    """Compact terminal view, redrawn in place on a TTY and one line at a time otherwise"""
+
+    def __init__(self, top: int = 8, stream=None, line_interval: float = 10.0):
+        self.top = top
+        self.stream = stream or sys.stdout
+        self.tty = self.stream.isatty()
+        self.line_interval = line_interval
+        self.drawn = 0
+        self.last_line = -line_interval
+
+    def render(self, snapshot: LiveSnapshot):
+        errors = sum(snapshot.errors.values())
+        detail = ", ".join(f"{status or 'none'}×{count}"
+                           for status, count in sorted(snapshot.errors.items()))
+        minutes, seconds = divmod(int(snapshot.uptime), 60)
+        headline = (f"⏱️  {minutes:02d}:{seconds:02d}  {snapshot.rps:>6} req/s  "
+                    f"{snapshot.in_flight:>5} in flight  {errors:>4} err/s"
+                    + (f" ({detail})" if detail else ""))
+        if not self.tty:
+            if snapshot.uptime - self.last_line >= self.line_interval:
+                self.last_line = snapshot.uptime
+                print(headline, file=self.stream, flush=True)
+            return
+
+        lines = [headline,
+                 f"{'Route':<36} {'req/s':>7} {'err/s':>6} {'p50':>8} {'p90':>8} {'p99':>8}"]
+        busiest = sorted(snapshot.routes.items(), key=lambda kv: -kv[1][0])[:self.top]
+        for route, (rps, errors_per_second, histogram) in busiest:
+            lines.append(f"{route[:36]:<36} {rps:>7.1f} {errors_per_second:>6.1f} "
+                         f"{histogram.percentile(50) / 1000:>8.1f} "
+                         f"{histogram.percentile(90) / 1000:>8.1f} "
+                         f"{histogram.percentile(99) / 1000:>8.1f}")
+        # Move back over the previous frame and clear it before drawing the next
+        prefix = f"\x1b[{self.drawn}F\x1b[J" if self.drawn else ""
+        self.stream.write(prefix + "\n".join(lines) + "\n")
+        self.stream.flush()
+        self.drawn = len(lines)
+
+
+class LiveMetrics:
+    """Publishes a LiveRecorder once per tick to a metrics server and/or a terminal view"""
+
+    def __init__(self, recorder: LiveRecorder, port: Optional[int] = None,
+                 view: bool = False, interval: float = 1.0):
+        self.recorder = recorder
+        self.interval = interval
+        self.server = MetricsServer(port) if port is not None else None
+        self.view = LiveView() if view else None
+        self.next_tick = 0.0
+
+    def tick(self):
+        snapshot = self.recorder.snapshot()
+        if self.server:
+            self.server.publish(prometheus_text(self.recorder, snapshot))
+        if self.view:
+            self.view.render(snapshot)
+
+    def maybe_tick(self):
+        """Tick if an interval has passed; for loops that wake up for other reasons"""
+        now = time.monotonic()
+        if now >= self.next_tick:
+            self.next_tick = now + self.interval
+            self.tick()
+
+    async def run(self):
+        """Tick on the event loop until cancelled"""
+        while True:
+            self.tick()
+            await asyncio.sleep(self.interval)
+
+    def close(self):
+        self.tick()
+        if self.server:
+            self.server.close()
+
+
+def make_recorder(save_results: Optional[str], view: bool = False,
+                  metrics_port: Optional[int] = None) -> Tuple[LatencyRecorder, Optional[LiveMetrics]]:
+    """Recorder matching a load tool's flags, plus the LiveMetrics publishing it if any"""
+    if not view and metrics_port is None:
+        return (SampleRecorder() if save_results else LatencyRecorder()), None
+    recorder = LiveSampleRecorder() if save_results else LiveRecorder()
+    return recorder, LiveMetrics(recorder, metrics_port, view)
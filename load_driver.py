@@ -0,0 +1,254 @@
+#!/usr/bin/env python3
+"""
+Multiprocess Load Driver for Rent My Vroom NestJS Application
+Forks one load_test worker per core and merges their latency samples into one report
+"""
+
+import argparse
+import asyncio
+import multiprocessing as mp
+import os
+import time
+from array import array
+from multiprocessing.connection import wait
+from typing import Dict, Any, List, Optional
+
+from latency_stats import LatencyRecorder
+from load_test import DEFAULT_SCENARIOS, LoadTestRunner, print_summary
+from live_metrics import LiveMetrics, make_recorder
+from run_results import run_metadata, save_run
+from token_pool import TokenPool
+
+
+class SampleStreamRecorder(LatencyRecorder):
+    """Buffers raw samples in packed arrays and ships them over a pipe in batches"""
+
+    def __init__(self, conn, batch_size: int = 4096, flush_interval: float = 0.5):
+        super().__init__()
+        self.conn = conn
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.route_ids: Dict[str, int] = {}
+        self.new_routes: List[str] = []
+        self._reset()
+
+    def _reset(self):
+        self.routes = array("I")
+        self.latencies = array("Q")
+        self.statuses = array("H")
+        self.sent = array("Q")
+        self.received = array("Q")
+        self.last_flush = time.perf_counter()
+
+    def record_route(self, route: str, status: Optional[int], latency_us: int,
+                     bytes_sent: int = 0, bytes_received: int = 0):
+        route_id = self.route_ids.get(route)
+        if route_id is None:
+            route_id = self.route_ids[route] = len(self.route_ids)
+            self.new_routes.append(route)
+        self.routes.append(route_id)
+        self.latencies.append(max(0, latency_us))
+        self.statuses.append(status or 0)
+        self.sent.append(bytes_sent)
+        self.received.append(bytes_received)
+        if (len(self.routes) >= self.batch_size
+                or time.perf_counter() - self.last_flush >= self.flush_interval):
+            self.flush()
+
+    def flush(self):
+        """Send buffered samples; route names go out once, ahead of their first use"""
+        if not self.routes:
+            return
+        self.conn.send(("samples", self.new_routes, self.routes.tobytes(),
+                        self.latencies.tobytes(), self.statuses.tobytes(),
+                        self.sent.tobytes(), self.received.tobytes(), self.in_flight))
+        self.new_routes = []
+        self._reset()
+
+
+def _worker_main(conn, config: Dict[str, Any]):
+    """Worker process: run this share of the virtual users and stream samples home"""
+    recorder = SampleStreamRecorder(conn)
+    token_pool = (TokenPool(config["token_pool"], config["base_url"])
+                  if config["token_pool"] else None)
+    runner = LoadTestRunner(config["base_url"], config["users"], config["ramp_up"],
+                            config["duration"], config["rps"], config["connections"],
+                            config["scenarios"], user_offset=config["user_offset"],
+                            recorder=recorder, token_pool=token_pool)
+    try:
+        results = asyncio.run(runner.run())
+        recorder.flush()
+        conn.send(("done", results))
+    except Exception as e:
+        conn.send(("error", f"{type(e).__name__}: {e}"))
+    finally:
+        conn.close()
+
+
+class LoadDriver:
+    """Coordinator: forks workers, merges their sample streams into one recorder"""
+
+    def __init__(self, base_url: str = "http://localhost:4000", workers: int = 0,
+                 users: int = 10, ramp_up: float = 10.0, duration: float = 60.0,
+                 rps: float = 0, connections: int = 100, scenarios: List[str] = None,
+                 token_pool: Optional[str] = None, recorder: Optional[LatencyRecorder] = None,
+                 live: Optional[LiveMetrics] = None):
+        self.base_url = base_url
+        self.workers = max(1, min(workers or os.cpu_count() or 1, users))
+        self.users = users
+        self.ramp_up = ramp_up
+        self.duration = duration
+        self.rps = rps
+        self.connections = connections
+        self.scenarios = scenarios or DEFAULT_SCENARIOS
+        self.token_pool = token_pool
+        self.recorder = recorder if recorder is not None else LatencyRecorder()
+        self.live = live
+        self.worker_errors = []
+        self.worker_in_flight: Dict[Any, int] = {}
+
+    def _worker_configs(self) -> List[Dict[str, Any]]:
+        configs = []
+        offset = 0
+        for index in range(self.workers):
+            share = self.users // self.workers + (1 if index < self.users % self.workers else 0)
+            configs.append({
+                "base_url": self.base_url,
+                "users": share,
+                "ramp_up": self.ramp_up,
+                "duration": self.duration,
+                "rps": self.rps * share / self.users if self.rps else 0,
+                "connections": max(1, self.connections // self.workers),
+                "scenarios": self.scenarios,
+                "user_offset": offset,
+                "token_pool": self.token_pool,
+            })
+            offset += share
+        return configs
+
+    def _merge_samples(self, conn, route_names: List[str], message) -> None:
+        new_routes, routes, latencies, statuses, sent, received, in_flight = message
+        route_names.extend(new_routes)
+        # In-flight is a gauge per worker, current as of its latest batch
+        self.worker_in_flight[conn] = in_flight
+        self.recorder.in_flight = sum(self.worker_in_flight.values())
+        routes = array("I", routes)
+        latencies = array("Q", latencies)
+        statuses = array("H", statuses)
+        sent = array("Q", sent)
+        received = array("Q", received)
+        for i in range(len(routes)):
+            self.recorder.record_route(route_names[routes[i]], statuses[i], latencies[i],
+                                       sent[i], received[i])
+
+    def run(self) -> Dict[str, Any]:
+        """Run all workers to completion and return merged counters"""
+        ctx = mp.get_context("fork" if "fork" in mp.get_all_start_methods() else "spawn")
+        processes = []
+        route_names: Dict[Any, List[str]] = {}
+        results = []
+
+        started = time.perf_counter()
+        for config in self._worker_configs():
+            parent_conn, child_conn = ctx.Pipe(duplex=False)
+            process = ctx.Process(target=_worker_main, args=(child_conn, config), daemon=True)
+            process.start()
+            child_conn.close()
+            processes.append(process)
+            route_names[parent_conn] = []
+
+        open_conns = list(route_names)
+        while open_conns:
+            ready = wait(open_conns, timeout=self.live.interval if self.live else None)
+            if self.live:
+                self.live.maybe_tick()
+            for conn in ready:
+                try:
+                    message = conn.recv()
+                except EOFError:
+                    open_conns.remove(conn)
+                    self.worker_in_flight.pop(conn, None)
+                    continue
+                kind = message[0]
+                if kind == "samples":
+                    self._merge_samples(conn, route_names[conn], message[1:])
+                elif kind == "done":
+                    results.append(message[1])
+                elif kind == "error":
+                    self.worker_errors.append(message[1])
+        if self.live:
+            self.live.close()
+        for process in processes:
+            process.join()
+        elapsed = time.perf_counter() - started
+
+        failures = {}
+        for result in results:
+            for name, count in result["failures"].items():
+                failures[name] = failures.get(name, 0) + count
+        requests_sent = sum(result["requests"] for result in results)
+        return {
+            "users": self.users,
+            "workers": self.workers,
+            "elapsed": elapsed,
+            "requests": requests_sent,
+            "errors": sum(result["errors"] for result in results),
+            "rps": requests_sent / elapsed if elapsed else 0.0,
+            "failures": failures,
+        }
+
+    def print_summary(self, results: Dict[str, Any]):
+        """Print the merged results of all workers"""
+        print(f"Worker processes: {results['workers']}")
+        for error in self.worker_errors:
+            print(f"❌ Worker failed: {error}")
+        print_summary(results, self.recorder)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rent My Vroom multiprocess load driver")
+    parser.add_argument("--base-url", default="http://localhost:4000")
+    parser.add_argument("--workers", type=int, default=0, help="worker processes (0 = one per core)")
+    parser.add_argument("--users", type=int, default=10, help="concurrent virtual users, all workers")
+    parser.add_argument("--ramp-up", type=float, default=10.0, help="seconds to start all users")
+    parser.add_argument("--duration", type=float, default=60.0, help="seconds at full load")
+    parser.add_argument("--rps", type=float, default=0, help="aggregate target RPS (0 = unthrottled)")
+    parser.add_argument("--connections", type=int, default=100, help="HTTP connections, all workers")
+    parser.add_argument("--scenarios", default=",".join(DEFAULT_SCENARIOS),
+                        help="comma-separated scenario names, run in order per iteration")
+    parser.add_argument("--token-pool", help="pre-authenticated user pool file (see token_pool.py)")
+    parser.add_argument("--save-results", help="write the run to this results file (see run_results.py)")
+    parser.add_argument("--dataset", help="dataset label stored with saved results, e.g. a seed scale")
+    parser.add_argument("--live", action="store_true", help="show per-second live metrics")
+    parser.add_argument("--metrics-port", type=int,
+                        help="serve live Prometheus metrics on this port at /metrics")
+    args = parser.parse_args()
+    if args.users < 1:
+        parser.error("--users must be at least 1")
+
+    if args.token_pool:
+        capacity = TokenPool(args.token_pool, args.base_url).capacity()
+        if args.users > capacity:
+            # Workers lease disjoint index ranges; wrapping would share refresh tokens across them
+            parser.error(f"--users {args.users} exceeds the token pool's {capacity} "
+                         f"renter/merchant pairs; top it up with token_pool.py")
+
+    recorder, live = make_recorder(args.save_results, args.live, args.metrics_port)
+    driver = LoadDriver(args.base_url, args.workers, args.users, args.ramp_up, args.duration,
+                        args.rps, args.connections, args.scenarios.split(","),
+                        args.token_pool, recorder, live)
+    print("🚀 Starting Rent My Vroom Multiprocess Load Test")
+    print("=" * 60)
+    results = driver.run()
+    driver.print_summary(results)
+    if args.save_results:
+        save_run(args.save_results, driver.recorder, run_metadata(
+            "load_driver", baseUrl=args.base_url,
+            concurrency={"users": args.users, "workers": results["workers"],
+                         "connections": args.connections, "rps": args.rps},
+            dataset=args.dataset, scenarios=args.scenarios, elapsed=results["elapsed"]))
+        print(f"💾 Results saved to {args.save_results}")
+
+
+if __name__ == "__main__":
+    main()
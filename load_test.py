@@ -0,0 +1,539 @@
+#!/usr/bin/env python3
+"""
+Concurrent Load Testing for Rent My Vroom NestJS Application
+Replays the backend_test.py scenarios as concurrent virtual users on asyncio
+"""
+
+import argparse
+import asyncio
+import itertools
+import json
+import time
+from datetime import datetime, timedelta
+from typing import Dict, Any, Optional, List
+
+import aiohttp
+
+from backend_test import RentMyVroomAPITester
+from latency_stats import LatencyRecorder, route_template
+from live_metrics import LiveMetrics, make_recorder
+from payload_analyzer import PayloadAnalyzer
+from query_profile import REQUEST_ID_HEADER, RequestLog
+from run_results import run_metadata, save_run
+from stub_backend import StubBackend
+from token_pool import TokenPool
+
+DEFAULT_SCENARIOS = ["vehicle_management", "booking_system", "messaging_system",
+                     "review_system", "pagination_and_filtering"]
+
+# Shared across virtual users so every created vehicle gets a unique plate
+_plate_counter = itertools.count(1)
+
+
+class AsyncResponse:
+    """Buffered response exposing the parts of requests.Response the scenarios use"""
+
+    def __init__(self, status_code: int, content: bytes):
+        self.status_code = status_code
+        self.content = content
+
+    @property
+    def text(self) -> str:
+        return self.content.decode("utf-8", errors="replace")
+
+    def json(self) -> Any:
+        return json.loads(self.content)
+
+
+class RateLimiter:
+    """Spaces request starts evenly so all virtual users together hold a target RPS"""
+
+    def __init__(self, rps: float = 0):
+        self.interval = 1.0 / rps if rps else 0.0
+        self.next_slot = time.perf_counter()
+
+    async def acquire(self):
+        """Wait for the next free send slot (no-op when unthrottled)"""
+        if not self.interval:
+            return
+        now = time.perf_counter()
+        slot = max(self.next_slot, now)
+        self.next_slot = slot + self.interval
+        if slot > now:
+            await asyncio.sleep(slot - now)
+
+
+class AsyncRentMyVroomAPITester(RentMyVroomAPITester):
+    """One virtual user: the backend_test scenarios on a shared aiohttp session"""
+
+    def __init__(self, session: aiohttp.ClientSession, user_index: int,
+                 base_url: str = "http://localhost:4000",
+                 limiter: Optional[RateLimiter] = None, verbose: bool = False,
+                 recorder: Optional[LatencyRecorder] = None,
+                 token_pool: Optional[TokenPool] = None,
+                 request_log: Optional[RequestLog] = None,
+                 payload_analyzer: Optional[PayloadAnalyzer] = None,
+                 stub: Optional[StubBackend] = None):
+        super().__init__(base_url)
+        self.session = session
+        self.token_pool = token_pool
+        self.request_log = request_log
+        self.payload_analyzer = payload_analyzer
+        self.stub = stub
+        self.leases = {}
+        if recorder is not None:
+            self.recorder = recorder
+        self.user_index = user_index
+        self.limiter = limiter or RateLimiter()
+        self.verbose = verbose
+        self.request_count = 0
+        self.error_count = 0
+        self.failures = {}
+
+        # Timestamped emails collide between users started in the same second
+        suffix = f"{int(time.time())}u{user_index}"
+        self.run_tag = suffix
+        self.renter_data["email"] = f"renter{suffix}@example.com"
+        self.merchant_data["email"] = f"merchant{suffix}@example.com"
+
+    def log_test(self, test_name: str, success: bool, details: str = ""):
+        """Count failures instead of printing every check"""
+        if not success:
+            self.failures[test_name] = self.failures.get(test_name, 0) + 1
+        if self.verbose:
+            super().log_test(f"[user {self.user_index}] {test_name}", success, details)
+
+    async def make_request(self, method: str, endpoint: str, data: Dict = None,
+                           headers: Dict = None, token: str = None) -> Optional[AsyncResponse]:
+        """Make HTTP request with optional authentication"""
+        method = method.upper()
+        if method not in ("GET", "POST", "PATCH", "PUT", "DELETE"):
+            raise ValueError(f"Unsupported HTTP method: {method}")
+
+        url = f"{self.base_url}{endpoint}"
+        request_headers = {"Content-Type": "application/json"}
+        if headers:
+            request_headers.update(headers)
+        if token:
+            request_headers["Authorization"] = f"Bearer {token}"
+        body = json.dumps(data) if data is not None and method not in ("GET", "DELETE") else None
+
+        await self.limiter.acquire()
+        self.request_count += 1
+        # run_tag is unique per virtual user and run, so this is unique per request
+        request_id = f"{self.run_tag}-{self.request_count}"
+        request_headers[REQUEST_ID_HEADER] = request_id
+        self.recorder.in_flight += 1
+        sent_at = time.time()
+        started = time.perf_counter()
+        status = None
+        try:
+            async with self.session.request(method, url, data=body,
+                                            headers=request_headers) as response:
+                content = await response.read()
+                status = response.status
+                if response.status >= 400:
+                    self.error_count += 1
+                self.recorder.record(method, endpoint, response.status,
+                                     time.perf_counter() - started,
+                                     len(body) if body else 0, len(content))
+                if self.payload_analyzer is not None:
+                    self.payload_analyzer.observe(route_template(method, endpoint),
+                                                  response.status, content)
+                return AsyncResponse(response.status, content)
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            self.error_count += 1
+            self.recorder.record(method, endpoint, None, time.perf_counter() - started)
+            if self.verbose:
+                print(f"Request failed: {e}")
+            return None
+        finally:
+            self.recorder.in_flight -= 1
+            if self.request_log is not None:
+                self.request_log.write(request_id, route_template(method, endpoint), status,
+                                       sent_at, time.perf_counter() - started)
+
+    def _check(self, test_name: str, response: Optional[AsyncResponse], expected) -> bool:
+        success = response is not None and response.status_code in expected
+        self.log_test(test_name, success,
+                      f"Status: {response.status_code if response is not None else 'No response'}")
+        return success
+
+    async def test_authentication_system(self):
+        """Register and log in this user's renter and merchant"""
+        if self.token_pool is not None:
+            return await self.lease_pool_users()
+
+        for role, user_data in (("renter", self.renter_data), ("merchant", self.merchant_data)):
+            response = await self.make_request("POST", "/auth/register", user_data)
+            self._check(f"{role.title()} Registration", response, [200, 201, 409])
+
+            login_data = {"email": user_data["email"], "password": user_data["password"]}
+            response = await self.make_request("POST", "/auth/login", login_data)
+            if self._check(f"{role.title()} Login", response, [200]):
+                login_result = response.json()
+                self.tokens[role] = login_result.get("accessToken")
+                self.user_ids[role] = login_result.get("user", {}).get("id")
+                if role == "merchant":
+                    self.merchant_ids.append(self.user_ids[role])
+
+        return len(self.tokens) >= 2
+
+    async def lease_pool_users(self):
+        """Take this user's pre-registered renter and merchant from the token pool"""
+        for role in ("renter", "merchant"):
+            entry = self.leases[role] = self.token_pool.lease(role, self.user_index)
+            self.user_ids[role] = entry["userId"]
+        self.merchant_ids.append(self.user_ids["merchant"])
+        await self.refresh_tokens()
+        return True
+
+    async def refresh_tokens(self):
+        """Swap in pool tokens, refreshing any that are close to expiry"""
+        for role, entry in self.leases.items():
+            self.tokens[role] = await self.token_pool.token(self.session, entry)
+
+    async def test_user_management(self):
+        """Upload the renter's license and approve it directly in the database"""
+        if "renter" not in self.tokens:
+            self.log_test("Driving License Upload", False, "No renter token available")
+            return False
+
+        license_data = {"licenseUrl": "https://example.com/license.jpg"}
+        response = await self.make_request("POST", "/users/upload-license",
+                                           license_data, token=self.tokens["renter"])
+        if not self._check("Driving License Upload", response, [200, 201]):
+            return False
+
+        if self.stub is not None:
+            # The stand-in backend has no database to shell out to; approve in-process
+            self.stub.approve(self.user_ids.get("renter", 0))
+            return True
+
+        # Same test-only workaround as the sync tester: there is no admin user to approve with
+        cmd = f"""cd /app/backend && npx prisma db execute --stdin <<< "UPDATE \\"User\\" SET \\"licenseStatus\\" = 'APPROVED', \\"licenseApprovedAt\\" = NOW() WHERE id = {self.user_ids.get('renter', 0)};" """
+        process = await asyncio.create_subprocess_shell(
+            cmd, executable="/bin/bash",
+            stdout=asyncio.subprocess.DEVNULL, stderr=asyncio.subprocess.DEVNULL)
+        await process.wait()
+        return True
+
+    async def test_vehicle_management(self):
+        """Create a vehicle, then list and fetch vehicles"""
+        if "merchant" not in self.tokens:
+            self.log_test("Vehicle Management", False, "No merchant token available")
+            return False
+
+        vehicle_data = {
+            "make": "Honda",
+            "model": "Civic",
+            "year": 2023,
+            "color": "Blue",
+            "licensePlate": f"LT{self.run_tag}-{next(_plate_counter)}",
+            "pricePerHour": 15,
+            "pricePerDay": 100,
+            "seats": 5,
+            "fuelType": "Petrol",
+            "transmission": "Manual",
+            "description": "Reliable car",
+            "features": ["AC", "Bluetooth"],
+            "images": [self.sample_image]
+        }
+        response = await self.make_request("POST", "/vehicles", vehicle_data,
+                                           token=self.tokens["merchant"])
+        if self._check("Vehicle Creation", response, [200, 201]):
+            vehicle_id = response.json().get("id")
+            if vehicle_id is not None:
+                self.vehicle_ids.append(vehicle_id)
+
+        response = await self.make_request("GET", "/vehicles")
+        self._check("Get All Vehicles", response, [200])
+
+        response = await self.make_request("GET", "/vehicles/my", token=self.tokens["merchant"])
+        self._check("Get Merchant Vehicles", response, [200])
+
+        if self.vehicle_ids:
+            response = await self.make_request("GET", f"/vehicles/{self.vehicle_ids[-1]}")
+            self._check("Get Specific Vehicle", response, [200])
+
+        return len(self.vehicle_ids) > 0
+
+    async def test_booking_system(self):
+        """Book this user's latest vehicle and have the merchant accept it"""
+        if "renter" not in self.tokens or not self.vehicle_ids:
+            self.log_test("Booking System", False, "Missing renter token or vehicle ID")
+            return False
+
+        booking_data = {
+            "vehicleId": self.vehicle_ids[-1],
+            "startDate": (datetime.now() + timedelta(days=1)).isoformat(),
+            "endDate": (datetime.now() + timedelta(days=3)).isoformat(),
+            "renterNotes": "Need for trip"
+        }
+        response = await self.make_request("POST", "/bookings", booking_data,
+                                           token=self.tokens["renter"])
+        if self._check("Create Booking Request", response, [200, 201]):
+            booking_id = response.json().get("id")
+            if booking_id is not None:
+                self.booking_ids.append(booking_id)
+
+        response = await self.make_request("GET", "/bookings/renter", token=self.tokens["renter"])
+        self._check("Get Renter Bookings", response, [200])
+
+        response = await self.make_request("GET", "/bookings/merchant", token=self.tokens["merchant"])
+        self._check("Get Merchant Bookings", response, [200])
+
+        if self.booking_ids:
+            response = await self.make_request("PATCH", f"/bookings/{self.booking_ids[-1]}/accept",
+                                               {}, token=self.tokens["merchant"])
+            self._check("Accept Booking", response, [200])
+
+        return len(self.booking_ids) > 0
+
+    async def test_messaging_system(self):
+        """Exchange messages on the latest booking and read them back"""
+        if not self.booking_ids or "renter" not in self.tokens or "merchant" not in self.tokens:
+            self.log_test("Messaging System", False, "Missing booking ID or tokens")
+            return False
+
+        booking_id = self.booking_ids[-1]
+        response = await self.make_request("POST", f"/messages/{booking_id}",
+                                           {"content": "What time can I pick up?"},
+                                           token=self.tokens["renter"])
+        self._check("Renter Send Message", response, [200, 201])
+
+        response = await self.make_request("POST", f"/messages/{booking_id}",
+                                           {"content": "9am tomorrow works"},
+                                           token=self.tokens["merchant"])
+        self._check("Merchant Send Message", response, [200, 201])
+
+        response = await self.make_request("GET", f"/messages/{booking_id}",
+                                           token=self.tokens["renter"])
+        return self._check("Get Messages", response, [200])
+
+    async def test_review_system(self):
+        """Complete the latest booking, review it and fetch the merchant's reviews"""
+        if not self.booking_ids or "merchant" not in self.tokens or "renter" not in self.tokens:
+            self.log_test("Review System", False, "Missing booking ID or tokens")
+            return False
+
+        booking_id = self.booking_ids[-1]
+        response = await self.make_request("PATCH", f"/bookings/{booking_id}/complete",
+                                           {}, token=self.tokens["merchant"])
+        self._check("Complete Booking", response, [200])
+
+        review_data = {"bookingId": booking_id, "rating": 5, "comment": "Excellent service!"}
+        response = await self.make_request("POST", "/reviews", review_data,
+                                           token=self.tokens["renter"])
+        self._check("Create Review", response, [200, 201])
+
+        if self.merchant_ids:
+            response = await self.make_request("GET", f"/reviews/merchant/{self.merchant_ids[0]}")
+            return self._check("Get Merchant Reviews", response, [200])
+        return False
+
+    async def test_pagination_and_filtering(self):
+        """Hit the vehicles list with pagination and filter parameters"""
+        response = await self.make_request("GET", "/vehicles?page=1&limit=10")
+        self._check("Vehicles Pagination", response, [200])
+
+        response = await self.make_request("GET", "/vehicles?make=Honda")
+        return self._check("Vehicles Filtering", response, [200])
+
+    async def run_scenarios(self, scenarios: List[str], deadline: float):
+        """Set up this user, then loop over the scenarios until the deadline"""
+        if not await self.test_authentication_system():
+            return
+        if self.token_pool is None:
+            await self.test_user_management()
+
+        while time.perf_counter() < deadline:
+            if self.token_pool is not None:
+                await self.refresh_tokens()
+            for name in scenarios:
+                if time.perf_counter() >= deadline:
+                    break
+                await getattr(self, f"test_{name}")()
+
+
+class LoadTestRunner:
+    """Drives N virtual users with ramp-up, duration and a target RPS"""
+
+    def __init__(self, base_url: str = "http://localhost:4000", users: int = 10,
+                 ramp_up: float = 10.0, duration: float = 60.0, rps: float = 0,
+                 connections: int = 100, scenarios: List[str] = None,
+                 verbose: bool = False, user_offset: int = 0,
+                 recorder: Optional[LatencyRecorder] = None,
+                 token_pool: Optional[TokenPool] = None, live: Optional[LiveMetrics] = None,
+                 request_log: Optional[RequestLog] = None,
+                 payload_analyzer: Optional[PayloadAnalyzer] = None):
+        self.base_url = base_url
+        self.users = users
+        self.ramp_up = ramp_up
+        self.duration = duration
+        self.rps = rps
+        self.connections = connections
+        self.scenarios = scenarios or DEFAULT_SCENARIOS
+        self.verbose = verbose
+        self.user_offset = user_offset
+        self.token_pool = token_pool
+        self.live = live
+        self.request_log = request_log
+        self.payload_analyzer = payload_analyzer
+        # Set by run_against_stub when the backend runs in-process
+        self.stub: Optional[StubBackend] = None
+        self.virtual_users = []
+        self.recorder = recorder if recorder is not None else LatencyRecorder()
+
+        for name in self.scenarios:
+            if not hasattr(AsyncRentMyVroomAPITester, f"test_{name}"):
+                raise ValueError(f"Unknown scenario: {name}")
+
+    async def _run_user(self, tester: AsyncRentMyVroomAPITester, delay: float, deadline: float):
+        await asyncio.sleep(delay)
+        await tester.run_scenarios(self.scenarios, deadline)
+
+    async def run(self) -> Dict[str, Any]:
+        """Run the load test and return aggregate counters"""
+        connector = aiohttp.TCPConnector(limit=self.connections, limit_per_host=0,
+                                         ttl_dns_cache=300, keepalive_timeout=30)
+        timeout = aiohttp.ClientTimeout(total=30)
+        limiter = RateLimiter(self.rps)
+
+        async with aiohttp.ClientSession(connector=connector, timeout=timeout) as session:
+            self.virtual_users = [
+                AsyncRentMyVroomAPITester(session, self.user_offset + i, self.base_url,
+                                          limiter, self.verbose, self.recorder,
+                                          self.token_pool, self.request_log,
+                                          self.payload_analyzer, self.stub)
+                for i in range(self.users)
+            ]
+            started = time.perf_counter()
+            deadline = started + self.ramp_up + self.duration
+            step = self.ramp_up / self.users if self.users else 0
+            ticker = asyncio.ensure_future(self.live.run()) if self.live else None
+            try:
+                await asyncio.gather(*(
+                    self._run_user(tester, i * step, deadline)
+                    for i, tester in enumerate(self.virtual_users)
+                ))
+            finally:
+                if ticker:
+                    ticker.cancel()
+                    self.live.close()
+            elapsed = time.perf_counter() - started
+
+        if self.token_pool is not None:
+            self.token_pool.save()
+        if self.request_log is not None:
+            self.request_log.close()
+
+        failures = {}
+        for tester in self.virtual_users:
+            for name, count in tester.failures.items():
+                failures[name] = failures.get(name, 0) + count
+
+        requests_sent = sum(t.request_count for t in self.virtual_users)
+        return {
+            "users": self.users,
+            "elapsed": elapsed,
+            "requests": requests_sent,
+            "errors": sum(t.error_count for t in self.virtual_users),
+            "rps": requests_sent / elapsed if elapsed else 0.0,
+            "failures": failures,
+        }
+
+    def print_summary(self, results: Dict[str, Any]):
+        """Print the aggregate results of a run"""
+        print_summary(results, self.recorder)
+        if self.payload_analyzer is not None:
+            self.payload_analyzer.print_report()
+
+
+def print_summary(results: Dict[str, Any], recorder: LatencyRecorder):
+    """Print run counters, failed checks and the per-endpoint latency report"""
+    print("\n" + "=" * 60)
+    print("🏁 LOAD TEST SUMMARY")
+    print("=" * 60)
+    print(f"Virtual users: {results['users']}")
+    print(f"Elapsed:       {results['elapsed']:.1f}s")
+    print(f"Requests:      {results['requests']}")
+    print(f"Errors:        {results['errors']}")
+    print(f"Throughput:    {results['rps']:.1f} req/s")
+    if results["failures"]:
+        print("\nFailed checks:")
+        for name, count in sorted(results["failures"].items(), key=lambda kv: -kv[1]):
+            print(f"❌ {name}: {count}")
+    recorder.print_report(results["elapsed"])
+
+
+async def run_against_stub(runner: LoadTestRunner, backend: StubBackend) -> Dict[str, Any]:
+    """Run on the same event loop as an in-process stand-in backend"""
+    async with backend:
+        runner.base_url = backend.base_url
+        runner.stub = backend
+        return await runner.run()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rent My Vroom concurrent load test")
+    parser.add_argument("--base-url", default="http://localhost:4000")
+    parser.add_argument("--users", type=int, default=10, help="concurrent virtual users")
+    parser.add_argument("--ramp-up", type=float, default=10.0, help="seconds to start all users")
+    parser.add_argument("--duration", type=float, default=60.0, help="seconds at full load")
+    parser.add_argument("--rps", type=float, default=0, help="aggregate target RPS (0 = unthrottled)")
+    parser.add_argument("--connections", type=int, default=100, help="HTTP connection pool size")
+    parser.add_argument("--scenarios", default=",".join(DEFAULT_SCENARIOS),
+                        help="comma-separated scenario names, run in order per iteration")
+    parser.add_argument("--token-pool", help="pre-authenticated user pool file (see token_pool.py)")
+    parser.add_argument("--verbose", action="store_true", help="print every check")
+    parser.add_argument("--stub", action="store_true",
+                        help="test against an in-process stand-in backend (see stub_backend.py)")
+    parser.add_argument("--stub-latency", type=float, default=0.0,
+                        help="ms the stand-in adds to every request")
+    parser.add_argument("--stub-error-rate", type=float, default=0.0,
+                        help="fraction of requests the stand-in fails with 500")
+    parser.add_argument("--save-results", help="write the run to this results file (see run_results.py)")
+    parser.add_argument("--dataset", help="dataset label stored with saved results, e.g. a seed scale")
+    parser.add_argument("--live", action="store_true", help="show per-second live metrics")
+    parser.add_argument("--metrics-port", type=int,
+                        help="serve live Prometheus metrics on this port at /metrics")
+    parser.add_argument("--request-log", help="write each request's ID, route and latency to this "
+                                              "JSON lines file (see query_profile.py)")
+    parser.add_argument("--analyze-payloads", type=int, metavar="N", nargs="?", const=20,
+                        help="report size, shape and repeated embedded objects of N "
+                             "successful responses per endpoint, sampled across the whole run "
+                             "(default 20)")
+    args = parser.parse_args()
+    if args.stub and args.token_pool:
+        parser.error("--token-pool users do not exist on the stand-in backend")
+
+    token_pool = TokenPool(args.token_pool, args.base_url) if args.token_pool else None
+    if token_pool is not None and args.users > token_pool.capacity():
+        parser.error(f"--users {args.users} exceeds the token pool's {token_pool.capacity()} "
+                     f"renter/merchant pairs; top it up with token_pool.py")
+    recorder, live = make_recorder(args.save_results, args.live, args.metrics_port)
+    runner = LoadTestRunner(args.base_url, args.users, args.ramp_up, args.duration,
+                            args.rps, args.connections, args.scenarios.split(","),
+                            args.verbose, token_pool=token_pool, recorder=recorder, live=live,
+                            request_log=RequestLog(args.request_log) if args.request_log else None,
+                            payload_analyzer=(PayloadAnalyzer(args.analyze_payloads)
+                                              if args.analyze_payloads else None))
+    print("🚀 Starting Rent My Vroom Load Test")
+    print("=" * 60)
+    if args.stub:
+        backend = StubBackend(args.stub_latency / 1000, error_rate=args.stub_error_rate)
+        results = asyncio.run(run_against_stub(runner, backend))
+    else:
+        results = asyncio.run(runner.run())
+    runner.print_summary(results)
+    if args.save_results:
+        save_run(args.save_results, runner.recorder, run_metadata(
+            "load_test", baseUrl="stub" if args.stub else args.base_url,
+            concurrency={"users": args.users, "connections": args.connections, "rps": args.rps},
+            dataset=args.dataset, scenarios=args.scenarios, elapsed=results["elapsed"]))
+        print(f"💾 Results saved to {args.save_results}")
+
+
+if __name__ == "__main__":
+    main()
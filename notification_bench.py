@@ -0,0 +1,617 @@
+#!/usr/bin/env python3
+"""
+Notification Delivery Benchmark for Rent My Vroom
+Local SMTP sink with latency and failure injection, inline-send attribution, and a batched outbox worker
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Any, List, Optional, Tuple
+
+import aiohttp
+
+from latency_stats import LatencyHistogram
+from query_profile import QueryEvent, QueryJoin, RequestProfile
+from token_pool import TokenPool
+
+EMAIL_FROM = "noreply@rentmyvroom.test"
+
+
+class SinkSession:
+    """One SMTP connection as the sink saw it; times are epoch seconds"""
+
+    __slots__ = ("started", "ended", "messages", "failures")
+
+    def __init__(self, started: float):
+        self.started = started
+        self.ended = started
+        self.messages = 0
+        self.failures = 0
+
+
+class SmtpSink:
+    """Accepts and discards mail, slowly and unreliably on request
+
+    Every reply waits `rtt` seconds, standing in for the network round trip
+    each SMTP command costs a real relay; the reply to the end of DATA waits
+    `latency` more (plus up to `jitter`), the relay's own queueing. With
+    probability `failure_rate` a message is refused with `failure_code`
+    (4xx is retryable, 5xx is not). AUTH is advertised and anything is
+    accepted, so nodemailer configured with SMTP_USER/SMTP_PASS is happy.
+    """
+
+    def __init__(self, rtt: float = 0.0, latency: float = 0.0, jitter: float = 0.0,
+                 failure_rate: float = 0.0, failure_code: int = 451,
+                 seed: Optional[int] = None, log_path: Optional[str] = None):
+        self.rtt = rtt
+        self.latency = latency
+        self.jitter = jitter
+        self.failure_rate = failure_rate
+        self.failure_code = failure_code
+        self.rng = random.Random(seed)
+        self.sessions: List[SinkSession] = []
+        self.accepted = 0
+        self.refused = 0
+        self.log = open(log_path, "a", encoding="utf-8") if log_path else None
+        self.server: Optional[asyncio.AbstractServer] = None
+
+    async def start(self, host: str = "127.0.0.1", port: int = 0) -> int:
+        """Listen on the running loop; returns the bound port (port 0 = any free port)"""
+        self.server = await asyncio.start_server(self._session, host, port)
+        return self.server.sockets[0].getsockname()[1]
+
+    async def stop(self):
+        self.server.close()
+        await self.server.wait_closed()
+        if self.log:
+            self.log.close()
+
+    async def _reply(self, writer: asyncio.StreamWriter, text: str, delay: float = 0.0):
+        if self.rtt or delay:
+            await asyncio.sleep(self.rtt + delay)
+        writer.write(text.encode() + b"\r\n")
+        await writer.drain()
+
+    async def _session(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        session = SinkSession(time.time())
+        self.sessions.append(session)
+        subject = None
+        try:
+            await self._reply(writer, "220 sink.rentmyvroom.test ESMTP")
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                verb = line[:4].upper()
+                if verb == b"EHLO":
+                    await self._reply(writer, "250-sink.rentmyvroom.test\r\n250-8BITMIME\r\n"
+                                              "250-AUTH PLAIN LOGIN\r\n250 SMTPUTF8")
+                elif verb == b"AUTH":
+                    # Prompt for whatever the mechanism did not send inline, then accept it
+                    parts = line.split()
+                    prompts = {b"LOGIN": ["334 VXNlcm5hbWU6", "334 UGFzc3dvcmQ6"],
+                               b"PLAIN": ["334 "]}.get(parts[1].upper() if len(parts) > 1 else b"", [])
+                    for prompt in prompts[len(parts) - 2:]:
+                        await self._reply(writer, prompt)
+                        await reader.readline()
+                    await self._reply(writer, "235 2.7.0 Authentication successful")
+                elif verb == b"DATA":
+                    await self._reply(writer, "354 End data with <CR><LF>.<CR><LF>")
+                    while True:
+                        data = await reader.readline()
+                        if not data or data == b".\r\n":
+                            break
+                        if subject is None and data[:8].lower() == b"subject:":
+                            subject = data[8:].strip().decode(errors="replace")
+                    delay = self.latency + (self.rng.uniform(0, self.jitter) if self.jitter else 0)
+                    session.messages += 1
+                    if self.failure_rate and self.rng.random() < self.failure_rate:
+                        session.failures += 1
+                        self.refused += 1
+                        await self._reply(writer, f"{self.failure_code} Injected failure", delay)
+                    else:
+                        self.accepted += 1
+                        await self._reply(writer, "250 2.0.0 Queued", delay)
+                elif verb == b"QUIT":
+                    await self._reply(writer, "221 2.0.0 Bye")
+                    break
+                elif verb in (b"HELO", b"MAIL", b"RCPT", b"RSET", b"NOOP"):
+                    await self._reply(writer, "250 2.0.0 OK")
+                else:
+                    await self._reply(writer, "502 5.5.2 Command not recognized")
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            session.ended = time.time()
+            writer.close()
+            if self.log:
+                self.log.write(json.dumps({
+                    "started": round(session.started, 6), "ended": round(session.ended, 6),
+                    "messages": session.messages, "failures": session.failures,
+                    "subject": subject}) + "\n")
+                self.log.flush()
+
+
+class SmtpError(Exception):
+    """A refused SMTP command; `code` tells retryable (4xx) from permanent (5xx)"""
+
+    def __init__(self, code: int, message: str):
+        super().__init__(f"{code} {message}")
+        self.code = code
+
+
+class SmtpClient:
+    """Minimal asyncio SMTP client: one connection, any number of messages"""
+
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.reader = reader
+        self.writer = writer
+
+    @classmethod
+    async def connect(cls, host: str, port: int, timeout: float = 30.0) -> "SmtpClient":
+        reader, writer = await asyncio.wait_for(asyncio.open_connection(host, port), timeout)
+        client = cls(reader, writer)
+        await client._expect(220)
+        await client.command("EHLO harness.rentmyvroom.test", 250)
+        return client
+
+    async def _expect(self, expected: int) -> int:
+        while True:
+            line = await self.reader.readline()
+            if not line:
+                raise ConnectionError("SMTP connection closed")
+            # Multi-line replies continue with "250-"; the last line has a space
+            if line[3:4] != b"-":
+                code = int(line[:3])
+                if code != expected:
+                    raise SmtpError(code, line[4:].decode(errors="replace").strip())
+                return code
+
+    async def command(self, line: str, expected: int) -> int:
+        self.writer.write(line.encode() + b"\r\n")
+        await self.writer.drain()
+        return await self._expect(expected)
+
+    async def send(self, to: str, subject: str, html: str):
+        await self.command(f"MAIL FROM:<{EMAIL_FROM}>", 250)
+        await self.command(f"RCPT TO:<{to}>", 250)
+        await self.command("DATA", 354)
+        body = "\r\n".join(("." + line) if line.startswith(".") else line
+                           for line in html.splitlines())
+        self.writer.write((f"From: {EMAIL_FROM}\r\nTo: {to}\r\nSubject: {subject}\r\n"
+                           f"Content-Type: text/html; charset=utf-8\r\n\r\n{body}\r\n.\r\n").encode())
+        await self.writer.drain()
+        await self._expect(250)
+
+    async def close(self):
+        try:
+            await self.command("QUIT", 221)
+        except (ConnectionError, SmtpError):
+            pass
+        self.writer.close()
+
+
+class Notification:
+    __slots__ = ("to", "subject", "html", "attempts", "enqueued_at")
+
+    def __init__(self, to: str, subject: str, html: str):
+        self.to = to
+        self.subject = subject
+        self.html = html
+        self.attempts = 0
+        self.enqueued_at = time.perf_counter()
+
+
+class OutboxFull(Exception):
+    """The outbox stayed full for the whole enqueue timeout"""
+
+
+class OutboxWorker:
+    """Drains queued notifications in batches, one SMTP connection per batch
+
+    The request path only enqueues. The queue is bounded: `enqueue` waits up
+    to `enqueue_timeout` for room and then raises OutboxFull, so a stalled
+    relay slows producers down instead of growing memory without limit. Each
+    of `concurrency` workers takes up to `batch_size` messages (waiting at
+    most `linger` seconds to fill a batch) and sends them over one
+    connection. A 4xx reply or a broken connection requeues the message
+    after an exponential backoff with jitter; a 5xx reply or `max_attempts`
+    failures moves it to `dead_letters`.
+    """
+
+    def __init__(self, host: str, port: int, concurrency: int = 4, batch_size: int = 20,
+                 linger: float = 0.005, capacity: int = 10_000, max_attempts: int = 5,
+                 backoff: float = 0.05, enqueue_timeout: float = 1.0):
+        self.host = host
+        self.port = port
+        self.concurrency = concurrency
+        self.batch_size = batch_size
+        self.linger = linger
+        self.max_attempts = max_attempts
+        self.backoff = backoff
+        self.enqueue_timeout = enqueue_timeout
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=capacity)
+        self.workers: List[asyncio.Task] = []
+        self.retrying: set = set()
+        self.dead_letters: List[Notification] = []
+        self.delivered = 0
+        self.retries = 0
+        self.batches = 0
+        self.lag = LatencyHistogram()
+
+    def start(self):
+        self.workers = [asyncio.create_task(self._work()) for _ in range(self.concurrency)]
+
+    async def enqueue(self, notification: Notification):
+        try:
+            await asyncio.wait_for(self.queue.put(notification), self.enqueue_timeout)
+        except asyncio.TimeoutError:
+            raise OutboxFull(f"outbox full ({self.queue.maxsize} queued)") from None
+
+    async def drain(self):
+        """Wait until everything queued (and every pending retry) is delivered or dead"""
+        while True:
+            await self.queue.join()
+            if not self.retrying:
+                return
+            await asyncio.gather(*list(self.retrying))
+
+    async def close(self):
+        for worker in self.workers:
+            worker.cancel()
+        await asyncio.gather(*self.workers, return_exceptions=True)
+
+    async def _batch(self) -> List[Notification]:
+        batch = [await self.queue.get()]
+        deadline = time.perf_counter() + self.linger
+        while len(batch) < self.batch_size:
+            try:
+                batch.append(self.queue.get_nowait())
+            except asyncio.QueueEmpty:
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self.queue.get(), remaining))
+                except asyncio.TimeoutError:
+                    break
+        return batch
+
+    async def _work(self):
+        while True:
+            batch = await self._batch()
+            self.batches += 1
+            client = None
+            try:
+                for index, notification in enumerate(batch):
+                    notification.attempts += 1
+                    try:
+                        if client is None:
+                            client = await SmtpClient.connect(self.host, self.port)
+                        await client.send(notification.to, notification.subject, notification.html)
+                        self.delivered += 1
+                        self.lag.record(int((time.perf_counter() - notification.enqueued_at)
+                                            * 1_000_000))
+                    except SmtpError as e:
+                        self._failed(notification, retryable=400 <= e.code < 500)
+                        if e.code == 421:
+                            client = None
+                    except (OSError, asyncio.TimeoutError):
+                        self._failed(notification, retryable=True)
+                        client = None
+            finally:
+                if client is not None:
+                    await client.close()
+                for _ in batch:
+                    self.queue.task_done()
+
+    def _failed(self, notification: Notification, retryable: bool):
+        if not retryable or notification.attempts >= self.max_attempts:
+            self.dead_letters.append(notification)
+            return
+        self.retries += 1
+        delay = self.backoff * 2 ** (notification.attempts - 1) * random.uniform(0.5, 1.5)
+        task = asyncio.create_task(self._requeue(notification, delay))
+        self.retrying.add(task)
+        task.add_done_callback(self.retrying.discard)
+
+    async def _requeue(self, notification: Notification, delay: float):
+        await asyncio.sleep(delay)
+        await self.queue.put(notification)
+
+
+async def send_inline(host: str, port: int, notification: Notification) -> bool:
+    """What NotificationsService.sendEmail does: new connection, send, swallow errors"""
+    client = None
+    try:
+        client = await SmtpClient.connect(host, port)
+        await client.send(notification.to, notification.subject, notification.html)
+        return True
+    except (SmtpError, OSError, asyncio.TimeoutError):
+        return False
+    finally:
+        if client is not None:
+            await client.close()
+
+
+async def run_delivery(mode: str, sink: SmtpSink, port: int, requests: int, concurrency: int,
+                       work_ms: float, worker_options: Dict[str, Any]) -> Dict[str, Any]:
+    """Closed-loop requests that each do `work_ms` of other work and emit one email"""
+    latencies = LatencyHistogram()
+    outcome = {"sent": 0, "lost": 0, "rejected": 0}
+    outbox = OutboxWorker("127.0.0.1", port, **worker_options) if mode == "queued" else None
+    if outbox:
+        outbox.start()
+    counter = iter(range(requests))
+
+    async def user():
+        for n in counter:
+            started = time.perf_counter()
+            await asyncio.sleep(work_ms / 1000)
+            notification = Notification(f"user{n}@example.test", "New Booking Request Received",
+                                        f"<h1>Hello,</h1><p>Booking {n}</p>")
+            if outbox is None:
+                outcome["sent" if await send_inline("127.0.0.1", port, notification) else "lost"] += 1
+            else:
+                try:
+                    await outbox.enqueue(notification)
+                except OutboxFull:
+                    outcome["rejected"] += 1
+            latencies.record(int((time.perf_counter() - started) * 1_000_000))
+
+    started = time.perf_counter()
+    await asyncio.gather(*(user() for _ in range(concurrency)))
+    responded = time.perf_counter() - started
+    if outbox:
+        await outbox.drain()
+        await outbox.close()
+        outcome.update(sent=outbox.delivered, lost=len(outbox.dead_letters),
+                       retries=outbox.retries, batches=outbox.batches, lag=outbox.lag)
+    outcome.update(mode=mode, latencies=latencies, responded=responded,
+                   delivered_in=time.perf_counter() - started)
+    return outcome
+
+
+def benchmark(sink_options: Dict[str, Any], requests: int, concurrency: int, work_ms: float,
+              worker_options: Dict[str, Any]):
+    """Inline vs queued delivery against the same sink settings"""
+    results = []
+    for mode in ("inline", "queued"):
+        async def run():
+            sink = SmtpSink(**sink_options)
+            port = await sink.start()
+            try:
+                return await run_delivery(mode, sink, port, requests, concurrency, work_ms,
+                                          worker_options)
+            finally:
+                await sink.stop()
+        results.append(asyncio.run(run()))
+
+    print(f"{requests} requests, {concurrency} concurrent, {work_ms:g} ms of other work each; "
+          f"sink rtt {sink_options['rtt'] * 1000:g} ms, latency "
+          f"{sink_options['latency'] * 1000:g} ms, failure rate {sink_options['failure_rate']:g}")
+    header = (f"{'mode':<8} {'req/s':>8} {'p50 ms':>8} {'p99 ms':>8} {'sent':>7} {'lost':>6} "
+              f"{'503':>5} {'retries':>8} {'mail/s':>8} {'lag p99 ms':>11}")
+    print(header)
+    print("-" * len(header))
+    for r in results:
+        h = r["latencies"]
+        lag = r.get("lag")
+        print(f"{r['mode']:<8} {requests / r['responded']:>8.0f} {h.percentile(50) / 1000:>8.1f} "
+              f"{h.percentile(99) / 1000:>8.1f} {r['sent']:>7} {r['lost']:>6} {r['rejected']:>5} "
+              f"{r.get('retries', 0):>8} {r['sent'] / r['delivered_in']:>8.0f} "
+              f"{lag.percentile(99) / 1000 if lag else 0:>11.1f}")
+
+
+class BookingWorkflow:
+    """Booking create then accept or reject, by pool users against a running backend
+
+    Every request is recorded with its send time and latency so that SMTP
+    sessions the sink saw can be attributed to the request that was in
+    flight (query_profile.QueryJoin, the same rule as for untagged queries).
+    """
+
+    def __init__(self, base_url: str, pool: TokenPool, merchants: int):
+        self.base_url = base_url
+        self.pool = pool
+        self.merchants = [pool.lease("merchant", i) for i in range(merchants)]
+        self.vehicles: List[Tuple[int, Dict[str, Any]]] = []
+        self.records: List[Dict[str, Any]] = []
+        self.failures = 0
+
+    async def _call(self, session: aiohttp.ClientSession, method: str, path: str,
+                    route: str, token: str, body: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        sent_at, started = time.time(), time.perf_counter()
+        async with session.request(method, f"{self.base_url}{path}", json=body,
+                                   headers={"Authorization": f"Bearer {token}"}) as response:
+            payload = await response.json(content_type=None)
+            status = response.status
+        self.records.append({"requestId": f"{len(self.records)}", "route": route,
+                             "status": status, "sentAt": sent_at,
+                             "latencyUs": int((time.perf_counter() - started) * 1_000_000)})
+        if status >= 300:
+            self.failures += 1
+            return None
+        return payload
+
+    async def prepare(self, session: aiohttp.ClientSession):
+        """One fresh vehicle per merchant, so the owner of every booking is known"""
+        stamp = int(time.time() * 1000)
+        for index, merchant in enumerate(self.merchants):
+            token = await self.pool.token(session, merchant)
+            vehicle = await self._call(session, "POST", "/vehicles", "POST /vehicles", token, {
+                "make": "Toyota", "model": "Corolla", "year": 2022, "color": "Blue",
+                "licensePlate": f"MAIL-{stamp}-{index}", "pricePerHour": 10, "pricePerDay": 60,
+                "seats": 5, "fuelType": "Petrol", "transmission": "Automatic"})
+            if vehicle:
+                self.vehicles.append((vehicle["id"], merchant))
+        self.records.clear()
+        if not self.vehicles:
+            raise RuntimeError("Could not create any vehicle with the pool's merchants")
+
+    async def cycle(self, session: aiohttp.ClientSession, n: int):
+        vehicle_id, merchant = self.vehicles[n % len(self.vehicles)]
+        # Cycles reuse renters in this process only; token() serializes their refreshes
+        renter = self.pool.lease("renter", n, shared=True)
+        start = datetime.now(timezone.utc) + timedelta(days=30 + n % 300)
+        booking = await self._call(
+            session, "POST", "/bookings", "POST /bookings", await self.pool.token(session, renter),
+            {"vehicleId": vehicle_id, "startDate": start.isoformat().replace("+00:00", "Z"),
+             "endDate": (start + timedelta(days=2)).isoformat().replace("+00:00", "Z")})
+        if booking is None:
+            return
+        action = "accept" if n % 2 == 0 else "reject"
+        await self._call(session, "PATCH", f"/bookings/{booking['id']}/{action}",
+                         f"PATCH /bookings/:id/{action}", await self.pool.token(session, merchant),
+                         {"merchantNotes": "load test"})
+
+    async def run(self, cycles: int, concurrency: int):
+        counter = iter(range(cycles))
+        async with aiohttp.ClientSession() as session:
+            if not self.vehicles:
+                await self.prepare(session)
+
+            async def user():
+                for n in counter:
+                    await self.cycle(session, n)
+
+            await asyncio.gather(*(user() for _ in range(concurrency)))
+
+
+def attribute(records: List[Dict[str, Any]], sessions: List[SinkSession]):
+    """Per route: latency, and how much of it the inline SMTP sessions took"""
+    requests = {r["requestId"]: RequestProfile(r) for r in records}
+    join = QueryJoin(requests)
+    for session in sessions:
+        join.add(QueryEvent(None, session.started, (session.ended - session.started) * 1000))
+    routes: Dict[str, List[RequestProfile]] = {}
+    for request in requests.values():
+        routes.setdefault(request.route, []).append(request)
+    rows = {}
+    for route, profiles in sorted(routes.items()):
+        latency = LatencyHistogram()
+        for profile in profiles:
+            latency.record(profile.latency_us)
+        mail_ms = sum(p.db_ms for p in profiles) / len(profiles)
+        rows[route] = (len(profiles), latency, mail_ms)
+    return rows, join
+
+
+def measure(base_url: str, pool: TokenPool, merchants: int, cycles: int, concurrency: int,
+            sink_port: int, phases: List[Dict[str, Any]]):
+    """Run the workflow once per sink setting; the backend must send to 127.0.0.1:sink_port"""
+    workflow = BookingWorkflow(base_url, pool, merchants)
+    print(f"Point the backend at the sink: SMTP_HOST=127.0.0.1 SMTP_PORT={sink_port} "
+          f"SMTP_SECURE=false")
+    header = (f"{'sink ms':>8} {'Endpoint':<30} {'count':>6} {'p50':>8} {'p99':>8} "
+              f"{'mail ms':>8} {'mail%':>6}")
+    print(header)
+    print("-" * len(header))
+    for options in phases:
+        async def run():
+            sink = SmtpSink(**options)
+            await sink.start(port=sink_port)
+            try:
+                workflow.records.clear()
+                await workflow.run(cycles, concurrency)
+                # Let the last sessions close before reading them
+                await asyncio.sleep(0.2)
+            finally:
+                await sink.stop()
+            return sink
+
+        sink = asyncio.run(run())
+        rows, join = attribute(workflow.records, sink.sessions)
+        label = f"{options['latency'] * 1000:g}"
+        for route, (count, latency, mail_ms) in rows.items():
+            mean = latency.mean / 1000
+            print(f"{label:>8} {route:<30} {count:>6} {latency.percentile(50) / 1000:>8.1f} "
+                  f"{latency.percentile(99) / 1000:>8.1f} {mail_ms:>8.1f} "
+                  f"{100 * mail_ms / mean if mean else 0:>6.0f}")
+        print(f"{'':>8} {len(sink.sessions)} SMTP sessions: {join.timed} attributed, "
+              f"{join.unmatched} overlapping several requests or none; "
+              f"{workflow.failures} failed requests")
+
+
+def _sink_options(args, latency_ms: Optional[float] = None) -> Dict[str, Any]:
+    return {"rtt": args.rtt / 1000,
+            "latency": (args.latency if latency_ms is None else latency_ms) / 1000,
+            "jitter": args.jitter / 1000, "failure_rate": args.failure_rate,
+            "failure_code": args.failure_code, "seed": args.seed}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Notification delivery: SMTP sink, "
+                                                 "inline cost and a batched outbox worker")
+    sub = parser.add_subparsers(dest="command", required=True)
+    sink = sub.add_parser("sink", help="run the SMTP sink until interrupted")
+    sink.add_argument("--port", type=int, default=2525)
+    sink.add_argument("--log", help="append one JSON line per SMTP session here")
+    measure_cmd = sub.add_parser("measure",
+                                 help="share of booking create/accept/reject spent sending mail")
+    measure_cmd.add_argument("--base-url", default="http://localhost:4000")
+    measure_cmd.add_argument("--token-pool", required=True, help="token pool file (see token_pool.py)")
+    measure_cmd.add_argument("--merchants", type=int, default=5)
+    measure_cmd.add_argument("--cycles", type=int, default=100, help="bookings per sink setting")
+    measure_cmd.add_argument("--concurrency", type=int, default=1,
+                             help="above 1, sessions overlapping several requests go unattributed")
+    measure_cmd.add_argument("--sink-port", type=int, default=2525)
+    measure_cmd.add_argument("--sweep", type=float, nargs="+", metavar="MS",
+                             help="repeat with these end-of-DATA latencies (default: --latency)")
+    bench = sub.add_parser("bench", help="inline vs queued delivery under load")
+    bench.add_argument("--requests", type=int, default=2_000)
+    bench.add_argument("--concurrency", type=int, default=50)
+    bench.add_argument("--work", type=float, default=5.0, help="ms of non-mail work per request")
+    bench.add_argument("--workers", type=int, default=16)
+    bench.add_argument("--batch", type=int, default=20)
+    bench.add_argument("--capacity", type=int, default=10_000, help="outbox size before 503s")
+    bench.add_argument("--max-attempts", type=int, default=5)
+    for command in (sink, measure_cmd, bench):
+        command.add_argument("--rtt", type=float, default=0.0, help="ms before every SMTP reply")
+        command.add_argument("--latency", type=float, default=0.0, help="ms added after DATA")
+        command.add_argument("--jitter", type=float, default=0.0, help="up to this many extra ms")
+        command.add_argument("--failure-rate", type=float, default=0.0)
+        command.add_argument("--failure-code", type=int, default=451,
+                             help="4xx is retried by the outbox worker, 5xx is not")
+        command.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    if args.command == "bench":
+        benchmark(_sink_options(args), args.requests, args.concurrency, args.work,
+                  {"concurrency": args.workers, "batch_size": args.batch,
+                   "capacity": args.capacity, "max_attempts": args.max_attempts})
+        return
+    if args.command == "measure":
+        pool = TokenPool(args.token_pool, args.base_url)
+        if args.merchants > pool.capacity():
+            parser.error(f"--merchants {args.merchants} exceeds the token pool's "
+                         f"{pool.capacity()} renter/merchant pairs; top it up with token_pool.py")
+        phases = [_sink_options(args, latency) for latency in (args.sweep or [args.latency])]
+        measure(args.base_url, pool, args.merchants, args.cycles, args.concurrency,
+                args.sink_port, phases)
+        pool.save()
+        return
+
+    async def serve():
+        sink_server = SmtpSink(log_path=args.log, **_sink_options(args))
+        port = await sink_server.start(port=args.port)
+        print(f"📮 SMTP sink listening on 127.0.0.1:{port}")
+        try:
+            await asyncio.Event().wait()
+        finally:
+            await sink_server.stop()
+            print(f"Accepted {sink_server.accepted}, refused {sink_server.refused} messages "
+                  f"over {len(sink_server.sessions)} sessions")
+
+    try:
+        asyncio.run(serve())
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
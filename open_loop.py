@@ -0,0 +1,217 @@
+#!/usr/bin/env python3
+"""
+Open-loop Load Generator for Rent My Vroom NestJS Application
+Fires requests on a fixed or Poisson arrival schedule, independent of responses,
+and measures latency from each request's scheduled send time
+"""
+
+import argparse
+import asyncio
+import random
+import time
+from typing import Dict, Any, List, Optional
+
+import aiohttp
+
+from latency_stats import LatencyHistogram, LatencyRecorder
+from load_test import AsyncRentMyVroomAPITester
+from run_results import SampleRecorder, run_metadata, save_run
+from token_pool import TokenPool
+
+
+class Target:
+    """One weighted request template: "[renter|merchant] METHOD /path[@weight]"
+
+    {id} in the path is replaced by a random integer from the scheduler's id range.
+    """
+
+    def __init__(self, spec: str):
+        spec, _, weight = spec.partition("@")
+        parts = spec.split()
+        self.auth = parts.pop(0) if parts[0] in ("renter", "merchant") else None
+        self.method = parts[0].upper()
+        self.path = parts[1]
+        self.weight = float(weight) if weight else 1.0
+
+
+class OpenLoopScheduler:
+    """Sends on a precomputed arrival schedule no matter how many requests are in flight
+
+    A closed-loop client only sends once the previous response is back, so a
+    backend stall silently lowers the offered load and hides the stall from
+    the latency numbers (coordinated omission). Here request k is due at its
+    scheduled time whatever happens; latency is measured from that time, so
+    any time a request spent waiting behind a slow client counts against it.
+    Requests that start more than `lag_tolerance` late are reported as
+    delayed, and arrivals that find `max_in_flight` requests outstanding are
+    dropped rather than queued without bound.
+    """
+
+    def __init__(self, targets: List[Target], base_url: str = "http://localhost:4000",
+                 rate: float = 100.0, duration: float = 60.0, arrivals: str = "poisson",
+                 max_in_flight: int = 10_000, connections: int = 1_000,
+                 lag_tolerance: float = 0.005, id_range=(1, 1000),
+                 seed: Optional[int] = None, token_pool: Optional[TokenPool] = None):
+        if arrivals not in ("poisson", "fixed"):
+            raise ValueError(f"Unknown arrival process: {arrivals}")
+        self.targets = targets
+        self.weights = [t.weight for t in targets]
+        self.base_url = base_url
+        self.rate = rate
+        self.duration = duration
+        self.arrivals = arrivals
+        self.max_in_flight = max_in_flight
+        self.connections = connections
+        self.lag_tolerance = lag_tolerance
+        self.id_range = id_range
+        self.rng = random.Random(seed)
+        self.token_pool = token_pool
+
+        self.recorder = LatencyRecorder()          # from scheduled send time
+        self.service_recorder = LatencyRecorder()  # from actual send time
+        self.send_lag = LatencyHistogram()
+        self.scheduled = 0
+        self.sent = 0
+        self.delayed = 0
+        self.dropped = 0
+        self.in_flight = 0
+        self.peak_in_flight = 0
+
+    def _intervals(self):
+        interval = 1.0 / self.rate
+        while True:
+            yield self.rng.expovariate(self.rate) if self.arrivals == "poisson" else interval
+
+    async def _fire(self, client: AsyncRentMyVroomAPITester, target: Target,
+                    endpoint: str, due: float):
+        lag = time.perf_counter() - due
+        self.send_lag.record(int(lag * 1_000_000))
+        if lag > self.lag_tolerance:
+            self.delayed += 1
+        try:
+            data = {} if target.method in ("POST", "PATCH", "PUT") else None
+            response = await client.make_request(target.method, endpoint, data,
+                                                 token=client.tokens.get(target.auth))
+            status = response.status_code if response is not None else None
+            received = len(response.content) if response is not None else 0
+            self.recorder.record(target.method, endpoint, status,
+                                 time.perf_counter() - due, 0, received)
+        finally:
+            self.in_flight -= 1
+
+    async def run(self) -> Dict[str, Any]:
+        connector = aiohttp.TCPConnector(limit=self.connections, limit_per_host=0)
+        timeout = aiohttp.ClientTimeout(total=60)
+        async with aiohttp.ClientSession(connector=connector, timeout=timeout) as session:
+            client = AsyncRentMyVroomAPITester(session, 0, self.base_url,
+                                               recorder=self.service_recorder,
+                                               token_pool=self.token_pool)
+            if self.token_pool is not None:
+                await client.lease_pool_users()
+
+            tasks = set()
+            started = time.perf_counter()
+            end = started + self.duration
+            due = started
+            for gap in self._intervals():
+                due += gap
+                if due >= end:
+                    break
+                now = time.perf_counter()
+                if due > now:
+                    await asyncio.sleep(due - now)
+                self.scheduled += 1
+                if self.in_flight >= self.max_in_flight:
+                    self.dropped += 1
+                    continue
+
+                target = self.rng.choices(self.targets, weights=self.weights)[0]
+                endpoint = target.path.replace("{id}", str(self.rng.randint(*self.id_range)))
+                self.in_flight += 1
+                self.sent += 1
+                self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+                task = asyncio.ensure_future(self._fire(client, target, endpoint, due))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+                if self.token_pool is not None and self.sent % 1000 == 0:
+                    await client.refresh_tokens()
+
+            schedule_elapsed = time.perf_counter() - started
+            if tasks:
+                await asyncio.gather(*tasks)
+
+        return {
+            "elapsed": schedule_elapsed,
+            "offered_rps": self.scheduled / schedule_elapsed if schedule_elapsed else 0.0,
+            "sent_rps": self.sent / schedule_elapsed if schedule_elapsed else 0.0,
+        }
+
+    def print_summary(self, results: Dict[str, Any]):
+        print("\n" + "=" * 60)
+        print("🏁 OPEN-LOOP SUMMARY")
+        print("=" * 60)
+        print(f"Arrivals:        {self.arrivals} at {self.rate:.1f}/s for {self.duration:.0f}s")
+        print(f"Scheduled:       {self.scheduled} ({results['offered_rps']:.1f} req/s offered)")
+        print(f"Sent:            {self.sent} ({results['sent_rps']:.1f} req/s)")
+        print(f"Delayed (>{self.lag_tolerance * 1000:g}ms): {self.delayed}")
+        print(f"Dropped:         {self.dropped} (in-flight cap {self.max_in_flight})")
+        print(f"Peak in flight:  {self.peak_in_flight}")
+        print(f"Send lag ms:     p50 {self.send_lag.percentile(50) / 1000:.2f}  "
+              f"p99 {self.send_lag.percentile(99) / 1000:.2f}  max {self.send_lag.max / 1000:.2f}")
+        if self.delayed or self.dropped:
+            print("⚠️  The client fell behind its schedule; add workers or lower --rate.")
+        print("\nLatency from scheduled send time (coordinated-omission corrected):")
+        self.recorder.print_report(results["elapsed"])
+        print("\nService time from actual send (what a closed-loop client would report):")
+        self.service_recorder.print_report(results["elapsed"])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rent My Vroom open-loop load generator")
+    parser.add_argument("targets", nargs="*", default=["GET /vehicles@3", "GET /vehicles/{id}@5",
+                                                       "GET /reviews/merchant/{id}@2"],
+                        help='request templates, e.g. "GET /vehicles/{id}@5" or '
+                             '"renter GET /bookings/renter"')
+    parser.add_argument("--base-url", default="http://localhost:4000")
+    parser.add_argument("--rate", type=float, default=100.0, help="mean arrivals per second")
+    parser.add_argument("--duration", type=float, default=60.0, help="seconds of arrivals")
+    parser.add_argument("--arrivals", choices=["poisson", "fixed"], default="poisson")
+    parser.add_argument("--max-in-flight", type=int, default=10_000,
+                        help="drop arrivals beyond this many outstanding requests")
+    parser.add_argument("--connections", type=int, default=1_000, help="HTTP connection pool size")
+    parser.add_argument("--lag-tolerance", type=float, default=5.0,
+                        help="ms late a send may start before it counts as delayed")
+    parser.add_argument("--id-range", default="1-1000", help="range {id} is drawn from")
+    parser.add_argument("--seed", type=int)
+    parser.add_argument("--token-pool", help="pre-authenticated user pool file (see token_pool.py)")
+    parser.add_argument("--save-results", help="write the run to this results file (see run_results.py)")
+    parser.add_argument("--dataset", help="dataset label stored with saved results, e.g. a seed scale")
+    args = parser.parse_args()
+
+    low, high = (int(x) for x in args.id_range.split("-"))
+    token_pool = TokenPool(args.token_pool, args.base_url) if args.token_pool else None
+    targets = [Target(spec) for spec in args.targets]
+    if any(t.auth for t in targets) and token_pool is None:
+        parser.error("authenticated targets need --token-pool")
+
+    scheduler = OpenLoopScheduler(targets, args.base_url, args.rate, args.duration,
+                                  args.arrivals, args.max_in_flight, args.connections,
+                                  args.lag_tolerance / 1000, (low, high), args.seed, token_pool)
+    if args.save_results:
+        scheduler.recorder = SampleRecorder()
+    print("🚀 Starting Rent My Vroom Open-loop Load Test")
+    print("=" * 60)
+    results = asyncio.run(scheduler.run())
+    scheduler.print_summary(results)
+    if args.save_results:
+        # Latency from scheduled send time, so saved runs stay free of coordinated omission
+        save_run(args.save_results, scheduler.recorder, run_metadata(
+            "open_loop", baseUrl=args.base_url,
+            concurrency={"rate": args.rate, "arrivals": args.arrivals,
+                         "connections": args.connections},
+            dataset=args.dataset, targets=args.targets, elapsed=results["elapsed"]))
+        print(f"💾 Results saved to {args.save_results}")
+
+
+if __name__ == "__main__":
+    main()
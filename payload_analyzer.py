@@ -0,0 +1,228 @@
+#!/usr/bin/env python3
+"""
+Payload Analyzer for the Rent My Vroom Load Tools
+Response sizes, JSON shape and duplicated embedded objects per endpoint
+"""
+
+import json
+import random
+from typing import Dict, Any, List, Optional, Set
+
+# Columns and relations that should never leave the API, whatever the nesting
+SENSITIVE_KEYS = {"password", "refreshTokens"}
+
+
+def _scalar_size(value: Any) -> int:
+    """Approximate compact-JSON bytes of a scalar (string escapes are not counted)"""
+    if isinstance(value, str):
+        return len(value.encode()) + 2
+    if value is None or value is True:
+        return 4
+    if value is False:
+        return 5
+    return len(repr(value))
+
+
+def _type_name(value: Any) -> str:
+    if isinstance(value, dict):
+        return "object"
+    if isinstance(value, list):
+        return "array"
+    if isinstance(value, str):
+        return "string"
+    if isinstance(value, bool):
+        return "boolean"
+    if value is None:
+        return "null"
+    return "number"
+
+
+class FieldStats:
+    """Bytes and types seen at one JSON path, e.g. [].vehicle.images[]"""
+
+    __slots__ = ("bytes", "count", "types")
+
+    def __init__(self):
+        self.bytes = 0
+        self.count = 0
+        self.types: Set[str] = set()
+
+
+class RepeatStats:
+    """Embedded objects at one path that an earlier row of the same response already carried"""
+
+    __slots__ = ("objects", "repeats", "wasted")
+
+    def __init__(self):
+        self.objects = 0
+        self.repeats = 0
+        self.wasted = 0
+
+
+class EndpointPayloads:
+    """Payload counters for one route template
+
+    responses, total_bytes and max_bytes cover every response; the rest
+    are filled from the sampled bodies when the report is built.
+    """
+
+    def __init__(self):
+        self.responses = 0
+        self.total_bytes = 0
+        self.max_bytes = 0
+        self.reservoir: List[bytes] = []
+        self.analyzed = 0
+        self.bytes = 0
+        self.rows = 0
+        self.wasted = 0
+        self.fields: Dict[str, FieldStats] = {}
+        self.repeats: Dict[str, RepeatStats] = {}
+        self.sensitive: Set[str] = set()
+
+
+class PayloadAnalyzer:
+    """Records JSON shape and duplication of successful responses, per endpoint
+
+    Every response is counted, but only `samples` per route are parsed and
+    walked, so the analysis cost stays bounded on long runs. They are a
+    uniform reservoir sample over the whole run rather than the first ones
+    seen, which come while lists are still nearly empty and understate
+    steady-state sizes; parsing waits for the report.
+
+    An object with an `id` is a repeat when the same relation (the key it
+    hangs off, e.g. `vehicle` or `merchant`) with the same id already
+    appeared in that response; its whole serialized size is wasted bytes,
+    since a normalized response would have sent it once.
+    """
+
+    def __init__(self, samples: int = 20, seed: Optional[int] = None):
+        self.samples = samples
+        self.rng = random.Random(seed)
+        self.endpoints: Dict[str, EndpointPayloads] = {}
+
+    def observe(self, route: str, status: Optional[int], content: bytes):
+        if not status or not 200 <= status < 300:
+            return
+        stats = self.endpoints.get(route)
+        if stats is None:
+            stats = self.endpoints[route] = EndpointPayloads()
+        stats.responses += 1
+        stats.total_bytes += len(content)
+        stats.max_bytes = max(stats.max_bytes, len(content))
+        if not content:
+            return
+        # Algorithm R: every response so far is in the reservoir with equal probability
+        if len(stats.reservoir) < self.samples:
+            stats.reservoir.append(content)
+        else:
+            slot = self.rng.randrange(stats.responses)
+            if slot < self.samples:
+                stats.reservoir[slot] = content
+
+    def _analyze(self, stats: EndpointPayloads):
+        """Parse and walk the sampled bodies (once; later calls reuse the result)"""
+        if stats.analyzed or not stats.reservoir:
+            return
+        for content in stats.reservoir:
+            try:
+                payload = json.loads(content)
+            except ValueError:
+                continue
+            stats.analyzed += 1
+            stats.bytes += len(content)
+            if isinstance(payload, list):
+                stats.rows += len(payload)
+            elif isinstance(payload, dict):
+                stats.rows += sum(len(v) for v in payload.values()
+                                  if isinstance(v, list) and v and isinstance(v[0], dict))
+            self._walk(payload, "", "", stats, {}, False)
+
+    def _walk(self, value: Any, path: str, relation: str, stats: EndpointPayloads,
+              seen: Dict[Any, bool], repeated: bool) -> int:
+        """Record the subtree at `path` and return its compact-JSON size"""
+        if isinstance(value, dict):
+            repeat = None
+            if relation and "id" in value and not repeated:
+                key = (relation, value["id"])
+                repeat = stats.repeats.get(path)
+                if repeat is None:
+                    repeat = stats.repeats[path] = RepeatStats()
+                repeat.objects += 1
+                repeated = key in seen
+                seen[key] = True
+            size = 1 + len(value)
+            for key, child in value.items():
+                if key in SENSITIVE_KEYS:
+                    stats.sensitive.add(f"{path}.{key}".lstrip("."))
+                size += len(key) + 3 + self._walk(child, f"{path}.{key}", key, stats,
+                                                  seen, repeated)
+            if repeat is not None and repeated:
+                repeat.repeats += 1
+                repeat.wasted += size
+                stats.wasted += size
+        elif isinstance(value, list):
+            size = 1 + max(1, len(value))
+            for item in value:
+                size += self._walk(item, f"{path}[]", relation, stats, seen, repeated)
+        else:
+            size = _scalar_size(value)
+
+        field = stats.fields.get(path)
+        if field is None:
+            field = stats.fields[path] = FieldStats()
+        field.bytes += size
+        field.count += 1
+        field.types.add(_type_name(value))
+        return size
+
+    def print_report(self, top_fields: int = 5, shapes: bool = False):
+        """Per endpoint: size, rows, bytes lost to repeated embeds and the heaviest fields"""
+        print("\n" + "=" * 60)
+        print("📦 PAYLOAD REPORT (per response)")
+        print("=" * 60)
+        header = (f"{'Endpoint':<36} {'count':>7} {'avg KB':>8} {'max KB':>8} {'rows':>6} "
+                  f"{'wasted KB':>10} {'waste%':>7} {'run MB':>8}")
+        print(header)
+        print("-" * len(header))
+        for route in sorted(self.endpoints):
+            stats = self.endpoints[route]
+            self._analyze(stats)
+            if not stats.analyzed:
+                continue
+            n = stats.analyzed
+            waste = 100.0 * stats.wasted / stats.bytes if stats.bytes else 0.0
+            # Scale the sampled waste share to every byte the run received
+            run_mb = waste / 100 * stats.total_bytes / 1_048_576
+            print(f"{route:<36} {stats.responses:>7} "
+                  f"{stats.total_bytes / stats.responses / 1024:>8.1f} "
+                  f"{stats.max_bytes / 1024:>8.1f} {stats.rows / n:>6.1f} "
+                  f"{stats.wasted / n / 1024:>10.1f} {waste:>7.1f} {run_mb:>8.1f}")
+            for path, repeat in sorted(stats.repeats.items(), key=lambda kv: -kv[1].wasted):
+                if repeat.repeats:
+                    print(f"   ↳ {path.lstrip('.')}: {repeat.repeats / n:.1f} of "
+                          f"{repeat.objects / n:.1f} per response are repeats, "
+                          f"{repeat.wasted / n / 1024:.1f} KB")
+            for path in sorted(stats.sensitive):
+                print(f"   ⚠️  exposes {path}")
+            heaviest = self._leaf_fields(stats)[:top_fields]
+            if heaviest:
+                print("   heaviest fields: " + ", ".join(
+                    f"{path.lstrip('.')} {field.bytes / n / 1024:.1f} KB" for path, field in heaviest))
+            if shapes:
+                for path in sorted(stats.fields):
+                    field = stats.fields[path]
+                    print(f"      {path.lstrip('.') or '$'}: {'|'.join(sorted(field.types))} "
+                          f"({field.count / n:.1f}×)")
+
+    @staticmethod
+    def _leaf_fields(stats: EndpointPayloads) -> List[Any]:
+        """Fields holding scalars or arrays of scalars, heaviest first"""
+        leaves = []
+        for path, field in stats.fields.items():
+            if not path or path.endswith("[]") or "object" in field.types:
+                continue
+            items = stats.fields.get(f"{path}[]")
+            if items is not None and "object" in items.types:
+                continue
+            leaves.append((path, field))
+        return sorted(leaves, key=lambda kv: -kv[1].bytes)
@@ -0,0 +1,254 @@
+#!/usr/bin/env python3
+"""
+Query Profile for the Rent My Vroom Load Tools
+Joins server-side query logs to client request samples by request ID and breaks latency down per endpoint
+"""
+
+import argparse
+import bisect
+import json
+import re
+from datetime import datetime
+from typing import Dict, Any, Iterator, List, Optional
+
+from latency_stats import LatencyHistogram
+
+# Sent on every request by make_request in backend_test and load_test; the backend's
+# RequestIdMiddleware echoes it and tags its Prisma operation log with it
+REQUEST_ID_HEADER = "X-Request-Id"
+
+# sqlcommenter-style tag, e.g. SELECT ... /*request_id='1760000000u3-17'*/
+_SQL_TAG = re.compile(r"request_id='?([\w.:-]+)")
+_PG_TIMESTAMP = re.compile(r"(\d{4}-\d\d-\d\d \d\d:\d\d:\d\d(?:\.\d+)?)(?: ([A-Z]{2,5}|[+-]\d\d(?::?\d\d)?))?")
+_PG_DURATION = re.compile(r"LOG:\s+duration: ([\d.]+) ms\s+(statement|execute|parse|bind)\b[^:]*:\s?(.*)")
+
+
+class RequestLog:
+    """Client half of the join: one JSON line per request with its ID, route and latency"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.file = open(path, "a", encoding="utf-8")
+
+    def write(self, request_id: str, route: str, status: Optional[int], sent_at: float,
+              latency_s: float):
+        self.file.write(json.dumps({
+            "requestId": request_id, "route": route, "status": status,
+            "sentAt": round(sent_at, 6), "latencyUs": int(latency_s * 1_000_000),
+        }) + "\n")
+
+    def close(self):
+        if not self.file.closed:
+            self.file.close()
+
+
+class QueryEvent:
+    """One server-side query: who issued it (if known), when it started and how long it took"""
+
+    __slots__ = ("request_id", "started", "duration_ms", "counted")
+
+    def __init__(self, request_id: Optional[str], started: Optional[float], duration_ms: float,
+                 counted: bool = True):
+        self.request_id = request_id
+        self.started = started
+        self.duration_ms = duration_ms
+        # parse/bind steps of the extended protocol add DB time but are not queries
+        self.counted = counted
+
+
+class RequestProfile:
+    """A client request and the queries attributed to it"""
+
+    __slots__ = ("request_id", "route", "status", "sent_at", "latency_us", "queries", "db_ms")
+
+    def __init__(self, record: Dict[str, Any]):
+        self.request_id = record["requestId"]
+        self.route = record["route"]
+        self.status = record.get("status")
+        self.sent_at = record["sentAt"]
+        self.latency_us = record["latencyUs"]
+        self.queries = 0
+        self.db_ms = 0.0
+
+
+def read_request_log(path: str) -> Dict[str, RequestProfile]:
+    requests = {}
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                profile = RequestProfile(json.loads(line))
+                requests[profile.request_id] = profile
+    return requests
+
+
+def _epoch(value: str, zone: Optional[str] = None) -> float:
+    """Seconds since the epoch for an ISO or Postgres log timestamp; no zone means local time"""
+    value = value.replace("Z", "+00:00")
+    if zone in ("UTC", "GMT"):
+        value += "+00:00"
+    elif zone and zone[0] in "+-":
+        value += zone if ":" in zone or len(zone) == 3 else f"{zone[:3]}:{zone[3:]}"
+    parsed = datetime.fromisoformat(value)
+    return parsed.timestamp()
+
+
+def parse_prisma_log(path: str) -> Iterator[QueryEvent]:
+    """Prisma JSON lines: the backend's QUERY_LOG_FILE or serialized $on('query') events
+
+    The backend log has one line per Prisma operation tagged with requestId;
+    an operation with an include can run several SQL statements. Raw query
+    events ({timestamp, duration, query}) are one line per statement but
+    carry no request ID, so they are attributed by time.
+    """
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            event = json.loads(line)
+            duration = event.get("durationMs", event.get("duration", 0))
+            request_id = event.get("requestId")
+            if request_id is None and "query" in event:
+                match = _SQL_TAG.search(event["query"])
+                request_id = match.group(1) if match else None
+            timestamp = event.get("timestamp")
+            yield QueryEvent(request_id, _epoch(timestamp) if timestamp else None, float(duration))
+
+
+def parse_postgres_log(path: str) -> Iterator[QueryEvent]:
+    """log_min_duration_statement output (set it to 0 to see every statement)
+
+    The line timestamp (log_line_prefix %m) is when the statement finished.
+    A statement carries a request ID only if the client tagged it with a
+    sqlcommenter comment; the rest are attributed by time.
+    """
+    with open(path, encoding="utf-8", errors="replace") as f:
+        for line in f:
+            match = _PG_DURATION.search(line)
+            if not match:
+                continue
+            duration_ms = float(match.group(1))
+            finished = _PG_TIMESTAMP.search(line[:match.start()])
+            started = (_epoch(finished.group(1), finished.group(2)) - duration_ms / 1000
+                       if finished else None)
+            tag = _SQL_TAG.search(match.group(3))
+            yield QueryEvent(tag.group(1) if tag else None, started, duration_ms,
+                             counted=match.group(2) in ("statement", "execute"))
+
+
+class QueryJoin:
+    """Attributes query events to client requests
+
+    Events carrying a request ID join directly. Untagged events are matched
+    to the request that was in flight when they started, but only when
+    exactly one was; run at --users 1 to attribute a plain Postgres log
+    completely. `clock_skew` (seconds, server minus client) shifts server
+    timestamps onto the client clock.
+    """
+
+    def __init__(self, requests: Dict[str, RequestProfile], clock_skew: float = 0.0):
+        self.requests = requests
+        self.clock_skew = clock_skew
+        self.by_start = sorted(requests.values(), key=lambda r: r.sent_at)
+        self.starts = [r.sent_at for r in self.by_start]
+        self.longest = max((r.latency_us for r in self.by_start), default=0) / 1_000_000
+        self.tagged = 0
+        self.timed = 0
+        self.unmatched = 0
+        self.unmatched_ms = 0.0
+
+    def _in_flight(self, at: float) -> List[RequestProfile]:
+        found = []
+        index = bisect.bisect_right(self.starts, at) - 1
+        while index >= 0 and self.starts[index] >= at - self.longest:
+            request = self.by_start[index]
+            if at <= request.sent_at + request.latency_us / 1_000_000:
+                found.append(request)
+                if len(found) > 1:
+                    break
+            index -= 1
+        return found
+
+    def add(self, event: QueryEvent):
+        request = self.requests.get(event.request_id) if event.request_id else None
+        if request is not None:
+            self.tagged += 1
+        elif event.request_id is None and event.started is not None:
+            candidates = self._in_flight(event.started - self.clock_skew)
+            if len(candidates) == 1:
+                request = candidates[0]
+                self.timed += 1
+        if request is None:
+            self.unmatched += 1
+            self.unmatched_ms += event.duration_ms
+            return
+        request.queries += event.counted
+        request.db_ms += event.duration_ms
+
+
+def print_breakdown(requests: Dict[str, RequestProfile], join: QueryJoin, slowest: int = 0):
+    """Client latency, queries and DB time per endpoint; the remainder is network plus Nest"""
+    routes: Dict[str, List[RequestProfile]] = {}
+    for request in requests.values():
+        routes.setdefault(request.route, []).append(request)
+
+    print("\n" + "=" * 60)
+    print("🔎 QUERY PROFILE (ms per request)")
+    print("=" * 60)
+    header = (f"{'Endpoint':<36} {'count':>7} {'p50':>8} {'p90':>8} {'queries':>8} "
+              f"{'max q':>6} {'DB':>8} {'DB p90':>8} {'other':>8} {'DB%':>5}")
+    print(header)
+    print("-" * len(header))
+    for route in sorted(routes):
+        rows = routes[route]
+        latency, db = LatencyHistogram(), LatencyHistogram()
+        for request in rows:
+            latency.record(request.latency_us)
+            db.record(int(request.db_ms * 1000))
+        mean_latency = latency.mean / 1000
+        mean_db = db.mean / 1000
+        share = 100.0 * mean_db / mean_latency if mean_latency else 0.0
+        print(f"{route:<36} {len(rows):>7} {latency.percentile(50) / 1000:>8.1f} "
+              f"{latency.percentile(90) / 1000:>8.1f} "
+              f"{sum(r.queries for r in rows) / len(rows):>8.1f} "
+              f"{max(r.queries for r in rows):>6} {mean_db:>8.1f} {db.percentile(90) / 1000:>8.1f} "
+              f"{max(0.0, mean_latency - mean_db):>8.1f} {share:>5.0f}")
+
+    print(f"\nQuery events: {join.tagged} joined by request ID, {join.timed} by time, "
+          f"{join.unmatched} unattributed ({join.unmatched_ms:.1f} ms)")
+
+    if slowest:
+        print(f"\nSlowest {slowest} requests:")
+        for request in sorted(requests.values(), key=lambda r: -r.latency_us)[:slowest]:
+            print(f"   {request.request_id:<24} {request.route:<36} "
+                  f"{request.latency_us / 1000:>8.1f} ms  {request.queries:>3} queries  "
+                  f"{request.db_ms:>8.1f} ms DB")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Join server query logs to load test requests")
+    parser.add_argument("request_log", help="client request log (load_test.py --request-log)")
+    # Both logs describe the same database work (one Prisma operation, several SQL
+    # statements), so joining them together would count it twice
+    sources = parser.add_mutually_exclusive_group(required=True)
+    sources.add_argument("--prisma-log", action="append", default=[],
+                         help="Prisma JSON lines log (backend QUERY_LOG_FILE or query events)")
+    sources.add_argument("--postgres-log", action="append", default=[],
+                         help="Postgres server log written with log_min_duration_statement")
+    parser.add_argument("--clock-skew", type=float, default=0.0,
+                        help="seconds the server clock is ahead of the client's")
+    parser.add_argument("--slowest", type=int, default=10, help="list the N slowest requests")
+    args = parser.parse_args()
+
+    requests = read_request_log(args.request_log)
+    join = QueryJoin(requests, args.clock_skew)
+    for path in args.prisma_log:
+        for event in parse_prisma_log(path):
+            join.add(event)
+    for path in args.postgres_log:
+        for event in parse_postgres_log(path):
+            join.add(event)
+    print_breakdown(requests, join, args.slowest)
+
+
+if __name__ == "__main__":
+    main()
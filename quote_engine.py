@@ -0,0 +1,336 @@
+#!/usr/bin/env python3
+"""
+Booking Quote Engine for Rent My Vroom
+Prices a whole vehicle catalog for rental windows in one vectorized NumPy pass
+"""
+
+import argparse
+import math
+import random
+import sys
+import time
+from datetime import datetime
+from decimal import Decimal, ROUND_HALF_UP
+from typing import Dict, Any, List, Optional, Sequence, Tuple
+
+import numpy as np
+import requests
+
+from token_pool import TokenPool
+
+DAY_MS = 86_400_000
+HOUR_MS = 3_600_000
+CENT = Decimal("0.01")
+
+# (billed days at least, percent off); the first tier that fits from the top wins
+DEFAULT_TIERS = ((3, 5.0), (7, 15.0), (28, 30.0))
+
+
+def to_cents(value: Any) -> int:
+    """Prisma Decimal (serialized as a string) or number -> integer cents"""
+    return int(Decimal(str(value)).quantize(CENT, ROUND_HALF_UP) * 100)
+
+
+def to_ms(value: str) -> int:
+    """ISO timestamp as the backend parses it (new Date(...).getTime())"""
+    return int(round(datetime.fromisoformat(value.replace("Z", "+00:00")).timestamp() * 1000))
+
+
+def backend_total(price_per_day: Any, start_ms: int, end_ms: int) -> Decimal:
+    """BookingsService.create today: Number(pricePerDay) * Math.ceil(ms / day)
+
+    Doubles in Python and JS are the same IEEE type, so the arithmetic is
+    reproduced exactly; Prisma hands the number's shortest repr to Postgres,
+    which rounds it half away from zero into Decimal(10, 2).
+    """
+    days = math.ceil((end_ms - start_ms) / DAY_MS)
+    return Decimal(repr(float(price_per_day) * days)).quantize(CENT, ROUND_HALF_UP)
+
+
+class PricingPolicy:
+    """How a rental window turns into a price
+
+    legacy reproduces the backend: every started day at the day rate, hour
+    rate ignored. Otherwise whole days are billed at the day rate and the
+    leftover hours (after `grace_minutes`) at the hour rate, capped at one
+    day; `tiers` then take a percentage off by billed days.
+    """
+
+    def __init__(self, legacy: bool = False, grace_minutes: int = 0,
+                 tiers: Sequence[Tuple[int, float]] = DEFAULT_TIERS):
+        self.legacy = legacy
+        self.grace_ms = grace_minutes * 60_000
+        ordered = sorted(tiers)
+        self.tier_days = np.array([0] + [days for days, _ in ordered], dtype=np.int64)
+        self.tier_bp = np.array([0] + [int(round(percent * 100)) for _, percent in ordered],
+                                dtype=np.int64)
+
+    @classmethod
+    def named(cls, name: str, grace_minutes: int = 0,
+              tiers: Optional[Sequence[Tuple[int, float]]] = None) -> "PricingPolicy":
+        if name == "legacy":
+            return cls(legacy=True)
+        if name == "hourly":
+            return cls(grace_minutes=grace_minutes,
+                       tiers=DEFAULT_TIERS if tiers is None else tiers)
+        raise ValueError(f"Unknown pricing policy: {name}")
+
+    def discount_bp(self, billed_days: int) -> int:
+        return int(self.tier_bp[np.searchsorted(self.tier_days, billed_days, side="right") - 1])
+
+
+class VehicleCatalog:
+    """Vehicle rates as parallel int64 arrays of cents"""
+
+    def __init__(self, ids: np.ndarray, hour_cents: np.ndarray, day_cents: np.ndarray):
+        self.ids = ids
+        self.hour_cents = hour_cents
+        self.day_cents = day_cents
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    @classmethod
+    def from_records(cls, vehicles: List[Dict[str, Any]]) -> "VehicleCatalog":
+        return cls(np.array([v["id"] for v in vehicles], dtype=np.int64),
+                   np.array([to_cents(v["pricePerHour"]) for v in vehicles], dtype=np.int64),
+                   np.array([to_cents(v["pricePerDay"]) for v in vehicles], dtype=np.int64))
+
+    @classmethod
+    def synthetic(cls, count: int, seed: int = 0) -> "VehicleCatalog":
+        rng = np.random.default_rng(seed)
+        day_cents = rng.integers(1_500, 50_000, count, dtype=np.int64)
+        # Roughly a sixth of the day rate per hour; some listings have no hour rate
+        hour_cents = day_cents // rng.integers(4, 9, count) * (rng.random(count) > 0.1)
+        return cls(np.arange(1, count + 1, dtype=np.int64), hour_cents.astype(np.int64),
+                   day_cents)
+
+
+class QuoteEngine:
+    """Quotes every vehicle of a catalog at once; totals are integer cents"""
+
+    def __init__(self, catalog: VehicleCatalog, policy: PricingPolicy):
+        self.catalog = catalog
+        self.policy = policy
+
+    def quote(self, start_ms: int, end_ms: int) -> np.ndarray:
+        """Price of every vehicle for one window"""
+        return self.quote_windows(np.array([start_ms]), np.array([end_ms]))[0]
+
+    def quote_windows(self, starts_ms: np.ndarray, ends_ms: np.ndarray) -> np.ndarray:
+        """windows x vehicles matrix of prices"""
+        duration = (np.asarray(ends_ms, dtype=np.int64)
+                    - np.asarray(starts_ms, dtype=np.int64))[:, None]
+        day = self.catalog.day_cents[None, :]
+        if self.policy.legacy:
+            return -(-duration // DAY_MS) * day
+        if (duration <= 0).any():
+            raise ValueError("Rental windows must end after they start")
+
+        hour = self.catalog.hour_cents[None, :]
+        full_days = duration // DAY_MS
+        leftover = duration - full_days * DAY_MS - self.policy.grace_ms
+        hours = np.maximum(0, -(-leftover // HOUR_MS))
+        # No hour rate: a started day costs a day
+        partial = np.where(hour > 0, np.minimum(hours * hour, day), (hours > 0) * day)
+        base = full_days * day + partial
+
+        billed_days = full_days + (hours > 0)
+        tier = np.searchsorted(self.policy.tier_days, billed_days, side="right") - 1
+        keep = 10_000 - self.policy.tier_bp[tier]
+        return (base * keep + 5_000) // 10_000
+
+
+def quote_row(hour_cents: int, day_cents: int, start_ms: int, end_ms: int,
+              policy: PricingPolicy) -> int:
+    """One vehicle, one window: the per-row formula the engine vectorizes"""
+    duration = end_ms - start_ms
+    if policy.legacy:
+        return math.ceil(duration / DAY_MS) * day_cents
+    full_days, leftover = divmod(duration, DAY_MS)
+    hours = max(0, math.ceil((leftover - policy.grace_ms) / HOUR_MS))
+    if hour_cents > 0:
+        partial = min(hours * hour_cents, day_cents)
+    else:
+        partial = day_cents if hours else 0
+    base = full_days * day_cents + partial
+    keep = 10_000 - policy.discount_bp(full_days + (hours > 0))
+    return (base * keep + 5_000) // 10_000
+
+
+def random_windows(count: int, seed: int = 0) -> Tuple[np.ndarray, np.ndarray]:
+    """Windows with the awkward lengths mixed in: exact days, a millisecond either side, sub-day"""
+    rng = random.Random(seed)
+    base = to_ms("2026-01-01T00:00:00Z")
+    starts, ends = [], []
+    for _ in range(count):
+        start = base + rng.randrange(0, 365 * DAY_MS, 60_000)
+        days = rng.randint(0, 40)
+        length = rng.choice([days * DAY_MS, days * DAY_MS + 1, days * DAY_MS - 1,
+                             days * DAY_MS + rng.randrange(1, DAY_MS),
+                             rng.randrange(1, 12) * HOUR_MS, rng.randrange(1, DAY_MS)])
+        starts.append(start)
+        ends.append(start + max(1, length))
+    return np.array(starts, dtype=np.int64), np.array(ends, dtype=np.int64)
+
+
+def sample_records(count: int, seed: int = 0) -> List[Dict[str, Any]]:
+    """Vehicle records with Decimal(10, 2) strings as the API serializes them,
+    cheap and odd prices included"""
+    rng = random.Random(seed)
+    day_prices = [f"{rng.randint(1, 500_000) / 100:.2f}" for _ in range(max(0, count - 3))]
+    day_prices += ["0.01", "49.99", "33.33"][:count]
+    return [{"id": i + 1, "pricePerDay": price,
+             "pricePerHour": f"{to_cents(price) // 6 / 100:.2f}"}
+            for i, price in enumerate(day_prices)]
+
+
+def self_check(vehicles: int = 2_000, windows: int = 200, seed: int = 0) -> int:
+    """Differential check: legacy engine vs the backend formula, hourly engine vs quote_row
+
+    tests/test_quote_engine.py runs the same comparisons at small sizes.
+    """
+    records = sample_records(vehicles, seed)
+    catalog = VehicleCatalog.from_records(records)
+    starts, ends = random_windows(windows, seed)
+
+    mismatches = 0
+    legacy = QuoteEngine(catalog, PricingPolicy.named("legacy")).quote_windows(starts, ends)
+    for w in range(windows):
+        for v, record in enumerate(records):
+            expected = backend_total(record["pricePerDay"], int(starts[w]), int(ends[w]))
+            if int(expected * 100) != legacy[w, v]:
+                mismatches += 1
+                if mismatches <= 5:
+                    print(f"❌ legacy: {record['pricePerDay']}/day for {ends[w] - starts[w]} ms: "
+                          f"backend {expected}, engine {legacy[w, v] / 100:.2f}")
+    print(f"legacy vs backend formula: {windows * vehicles} quotes, {mismatches} mismatches")
+
+    policy = PricingPolicy.named("hourly", grace_minutes=30)
+    hourly = QuoteEngine(catalog, policy).quote_windows(starts, ends)
+    row_mismatches = 0
+    for w in range(windows):
+        for v in range(vehicles):
+            expected = quote_row(int(catalog.hour_cents[v]), int(catalog.day_cents[v]),
+                                 int(starts[w]), int(ends[w]), policy)
+            row_mismatches += expected != hourly[w, v]
+    print(f"hourly vs per-row formula: {windows * vehicles} quotes, {row_mismatches} mismatches")
+    return mismatches + row_mismatches
+
+
+def benchmark(vehicles: int, windows: int, policy: PricingPolicy, seed: int = 0):
+    """Per-row loop vs one vectorized pass per window vs one pass for all windows"""
+    catalog = VehicleCatalog.synthetic(vehicles, seed)
+    engine = QuoteEngine(catalog, policy)
+    starts, ends = random_windows(windows, seed)
+    hours, days = catalog.hour_cents.tolist(), catalog.day_cents.tolist()
+
+    started = time.perf_counter()
+    rows = [[quote_row(h, d, int(s), int(e), policy) for h, d in zip(hours, days)]
+            for s, e in zip(starts, ends)]
+    per_row = time.perf_counter() - started
+
+    started = time.perf_counter()
+    vectorized = [engine.quote(int(s), int(e)) for s, e in zip(starts, ends)]
+    per_window = time.perf_counter() - started
+
+    started = time.perf_counter()
+    batched = engine.quote_windows(starts, ends)
+    batch = time.perf_counter() - started
+
+    assert all(np.array_equal(np.array(r), v) for r, v in zip(rows, vectorized))
+    assert np.array_equal(np.array(vectorized), batched)
+    quotes = vehicles * windows
+    print(f"{'legacy' if policy.legacy else 'hourly'} policy, {vehicles} vehicles x {windows} windows")
+    for name, elapsed in (("per-row loop", per_row), ("vectorized per window", per_window),
+                          ("vectorized batch", batch)):
+        print(f"   {name:<22} {elapsed * 1000:>9.1f} ms  {quotes / elapsed / 1e6:>8.2f} M quotes/s  "
+              f"{per_row / elapsed:>7.1f}x")
+
+
+def fetch_catalog(base_url: str) -> VehicleCatalog:
+    response = requests.get(f"{base_url}/vehicles", timeout=60)
+    response.raise_for_status()
+    return VehicleCatalog.from_records(response.json())
+
+
+def verify_bookings(base_url: str, pool: TokenPool, merchants: int) -> int:
+    """Re-quote stored bookings with the legacy policy and compare to their totalPrice
+
+    A booking whose vehicle was repriced after it was made shows up as a
+    mismatch too; the report prints both prices so that case stands out.
+    """
+    legacy = PricingPolicy.named("legacy")
+    checked = mismatches = 0
+    for index in range(min(merchants, len(pool.entries["merchant"]))):
+        token = pool.lease("merchant", index)["accessToken"]
+        response = requests.get(f"{base_url}/bookings/merchant", timeout=60,
+                                headers={"Authorization": f"Bearer {token}"})
+        response.raise_for_status()
+        for booking in response.json():
+            quoted = quote_row(0, to_cents(booking["vehicle"]["pricePerDay"]),
+                               to_ms(booking["startDate"]), to_ms(booking["endDate"]), legacy)
+            checked += 1
+            if to_cents(booking["totalPrice"]) != quoted:
+                mismatches += 1
+                print(f"❌ booking {booking['id']}: stored {booking['totalPrice']}, "
+                      f"quoted {quoted / 100:.2f} at {booking['vehicle']['pricePerDay']}/day")
+    print(f"Re-quoted {checked} stored bookings, {mismatches} mismatches")
+    return mismatches
+
+
+def _tier(value: str) -> Tuple[int, float]:
+    days, percent = value.split(":")
+    return int(days), float(percent)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Price the vehicle catalog for rental windows")
+    sub = parser.add_subparsers(dest="command", required=True)
+    quote = sub.add_parser("quote", help="price every listed vehicle for one window")
+    quote.add_argument("start", help="ISO start, e.g. 2026-11-01T10:00:00Z")
+    quote.add_argument("end", help="ISO end")
+    quote.add_argument("--base-url", default="http://localhost:4000")
+    quote.add_argument("--top", type=int, default=10, help="show the N cheapest vehicles")
+    bench = sub.add_parser("bench", help="vectorized engine vs the per-row formula")
+    bench.add_argument("--vehicles", type=int, default=20_000)
+    bench.add_argument("--windows", type=int, default=20)
+    check = sub.add_parser("selfcheck", help="differential check against the backend formula")
+    check.add_argument("--vehicles", type=int, default=2_000)
+    check.add_argument("--windows", type=int, default=200)
+    verify = sub.add_parser("verify", help="re-quote bookings stored by a running backend")
+    verify.add_argument("--base-url", default="http://localhost:4000")
+    verify.add_argument("--token-pool", required=True, help="token pool file (see token_pool.py)")
+    verify.add_argument("--merchants", type=int, default=5, help="merchants whose bookings to check")
+    for command in (quote, bench):
+        command.add_argument("--policy", choices=["legacy", "hourly"], default="hourly")
+        command.add_argument("--grace", type=int, default=0,
+                             help="minutes past a whole day or hour that are not billed")
+        command.add_argument("--tier", type=_tier, action="append", metavar="DAYS:PERCENT",
+                             help=f"multi-day discount (default {DEFAULT_TIERS})")
+    for command in (bench, check):
+        command.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    if args.command == "selfcheck":
+        sys.exit(1 if self_check(args.vehicles, args.windows, args.seed) else 0)
+    if args.command == "verify":
+        pool = TokenPool(args.token_pool, args.base_url)
+        sys.exit(1 if verify_bookings(args.base_url, pool, args.merchants) else 0)
+
+    policy = PricingPolicy.named(args.policy, args.grace, args.tier)
+    if args.command == "bench":
+        benchmark(args.vehicles, args.windows, policy, args.seed)
+        return
+
+    catalog = fetch_catalog(args.base_url)
+    started = time.perf_counter()
+    totals = QuoteEngine(catalog, policy).quote(to_ms(args.start), to_ms(args.end))
+    elapsed = time.perf_counter() - started
+    print(f"Priced {len(catalog)} vehicles in {elapsed * 1000:.2f} ms ({args.policy} policy)")
+    for index in np.argsort(totals, kind="stable")[:args.top]:
+        print(f"   vehicle {catalog.ids[index]:>8}  {totals[index] / 100:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,510 @@
+#!/usr/bin/env python3
+"""
+Rating Aggregate Cache for Rent My Vroom
+Per-merchant and per-vehicle rating sums, counts and star histograms, rebuilt from a dump and updated per review
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import os
+import threading
+import time
+from array import array
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Any, Iterable
+
+import aiohttp
+import numpy as np
+import requests
+
+from latency_stats import LatencyHistogram
+from stub_backend import StubBackend
+
+STARS = 5
+# count, sum, then one histogram column per star
+COLUMNS = 2 + STARS
+
+
+def js_round_tenth(value: float) -> float:
+    """Math.round(value * 10) / 10, as ReviewsService.findByMerchant rounds averageRating"""
+    return math.floor(value * 10 + 0.5) / 10
+
+
+def _grown(values: np.ndarray, needed: int) -> np.ndarray:
+    """values padded with zeros to at least `needed` rows, doubling to keep appends cheap"""
+    if needed <= len(values):
+        return values
+    grown = np.zeros((max(needed, 2 * len(values)),) + values.shape[1:], dtype=values.dtype)
+    grown[:len(values)] = values
+    return grown
+
+
+class RatingTable:
+    """Rating aggregates of many entities in one int64 array, row = entity id
+
+    Ids are dense serial keys, so direct indexing beats a hash map: a lookup
+    is one row read and a rebuild is one bincount per column.
+    """
+
+    def __init__(self, capacity: int = 1024):
+        self.rows = np.zeros((capacity, COLUMNS), dtype=np.int64)
+
+    def add(self, entity_id: int, rating: int, sign: int = 1):
+        self.rows = _grown(self.rows, entity_id + 1)
+        row = self.rows[entity_id]
+        row[0] += sign
+        row[1] += sign * rating
+        row[1 + rating] += sign
+
+    def add_many(self, entity_ids: np.ndarray, ratings: np.ndarray):
+        """Fold a batch of ratings in; ids of 0 (unknown owner) are skipped"""
+        known = entity_ids > 0
+        entity_ids, ratings = entity_ids[known], ratings[known]
+        if not len(entity_ids):
+            return
+        size = int(entity_ids.max()) + 1
+        self.rows = _grown(self.rows, size)
+        cells = np.bincount(entity_ids * COLUMNS + 1 + ratings, minlength=size * COLUMNS)
+        histogram = cells.reshape(size, COLUMNS)
+        histogram[:, 0] = histogram[:, 2:].sum(axis=1)
+        histogram[:, 1] = histogram[:, 2:] @ np.arange(1, STARS + 1)
+        self.rows[:size] += histogram
+
+    def get(self, entity_id: int) -> Dict[str, Any]:
+        if 0 < entity_id < len(self.rows):
+            count, total, *histogram = self.rows[entity_id].tolist()
+        else:
+            count, total, histogram = 0, 0, [0] * STARS
+        return {"averageRating": js_round_tenth(total / count) if count else 0,
+                "totalReviews": count, "ratingSum": total,
+                "histogram": dict(zip(range(1, STARS + 1), histogram))}
+
+
+class RatingCache:
+    """Merchant and vehicle rating tables plus the maps that route a review to them
+
+    A review row only knows its booking, so bookingId -> (merchantId,
+    vehicleId) is kept as two arrays. The rating applied for each review id
+    is remembered too: a redelivered review is a no-op, a changed rating
+    moves one star, and a delete can be reversed exactly.
+    """
+
+    def __init__(self):
+        self.merchants = RatingTable()
+        self.vehicles = RatingTable()
+        self.booking_merchant = np.zeros(1024, dtype=np.int32)
+        self.booking_vehicle = np.zeros(1024, dtype=np.int32)
+        self.review_booking = np.zeros(1024, dtype=np.int32)
+        self.review_rating = np.zeros(1024, dtype=np.int8)
+        self.lock = threading.Lock()
+
+    @classmethod
+    def from_dump(cls, directory: str) -> "RatingCache":
+        """seed_data.py COPY output: one pass over Booking.copy, one over Review.copy"""
+        cache = cls()
+        ids, merchants, vehicles = array("i"), array("i"), array("i")
+        with open(os.path.join(directory, "Booking.copy"), encoding="utf-8") as f:
+            for line in f:
+                booking_id, _, merchant_id, vehicle_id, _ = line.split("\t", 4)
+                ids.append(int(booking_id))
+                merchants.append(int(merchant_id))
+                vehicles.append(int(vehicle_id))
+        cache.add_bookings(np.frombuffer(ids, dtype=np.int32),
+                           np.frombuffer(merchants, dtype=np.int32),
+                           np.frombuffer(vehicles, dtype=np.int32))
+        ids, bookings, ratings = array("i"), array("i"), array("b")
+        with open(os.path.join(directory, "Review.copy"), encoding="utf-8") as f:
+            for line in f:
+                review_id, booking_id, _, rating, _ = line.split("\t", 4)
+                ids.append(int(review_id))
+                bookings.append(int(booking_id))
+                ratings.append(int(rating))
+        cache.add_reviews(np.frombuffer(ids, dtype=np.int32),
+                          np.frombuffer(bookings, dtype=np.int32),
+                          np.frombuffer(ratings, dtype=np.int8))
+        return cache
+
+    def add_bookings(self, booking_ids: np.ndarray, merchant_ids: np.ndarray,
+                     vehicle_ids: np.ndarray):
+        size = int(booking_ids.max()) + 1 if len(booking_ids) else 0
+        self.booking_merchant = _grown(self.booking_merchant, size)
+        self.booking_vehicle = _grown(self.booking_vehicle, size)
+        self.booking_merchant[booking_ids] = merchant_ids
+        self.booking_vehicle[booking_ids] = vehicle_ids
+
+    def add_reviews(self, review_ids: np.ndarray, booking_ids: np.ndarray, ratings: np.ndarray):
+        """Bulk path for the rebuild; reviews already applied are left alone"""
+        if not len(review_ids):
+            return
+        with self.lock:
+            self.review_booking = _grown(self.review_booking, int(review_ids.max()) + 1)
+            self.review_rating = _grown(self.review_rating, len(self.review_booking))
+            fresh = self.review_rating[review_ids] == 0
+            review_ids, booking_ids = review_ids[fresh], booking_ids[fresh]
+            ratings = ratings[fresh].astype(np.int64)
+            self.review_booking[review_ids] = booking_ids
+            self.review_rating[review_ids] = ratings
+            # Reviews of bookings this cache never saw count as owner 0 and are skipped
+            booking_ids = np.where(booking_ids < len(self.booking_merchant), booking_ids, 0)
+            self.merchants.add_many(self.booking_merchant[booking_ids].astype(np.int64), ratings)
+            self.vehicles.add_many(self.booking_vehicle[booking_ids].astype(np.int64), ratings)
+
+    def apply(self, review: Dict[str, Any]) -> bool:
+        """One review as POST /reviews returns it, a Review row, or {"op": "delete", "id": ...}
+
+        Returns False when the review's booking is unknown (and it carries no
+        booking.merchantId/vehicleId to learn it from). A rating outside
+        1..STARS raises ValueError, as CreateReviewDto's @Min/@Max reject it.
+        """
+        with self.lock:
+            if review.get("op") == "delete":
+                self._set(int(review["id"]), 0, 0)
+                return True
+            rating = int(review["rating"])
+            if not 1 <= rating <= STARS:
+                raise ValueError(f"rating must be between 1 and {STARS}, got {rating}")
+            booking = review.get("booking") or {}
+            booking_id = int(review["bookingId"])
+            if "merchantId" in booking:
+                self.add_bookings(np.array([booking_id]), np.array([booking["merchantId"]]),
+                                  np.array([booking["vehicleId"]]))
+            if booking_id >= len(self.booking_merchant) or not self.booking_merchant[booking_id]:
+                return False
+            self._set(int(review["id"]), booking_id, rating)
+            return True
+
+    def _set(self, review_id: int, booking_id: int, rating: int):
+        self.review_booking = _grown(self.review_booking, review_id + 1)
+        self.review_rating = _grown(self.review_rating, len(self.review_booking))
+        old_rating = int(self.review_rating[review_id])
+        if old_rating:
+            old_booking = int(self.review_booking[review_id])
+            self.merchants.add(int(self.booking_merchant[old_booking]), old_rating, -1)
+            self.vehicles.add(int(self.booking_vehicle[old_booking]), old_rating, -1)
+        if rating:
+            self.merchants.add(int(self.booking_merchant[booking_id]), rating)
+            self.vehicles.add(int(self.booking_vehicle[booking_id]), rating)
+        self.review_booking[review_id] = booking_id
+        self.review_rating[review_id] = rating
+
+    def merchant(self, merchant_id: int) -> Dict[str, Any]:
+        return self.merchants.get(merchant_id)
+
+    def vehicle(self, vehicle_id: int) -> Dict[str, Any]:
+        return self.vehicles.get(vehicle_id)
+
+    def save(self, path: str):
+        with self.lock:
+            np.savez(path, merchants=self.merchants.rows, vehicles=self.vehicles.rows,
+                     booking_merchant=self.booking_merchant, booking_vehicle=self.booking_vehicle,
+                     review_booking=self.review_booking, review_rating=self.review_rating)
+
+    @classmethod
+    def load(cls, path: str) -> "RatingCache":
+        cache = cls()
+        with np.load(path) as arrays:
+            cache.merchants.rows = arrays["merchants"]
+            cache.vehicles.rows = arrays["vehicles"]
+            cache.booking_merchant = arrays["booking_merchant"]
+            cache.booking_vehicle = arrays["booking_vehicle"]
+            cache.review_booking = arrays["review_booking"]
+            cache.review_rating = arrays["review_rating"]
+        return cache
+
+
+def apply_feed(cache: RatingCache, lines: Iterable[str]) -> int:
+    """JSON lines of reviews (see RatingCache.apply); returns how many were applied"""
+    applied = 0
+    for line in lines:
+        if line.strip():
+            applied += cache.apply(json.loads(line))
+    return applied
+
+
+class RatingServer:
+    """GET /ratings/merchant/{id} and /ratings/vehicle/{id}; POST /reviews applies a review"""
+
+    def __init__(self, cache: RatingCache, port: int, host: str = "127.0.0.1"):
+        server = self
+        self.cache = cache
+
+        class Handler(BaseHTTPRequestHandler):
+            def _send(self, status: int, data: Any):
+                body = json.dumps(data).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_GET(self):
+                parts = self.path.split("?", 1)[0].strip("/").split("/")
+                if len(parts) != 3 or parts[0] != "ratings" or not parts[2].isdigit():
+                    self._send(404, {"statusCode": 404, "message": "Not Found"})
+                elif parts[1] == "merchant":
+                    self._send(200, server.cache.merchant(int(parts[2])))
+                elif parts[1] == "vehicle":
+                    self._send(200, server.cache.vehicle(int(parts[2])))
+                else:
+                    self._send(404, {"statusCode": 404, "message": "Not Found"})
+
+            def do_POST(self):
+                if self.path.split("?", 1)[0] != "/reviews":
+                    self._send(404, {"statusCode": 404, "message": "Not Found"})
+                    return
+                try:
+                    review = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))))
+                    applied = server.cache.apply(review)
+                except (ValueError, KeyError, TypeError) as e:
+                    self._send(400, {"statusCode": 400, "message": str(e)})
+                    return
+                self._send(200 if applied else 404, {"applied": applied})
+
+            def log_message(self, format, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer((host, port), Handler)
+        self.httpd.daemon_threads = True
+        self.port = self.httpd.server_address[1]
+
+    def serve_forever(self):
+        self.httpd.serve_forever()
+
+
+def synthetic_reviews(merchants: int, per_merchant: int, vehicles_per_merchant: int = 40,
+                      seed: int = 0):
+    """(review ids, booking ids, merchant ids, vehicle ids, ratings), skewed toward 4-5 stars"""
+    rng = np.random.default_rng(seed)
+    count = merchants * per_merchant
+    merchant_ids = np.repeat(np.arange(1, merchants + 1, dtype=np.int32), per_merchant)
+    vehicle_ids = ((merchant_ids - 1) * vehicles_per_merchant + 1
+                   + rng.integers(0, vehicles_per_merchant, count)).astype(np.int32)
+    ratings = (rng.choice(STARS, count, p=[0.04, 0.06, 0.15, 0.35, 0.40]) + 1).astype(np.int8)
+    ids = np.arange(1, count + 1, dtype=np.int32)
+    return ids, ids.copy(), merchant_ids, vehicle_ids, ratings
+
+
+def _fill_stub(backend: StubBackend, merchants: int, review_ids, booking_ids, merchant_ids,
+               vehicle_ids, ratings):
+    """Load the synthetic reviews straight into the stand-in backend's tables"""
+    store = backend.store
+    stamp = "2026-01-01T00:00:00.000Z"
+    renter_id = merchants + 1
+    for user_id in range(1, merchants + 2):
+        store.users[user_id] = {"id": user_id, "firstName": "Seed", "lastName": str(user_id),
+                                "role": "MERCHANT" if user_id <= merchants else "RENTER"}
+    for vehicle_id, merchant_id in zip(vehicle_ids.tolist(), merchant_ids.tolist()):
+        if vehicle_id not in store.vehicles:
+            store.vehicles[vehicle_id] = {"id": vehicle_id, "merchantId": merchant_id,
+                                          "make": "Toyota", "model": "Corolla", "year": 2022}
+    for review_id, booking_id, merchant_id, vehicle_id, rating in zip(
+            review_ids.tolist(), booking_ids.tolist(), merchant_ids.tolist(),
+            vehicle_ids.tolist(), ratings.tolist()):
+        store.bookings[booking_id] = {
+            "id": booking_id, "renterId": renter_id, "merchantId": merchant_id,
+            "vehicleId": vehicle_id, "startDate": stamp, "endDate": stamp, "totalPrice": 100.0,
+            "status": "COMPLETED", "renterNotes": None, "merchantNotes": None,
+            "createdAt": stamp, "updatedAt": stamp, "acceptedAt": stamp, "rejectedAt": None,
+            "completedAt": stamp}
+        store.reviews_by_booking[booking_id] = {
+            "id": review_id, "bookingId": booking_id, "reviewerId": renter_id, "rating": rating,
+            "comment": "Smooth pickup", "createdAt": stamp, "updatedAt": stamp}
+
+
+async def _time_endpoint(base_url: str, merchant_ids, requests_per_merchant: int):
+    timings, results = LatencyHistogram(), {}
+    async with aiohttp.ClientSession() as session:
+        for merchant_id in merchant_ids:
+            for _ in range(requests_per_merchant):
+                started = time.perf_counter()
+                async with session.get(f"{base_url}/reviews/merchant/{merchant_id}") as response:
+                    payload = await response.json()
+                timings.record(int((time.perf_counter() - started) * 1_000_000))
+            results[merchant_id] = payload
+    return timings, results
+
+
+def benchmark(merchants: int, per_merchant: int, lookups: int, updates: int,
+              endpoint_requests: int, seed: int = 0):
+    """Rebuild, incremental updates and lookups vs GET /reviews/merchant/:id on the stand-in"""
+    review_ids, booking_ids, merchant_ids, vehicle_ids, ratings = synthetic_reviews(
+        merchants, per_merchant, seed=seed)
+    print(f"{merchants} merchants x {per_merchant:,} reviews = {len(review_ids):,} reviews")
+
+    started = time.perf_counter()
+    cache = RatingCache()
+    cache.add_bookings(booking_ids, merchant_ids, vehicle_ids)
+    cache.add_reviews(review_ids, booking_ids, ratings)
+    print(f"Rebuilt in {(time.perf_counter() - started) * 1000:.1f} ms")
+
+    timings = {}
+    lookup_times = LatencyHistogram()
+    for n in range(lookups):
+        t0 = time.perf_counter()
+        cache.merchant(1 + n % merchants)
+        lookup_times.record(int((time.perf_counter() - t0) * 1_000_000))
+    timings["cache lookup"] = lookup_times
+
+    # The endpoint's own arithmetic, without the query, joins or JSON: a reduce over the rows
+    rows = [{"rating": int(r)} for r in ratings[merchant_ids == 1]]
+    reduce_times = LatencyHistogram()
+    for _ in range(5):
+        t0 = time.perf_counter()
+        total = sum(review["rating"] for review in rows)
+        js_round_tenth(total / len(rows))
+        reduce_times.record(int((time.perf_counter() - t0) * 1_000_000))
+    timings["reduce over rows"] = reduce_times
+
+    backend = StubBackend()
+    _fill_stub(backend, merchants, review_ids, booking_ids, merchant_ids, vehicle_ids, ratings)
+
+    async def run_endpoint():
+        base_url = await backend.start()
+        try:
+            return await _time_endpoint(base_url, range(1, merchants + 1), endpoint_requests)
+        finally:
+            await backend.stop()
+
+    timings["GET /reviews/merchant"], responses = asyncio.run(run_endpoint())
+    mismatches = 0
+    for merchant_id, payload in responses.items():
+        cached = cache.merchant(merchant_id)
+        if (cached["totalReviews"], cached["averageRating"]) != (payload["totalReviews"],
+                                                                 payload["averageRating"]):
+            mismatches += 1
+            print(f"❌ merchant {merchant_id}: endpoint {payload['averageRating']} over "
+                  f"{payload['totalReviews']}, cache {cached['averageRating']} over "
+                  f"{cached['totalReviews']}")
+
+    rng = np.random.default_rng(seed + 1)
+    update_times = LatencyHistogram()
+    next_review = len(review_ids) + 1
+    for n in range(updates):
+        if n % 4 == 3:
+            # A rating edit on an existing review
+            review = {"id": int(rng.integers(1, next_review)), "rating": int(rng.integers(1, 6))}
+            review["bookingId"] = int(cache.review_booking[review["id"]])
+        else:
+            booking_id = int(rng.integers(1, len(booking_ids) + 1))
+            review = {"id": next_review, "bookingId": booking_id, "rating": int(rng.integers(1, 6))}
+            next_review += 1
+        t0 = time.perf_counter()
+        cache.apply(review)
+        update_times.record(int((time.perf_counter() - t0) * 1_000_000))
+    timings["incremental apply"] = update_times
+
+    # Incremental state must equal a rebuild from the reviews it now holds
+    rebuilt = RatingCache()
+    rebuilt.add_bookings(booking_ids, merchant_ids, vehicle_ids)
+    live = np.flatnonzero(cache.review_rating).astype(np.int32)
+    rebuilt.add_reviews(live, cache.review_booking[live], cache.review_rating[live])
+    for name in ("merchants", "vehicles"):
+        ours, theirs = getattr(cache, name).rows, getattr(rebuilt, name).rows
+        size = max(len(ours), len(theirs))
+        if not np.array_equal(_grown(ours, size)[1:size], _grown(theirs, size)[1:size]):
+            mismatches += 1
+            print(f"❌ {name} drifted from a rebuild after {updates} updates")
+
+    print(f"{'operation':<24} {'n':>7} {'p50 µs':>11} {'p99 µs':>11} {'max µs':>11}")
+    for name, h in timings.items():
+        print(f"{name:<24} {h.count:>7} {h.percentile(50):>11,} {h.percentile(99):>11,} "
+              f"{h.max:>11,}")
+    endpoint = timings["GET /reviews/merchant"].percentile(50)
+    print(f"Endpoint vs cache at p50: {endpoint / max(1, lookup_times.percentile(50)):,.0f}x; "
+          f"{mismatches} merchants disagree")
+    return mismatches
+
+
+def verify(base_url: str, merchant_ids: Iterable[int]) -> int:
+    """Build the cache from a running backend's review lists and compare its aggregates"""
+    cache, fetched, mismatches = RatingCache(), {}, 0
+    endpoint_times, lookup_times = LatencyHistogram(), LatencyHistogram()
+    for merchant_id in merchant_ids:
+        started = time.perf_counter()
+        response = requests.get(f"{base_url}/reviews/merchant/{merchant_id}", timeout=300)
+        endpoint_times.record(int((time.perf_counter() - started) * 1_000_000))
+        response.raise_for_status()
+        fetched[merchant_id] = payload = response.json()
+        for review in payload["reviews"]:
+            cache.apply(review)
+    for merchant_id, payload in fetched.items():
+        started = time.perf_counter()
+        cached = cache.merchant(merchant_id)
+        lookup_times.record(int((time.perf_counter() - started) * 1_000_000))
+        if (cached["totalReviews"], cached["averageRating"]) != (payload["totalReviews"],
+                                                                 payload["averageRating"]):
+            mismatches += 1
+            print(f"❌ merchant {merchant_id}: endpoint {payload['averageRating']} over "
+                  f"{payload['totalReviews']}, cache {cached['averageRating']} over "
+                  f"{cached['totalReviews']}")
+    print(f"Checked {len(fetched)} merchants, {mismatches} mismatches; endpoint p50 "
+          f"{endpoint_times.percentile(50) / 1000:.1f} ms, cache p50 "
+          f"{lookup_times.percentile(50)} µs")
+    return mismatches
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Merchant and vehicle rating aggregates")
+    sub = parser.add_subparsers(dest="command", required=True)
+    rebuild = sub.add_parser("rebuild", help="rebuild from a seed_data.py COPY directory")
+    rebuild.add_argument("dump", help="directory holding Booking.copy and Review.copy")
+    rebuild.add_argument("--save", help="write the arrays here (.npz) for `serve --load`")
+    rebuild.add_argument("--merchant", type=int, action="append", default=[],
+                         help="print this merchant's aggregate")
+    serve = sub.add_parser("serve", help="answer rating lookups over HTTP")
+    serve.add_argument("--load", help="arrays written by `rebuild --save`")
+    serve.add_argument("--dump", help="or rebuild from this COPY directory first")
+    serve.add_argument("--feed", help="JSON lines of reviews to apply before serving")
+    serve.add_argument("--port", type=int, default=4100)
+    bench = sub.add_parser("bench", help="cache vs the full-scan review endpoint")
+    bench.add_argument("--merchants", type=int, default=3)
+    bench.add_argument("--reviews-per-merchant", type=int, default=100_000)
+    bench.add_argument("--lookups", type=int, default=100_000)
+    bench.add_argument("--updates", type=int, default=20_000)
+    bench.add_argument("--endpoint-requests", type=int, default=3,
+                       help="GET /reviews/merchant/:id calls per merchant")
+    bench.add_argument("--seed", type=int, default=0)
+    check = sub.add_parser("verify", help="compare with a running backend's averageRating")
+    check.add_argument("--base-url", default="http://localhost:4000")
+    check.add_argument("--merchants", type=int, default=10, help="merchant ids 1..N")
+    args = parser.parse_args()
+
+    if args.command == "bench":
+        benchmark(args.merchants, args.reviews_per_merchant, args.lookups, args.updates,
+                  args.endpoint_requests, args.seed)
+        return
+    if args.command == "verify":
+        raise SystemExit(1 if verify(args.base_url, range(1, args.merchants + 1)) else 0)
+
+    started = time.perf_counter()
+    if args.command == "serve" and args.load:
+        cache = RatingCache.load(args.load)
+    elif args.dump:
+        cache = RatingCache.from_dump(args.dump)
+    else:
+        cache = RatingCache()
+    print(f"Loaded {int((cache.review_rating > 0).sum()):,} reviews in "
+          f"{time.perf_counter() - started:.1f}s")
+
+    if args.command == "rebuild":
+        for merchant_id in args.merchant:
+            print(f"   merchant {merchant_id}: {cache.merchant(merchant_id)}")
+        if args.save:
+            cache.save(args.save)
+        return
+
+    if args.feed:
+        with open(args.feed, encoding="utf-8") as f:
+            print(f"Applied {apply_feed(cache, f)} reviews from {args.feed}")
+    server = RatingServer(cache, args.port)
+    print(f"⭐ Rating cache listening on http://127.0.0.1:{server.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
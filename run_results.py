@@ -0,0 +1,409 @@
+#!/usr/bin/env python3
+"""
+Benchmark Run Results for the Rent My Vroom Load Tools
+Saves runs as compact columnar files and compares them for latency regressions
+"""
+
+import argparse
+import json
+import math
+import os
+import platform
+import struct
+import subprocess
+import sys
+import zlib
+from array import array
+from datetime import datetime, timezone
+from typing import Dict, Any, List, Optional, Tuple
+
+from latency_stats import EndpointStats, LatencyRecorder
+
+MAGIC = b"RMVRUN\x01\n"
+
+# Column name -> array typecode. route_* columns have one row per route,
+# hist_* one per non-empty histogram bucket, sample_* one per request.
+COLUMNS = {
+    "route_errors": "Q", "route_bytes_sent": "Q", "route_bytes_received": "Q",
+    "route_total_us": "Q", "route_min_us": "Q", "route_max_us": "Q",
+    "hist_route": "H", "hist_index": "I", "hist_count": "Q",
+    "sample_route": "H", "sample_latency_us": "I", "sample_status": "H",
+}
+
+_MAX_SAMPLE_US = (1 << 32) - 1
+
+
+class SampleRecorder(LatencyRecorder):
+    """LatencyRecorder that also keeps every sample, in arrival order, for the results file"""
+
+    def __init__(self):
+        super().__init__()
+        self.samples: Dict[str, Tuple[array, array]] = {}
+
+    def record_route(self, route: str, status: Optional[int], latency_us: int,
+                     bytes_sent: int = 0, bytes_received: int = 0):
+        super().record_route(route, status, latency_us, bytes_sent, bytes_received)
+        columns = self.samples.get(route)
+        if columns is None:
+            columns = self.samples[route] = (array("I"), array("H"))
+        columns[0].append(min(max(0, latency_us), _MAX_SAMPLE_US))
+        columns[1].append(status or 0)
+
+
+def run_metadata(tool: str, **fields) -> Dict[str, Any]:
+    """Where and how a run was taken: git revision, host, time plus tool-specific fields"""
+    repo = os.path.dirname(os.path.abspath(__file__))
+
+    def git(*args) -> str:
+        try:
+            return subprocess.run(["git", *args], cwd=repo, capture_output=True, text=True,
+                                  timeout=10).stdout.strip()
+        except (OSError, subprocess.SubprocessError):
+            return ""
+
+    metadata = {
+        "tool": tool,
+        "recordedAt": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "gitSha": git("rev-parse", "HEAD") or None,
+        "gitDirty": bool(git("status", "--porcelain", "--untracked-files=no")),
+        "host": platform.node(),
+        "python": platform.python_version(),
+    }
+    metadata.update(fields)
+    return metadata
+
+
+def save_run(path: str, recorder: LatencyRecorder, metadata: Dict[str, Any]):
+    """Write a recorder (and its raw samples, if it kept them) to a results file"""
+    routes = sorted(recorder.endpoints)
+    columns = {name: array(typecode) for name, typecode in COLUMNS.items()}
+    samples = getattr(recorder, "samples", {})
+    for route_id, route in enumerate(routes):
+        stats = recorder.endpoints[route]
+        histogram = stats.histogram
+        columns["route_errors"].append(stats.errors)
+        columns["route_bytes_sent"].append(stats.bytes_sent)
+        columns["route_bytes_received"].append(stats.bytes_received)
+        columns["route_total_us"].append(histogram.total)
+        columns["route_min_us"].append(histogram.min or 0)
+        columns["route_max_us"].append(histogram.max)
+        for index, count in enumerate(histogram.counts):
+            if count:
+                columns["hist_route"].append(route_id)
+                columns["hist_index"].append(index)
+                columns["hist_count"].append(count)
+        if route in samples:
+            latencies, statuses = samples[route]
+            columns["sample_route"].extend([route_id] * len(latencies))
+            columns["sample_latency_us"].extend(latencies)
+            columns["sample_status"].extend(statuses)
+
+    blobs, layout, offset = [], {}, 0
+    for name, column in columns.items():
+        blob = zlib.compress(column.tobytes(), 6)
+        layout[name] = {"type": column.typecode, "rows": len(column),
+                        "offset": offset, "length": len(blob)}
+        blobs.append(blob)
+        offset += len(blob)
+    header = json.dumps({"metadata": metadata, "routes": routes, "columns": layout,
+                         "byteorder": sys.byteorder}).encode()
+
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(MAGIC)
+        f.write(struct.pack("<I", len(header)))
+        f.write(header)
+        for blob in blobs:
+            f.write(blob)
+    os.replace(tmp_path, path)
+
+
+class RunResults:
+    """A results file loaded back: metadata, a LatencyRecorder and any raw samples"""
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, "rb") as f:
+            if f.read(len(MAGIC)) != MAGIC:
+                raise ValueError(f"{path} is not a run results file")
+            header_length, = struct.unpack("<I", f.read(4))
+            header = json.loads(f.read(header_length))
+            body = f.read()
+
+        self.metadata: Dict[str, Any] = header["metadata"]
+        self.routes: List[str] = header["routes"]
+        columns = {}
+        for name, spec in header["columns"].items():
+            column = array(spec["type"])
+            column.frombytes(zlib.decompress(body[spec["offset"]:spec["offset"] + spec["length"]]))
+            if header["byteorder"] != sys.byteorder:
+                column.byteswap()
+            columns[name] = column
+
+        self.recorder = LatencyRecorder()
+        for route_id, route in enumerate(self.routes):
+            stats = self.recorder.endpoints[route] = EndpointStats()
+            stats.errors = columns["route_errors"][route_id]
+            stats.bytes_sent = columns["route_bytes_sent"][route_id]
+            stats.bytes_received = columns["route_bytes_received"][route_id]
+            stats.histogram.total = columns["route_total_us"][route_id]
+            stats.histogram.min = columns["route_min_us"][route_id]
+            stats.histogram.max = columns["route_max_us"][route_id]
+        for route_id, index, count in zip(columns["hist_route"], columns["hist_index"],
+                                          columns["hist_count"]):
+            histogram = self.recorder.endpoints[self.routes[route_id]].histogram
+            if index >= len(histogram.counts):
+                histogram.counts.extend([0] * (index + 1 - len(histogram.counts)))
+            histogram.counts[index] += count
+            histogram.count += count
+
+        # Per-request latency and HTTP status (0 = no response), in arrival order
+        self.samples: Dict[str, array] = {}
+        self.statuses: Dict[str, array] = {}
+        for route_id, latency, status in zip(columns["sample_route"], columns["sample_latency_us"],
+                                             columns["sample_status"]):
+            route = self.routes[route_id]
+            if route not in self.samples:
+                self.samples[route] = array("I")
+                self.statuses[route] = array("H")
+            self.samples[route].append(latency)
+            self.statuses[route].append(status)
+
+    @property
+    def label(self) -> str:
+        sha = (self.metadata.get("gitSha") or "nogit")[:8]
+        return f"{os.path.basename(self.path)} ({sha}{'+' if self.metadata.get('gitDirty') else ''})"
+
+    def distribution(self, route: str, exact: bool) -> List[Tuple[int, int]]:
+        """Sorted (value, count) pairs: raw microseconds, or histogram bucket indexes
+
+        Bucket indexes order exactly like the latencies they hold, so rank
+        tests on them are valid, with samples in one bucket treated as ties.
+        """
+        if exact:
+            counts: Dict[int, int] = {}
+            for value in self.samples[route]:
+                counts[value] = counts.get(value, 0) + 1
+            return sorted(counts.items())
+        histogram = self.recorder.endpoints[route].histogram
+        return [(index, count) for index, count in enumerate(histogram.counts) if count]
+
+
+def mann_whitney(base: List[Tuple[int, int]],
+                 candidate: List[Tuple[int, int]]) -> Tuple[float, float]:
+    """One-sided Mann-Whitney U test that candidate latencies are larger
+
+    Returns (P(candidate > base), p-value) from the tie-corrected normal
+    approximation, computed over (value, count) runs so cost depends on
+    the number of distinct values, not the number of samples.
+    """
+    n1 = sum(count for _, count in base)
+    n2 = sum(count for _, count in candidate)
+    if not n1 or not n2:
+        return 0.5, 1.0
+
+    merged: Dict[int, List[int]] = {}
+    for value, count in base:
+        merged.setdefault(value, [0, 0])[0] += count
+    for value, count in candidate:
+        merged.setdefault(value, [0, 0])[1] += count
+
+    rank_sum, seen, ties = 0.0, 0, 0
+    for value in sorted(merged):
+        in_base, in_candidate = merged[value]
+        group = in_base + in_candidate
+        rank_sum += in_candidate * (seen + (group + 1) / 2)
+        seen += group
+        ties += group ** 3 - group
+
+    n = n1 + n2
+    u = rank_sum - n2 * (n2 + 1) / 2
+    mean = n1 * n2 / 2
+    variance = n1 * n2 / 12 * ((n + 1) - ties / (n * (n - 1))) if n > 1 else 0.0
+    if variance <= 0:
+        return u / (n1 * n2), 1.0
+    z = (u - mean - 0.5) / math.sqrt(variance)
+    return u / (n1 * n2), 0.5 * math.erfc(z / math.sqrt(2))
+
+
+def merge_runs(runs: List[RunResults]) -> RunResults:
+    """Pool several baseline runs into one (samples kept only if every run has them)"""
+    if len(runs) == 1:
+        return runs[0]
+    merged = RunResults.__new__(RunResults)
+    merged.path = "+".join(os.path.basename(run.path) for run in runs)
+    merged.metadata = dict(runs[0].metadata)
+    merged.recorder = LatencyRecorder()
+    merged.samples = {}
+    merged.statuses = {}
+    for run in runs:
+        merged.recorder.merge(run.recorder)
+    merged.routes = sorted(merged.recorder.endpoints)
+    for route in merged.routes:
+        if all(route in run.samples for run in runs):
+            merged.samples[route] = array("I")
+            merged.statuses[route] = array("H")
+            for run in runs:
+                merged.samples[route].extend(run.samples[route])
+                merged.statuses[route].extend(run.statuses[route])
+    return merged
+
+
+def baseline_noise(runs: List[RunResults], route: str, percent: float) -> float:
+    """Largest relative gap of a percentile between baseline runs (0 with one run)"""
+    values = [run.recorder.endpoints[route].histogram.percentile(percent)
+              for run in runs if route in run.recorder.endpoints]
+    if len(values) < 2 or not min(values):
+        return 0.0
+    return (max(values) - min(values)) / min(values)
+
+
+def compare_runs(baselines: List[RunResults], candidate: RunResults, threshold: float = 0.10,
+                 alpha: float = 0.01, min_effect: float = 0.05, noise_factor: float = 1.5,
+                 error_threshold: float = 1.0, min_samples: int = 20) -> List[Dict[str, Any]]:
+    """Per-route comparison rows; verdict is "regression", "improvement", "ok" or "n/a"
+
+    Samples within one run are not independent (a GC pause or a cold cache
+    slows a whole stretch of requests), so the rank test alone overstates
+    significance. A route regresses only when the one-sided Mann-Whitney
+    test rejects at `alpha`, P(candidate slower) exceeds 0.5 + `min_effect`,
+    and its p50 or p99 grew by more than `threshold` -- raised to
+    `noise_factor` times the spread seen between baseline runs when more
+    than one is given. An error-rate rise above `error_threshold` points
+    is a regression on its own.
+    """
+    base = merge_runs(baselines)
+    rows = []
+    for route in sorted(set(base.routes) | set(candidate.routes)):
+        row = {"route": route}
+        rows.append(row)
+        if route not in base.recorder.endpoints or route not in candidate.recorder.endpoints:
+            row["verdict"] = "n/a"
+            row["note"] = "only in candidate" if route in candidate.routes else "only in baseline"
+            continue
+        old, new = base.recorder.endpoints[route], candidate.recorder.endpoints[route]
+        row.update(n_base=old.count, n_candidate=new.count)
+        limits = []
+        for percent in (50, 99):
+            before = old.histogram.percentile(percent)
+            after = new.histogram.percentile(percent)
+            row[f"p{percent}"] = (before, after)
+            row[f"p{percent}_change"] = (after - before) / before if before else 0.0
+            limits.append(max(threshold, noise_factor * baseline_noise(baselines, route, percent)))
+        row["limit"] = limits
+        error_change = 100.0 * (new.errors / new.count - old.errors / old.count) \
+            if old.count and new.count else 0.0
+        row["error_change"] = error_change
+        if old.count < min_samples or new.count < min_samples:
+            row["verdict"] = "n/a"
+            row["note"] = f"fewer than {min_samples} samples"
+            continue
+
+        exact = route in base.samples and route in candidate.samples
+        slower, p_value = mann_whitney(base.distribution(route, exact),
+                                       candidate.distribution(route, exact))
+        faster, faster_p = mann_whitney(candidate.distribution(route, exact),
+                                        base.distribution(route, exact))
+        row.update(p_slower=slower, p_value=p_value, exact=exact)
+
+        grew = row["p50_change"] > limits[0] or row["p99_change"] > limits[1]
+        shrank = row["p50_change"] < -limits[0] or row["p99_change"] < -limits[1]
+        if error_change > error_threshold:
+            row["verdict"] = "regression"
+            row["note"] = f"error rate {error_change:+.1f} points"
+        elif p_value < alpha and slower > 0.5 + min_effect and grew:
+            row["verdict"] = "regression"
+        elif faster_p < alpha and faster > 0.5 + min_effect and shrank:
+            row["verdict"] = "improvement"
+        else:
+            row["verdict"] = "ok"
+    return rows
+
+
+def print_comparison(baselines: List[RunResults], candidate: RunResults,
+                     rows: List[Dict[str, Any]]):
+    base = baselines[0]
+    print("\n" + "=" * 60)
+    print(f"📊 {candidate.label} vs baseline {', '.join(run.label for run in baselines)}")
+    print("=" * 60)
+    for key in ("concurrency", "dataset", "tool"):
+        if base.metadata.get(key) != candidate.metadata.get(key):
+            print(f"⚠️  {key} differs: {base.metadata.get(key)} -> {candidate.metadata.get(key)}")
+    header = (f"{'Endpoint':<36} {'n':>7} {'p50 ms':>17} {'Δ':>7} {'p99 ms':>17} {'Δ':>7} "
+              f"{'limit':>6} {'P(slower)':>9} {'p-value':>9}  verdict")
+    print(header)
+    print("-" * len(header))
+    icons = {"regression": "❌ REGRESSION", "improvement": "⚡ faster", "ok": "✅", "n/a": "·"}
+    for row in rows:
+        if "p50" not in row:
+            print(f"{row['route']:<36} {'':>7} {'':>17} {'':>7} {'':>17} {'':>7} {'':>6} "
+                  f"{'':>9} {'':>9}  {icons[row['verdict']]} {row.get('note', '')}")
+            continue
+        p50, p99 = row["p50"], row["p99"]
+        stats = (f"{row['p_slower']:>9.2f} {row['p_value']:>9.1e}" if "p_value" in row
+                 else f"{'':>9} {'':>9}")
+        print(f"{row['route']:<36} {row['n_candidate']:>7} "
+              f"{p50[0] / 1000:>8.1f}→{p50[1] / 1000:<8.1f} {100 * row['p50_change']:>+6.0f}% "
+              f"{p99[0] / 1000:>8.1f}→{p99[1] / 1000:<8.1f} {100 * row['p99_change']:>+6.0f}% "
+              f"{100 * min(row['limit']):>5.0f}% "
+              f"{stats}  {icons[row['verdict']]} {row.get('note', '')}")
+
+
+def print_run(results: RunResults):
+    print(f"📁 {results.path}")
+    for key, value in results.metadata.items():
+        print(f"   {key}: {value}")
+    print(f"   raw samples: {sum(len(s) for s in results.samples.values())}")
+    elapsed = results.metadata.get("elapsed") or 0.0
+    results.recorder.print_report(elapsed)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Inspect and compare saved benchmark runs")
+    sub = parser.add_subparsers(dest="command", required=True)
+    show = sub.add_parser("show", help="print a run's metadata and latency report")
+    show.add_argument("runs", nargs="+")
+    compare = sub.add_parser("compare", help="test candidate runs against baseline runs")
+    compare.add_argument("runs", nargs="+",
+                         help="the first --baselines runs form the baseline; each later run is "
+                              "compared against it")
+    compare.add_argument("--baselines", type=int, default=1,
+                         help="how many leading runs to pool as the baseline; with 2+ their "
+                              "run-to-run spread widens each route's threshold")
+    compare.add_argument("--threshold", type=float, default=10.0,
+                         help="percent p50/p99 growth that counts as a regression")
+    compare.add_argument("--alpha", type=float, default=0.01, help="significance level")
+    compare.add_argument("--min-effect", type=float, default=0.05,
+                         help="required P(candidate slower) above 0.5")
+    compare.add_argument("--noise-factor", type=float, default=1.5,
+                         help="multiple of baseline run-to-run spread a change must exceed")
+    compare.add_argument("--error-threshold", type=float, default=1.0,
+                         help="error-rate increase, in percentage points, that counts as a regression")
+    compare.add_argument("--min-samples", type=int, default=20,
+                         help="skip routes with fewer samples on either side")
+    args = parser.parse_args()
+
+    if args.command == "show":
+        for path in args.runs:
+            print_run(RunResults(path))
+        return
+
+    if not 1 <= args.baselines < len(args.runs):
+        parser.error("compare needs at least one baseline run and one candidate run")
+    baselines = [RunResults(path) for path in args.runs[:args.baselines]]
+    regressions = 0
+    for path in args.runs[args.baselines:]:
+        candidate = RunResults(path)
+        rows = compare_runs(baselines, candidate, args.threshold / 100, args.alpha,
+                            args.min_effect, args.noise_factor, args.error_threshold,
+                            args.min_samples)
+        print_comparison(baselines, candidate, rows)
+        regressions += sum(row["verdict"] == "regression" for row in rows)
+    if regressions:
+        print(f"\n❌ {regressions} regressed endpoint(s)")
+        sys.exit(1)
+    print("\n✅ No regressions")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,314 @@
+#!/usr/bin/env python3
+"""
+Declarative Scenario Engine for Rent My Vroom Load Tests
+Runs weighted user journeys, declared in YAML or Python, as concurrent virtual users
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import re
+import time
+from datetime import datetime, timedelta
+from typing import Dict, Any, List, Optional, Tuple
+
+import yaml
+
+from load_test import AsyncRentMyVroomAPITester, LoadTestRunner
+from live_metrics import make_recorder
+from payload_analyzer import PayloadAnalyzer
+from query_profile import RequestLog
+from run_results import run_metadata, save_run
+from token_pool import TokenPool
+
+_PLACEHOLDER = re.compile(r"\{([^{}]+)\}")
+_RELATIVE_TIME = re.compile(r"^now(?:([+-]\d+)([dhm]))?$")
+_TIME_UNITS = {"d": "days", "h": "hours", "m": "minutes"}
+
+
+class JourneyAborted(Exception):
+    """A step failed its expectation or extraction; the rest of the journey is skipped"""
+
+
+class Step:
+    """One request in a journey
+
+    request   "METHOD /path", with {placeholders} filled from journey variables
+    auth      "renter", "merchant" or None for an anonymous call
+    body      JSON body; string values are templated, "{name}" alone keeps its type
+    weight    probability (0-1) that the step runs at all
+    think     seconds to pause afterwards: a number or a [min, max] range
+    repeat    how many times to send it
+    expect    accepted status codes (default: any 2xx)
+    extract   {variable: path} read from the JSON response; see extract_path()
+    """
+
+    def __init__(self, request: str, name: Optional[str] = None, auth: Optional[str] = None,
+                 body: Any = None, weight: float = 1.0, think: Any = 0, repeat: int = 1,
+                 expect: Optional[List[int]] = None, extract: Optional[Dict[str, str]] = None):
+        self.method, self.path = request.split(" ", 1)
+        self.method = self.method.upper()
+        self.name = name or request
+        self.auth = auth
+        self.body = body
+        self.weight = weight
+        self.think = think
+        self.repeat = repeat
+        self.expect = expect
+        self.extract = extract or {}
+
+    @classmethod
+    def from_dict(cls, spec: Dict[str, Any]) -> "Step":
+        spec = dict(spec)
+        if "as" in spec:
+            spec["auth"] = spec.pop("as")
+        return cls(**spec)
+
+    def think_time(self, rng: random.Random) -> float:
+        if isinstance(self.think, (list, tuple)):
+            return rng.uniform(*self.think)
+        return float(self.think or 0)
+
+
+class Journey:
+    """A named, weighted sequence of steps"""
+
+    def __init__(self, name: str, steps: List[Step], weight: float = 1.0):
+        self.name = name
+        self.steps = steps
+        self.weight = weight
+
+    @classmethod
+    def from_dict(cls, spec: Dict[str, Any]) -> "Journey":
+        return cls(spec["name"], [Step.from_dict(s) for s in spec["steps"]],
+                   spec.get("weight", 1.0))
+
+
+def load_scenario(path: str,
+                  mix: Optional[str] = None) -> Tuple[List[Journey], Optional[Journey]]:
+    """Load (journeys, setup) from YAML, journeys optionally re-weighted by a named mix"""
+    with open(path, encoding="utf-8") as f:
+        spec = yaml.safe_load(f)
+    journeys = [Journey.from_dict(j) for j in spec["journeys"]]
+    if mix:
+        weights = spec.get("mixes", {}).get(mix)
+        if weights is None:
+            raise ValueError(f"Unknown traffic mix: {mix}")
+        for journey in journeys:
+            journey.weight = weights.get(journey.name, 0)
+    setup = Journey.from_dict(dict(spec["setup"], name="setup")) if spec.get("setup") else None
+    return journeys, setup
+
+
+def extract_path(data: Any, path: str, rng: Optional[random.Random]) -> Any:
+    """Walk a dotted path: keys, integer indexes (negative allowed) and * for a random element"""
+    for part in path.split("."):
+        if part == "*":
+            if not data or rng is None:
+                raise KeyError(path)
+            data = rng.choice(data)
+        elif isinstance(data, list):
+            data = data[int(part)]
+        else:
+            data = data[part]
+    return data
+
+
+def render(template: Any, variables: Dict[str, Any]) -> Any:
+    """Fill {placeholders} in strings, lists and dicts from journey variables"""
+    if isinstance(template, dict):
+        return {key: render(value, variables) for key, value in template.items()}
+    if isinstance(template, list):
+        return [render(value, variables) for value in template]
+    if not isinstance(template, str):
+        return template
+
+    whole = _PLACEHOLDER.fullmatch(template)
+    if whole:
+        return _lookup(whole.group(1), variables)
+    return _PLACEHOLDER.sub(lambda m: str(_lookup(m.group(1), variables)), template)
+
+
+def _lookup(name: str, variables: Dict[str, Any]) -> Any:
+    if name in variables:
+        return variables[name]
+    head, _, rest = name.partition(".")
+    if rest and head in variables:
+        # {vehicle.merchant.id}: walk into an extracted object, so several values
+        # come from the one random pick
+        try:
+            return extract_path(variables[head], rest, None)
+        except (KeyError, IndexError, ValueError, TypeError):
+            raise JourneyAborted(f"No {rest!r} in variable {head!r}")
+    relative = _RELATIVE_TIME.match(name)
+    if relative:
+        moment = datetime.now()
+        if relative.group(1):
+            moment += timedelta(**{_TIME_UNITS[relative.group(2)]: int(relative.group(1))})
+        return moment.isoformat()
+    raise JourneyAborted(f"Unknown variable {name!r}")
+
+
+class JourneyRunner(LoadTestRunner):
+    """LoadTestRunner whose virtual users pick weighted journeys instead of fixed scenarios
+
+    The optional setup journey runs once per virtual user after login; the
+    variables it extracts (say, the id of a vehicle it listed) are visible to
+    every later journey of that user.
+    """
+
+    def __init__(self, journeys: List[Journey], setup: Optional[Journey] = None,
+                 seed: Optional[int] = None, **kwargs):
+        super().__init__(**kwargs)
+        self.setup = setup
+        self.journeys = [j for j in journeys if j.weight > 0]
+        if not self.journeys:
+            raise ValueError("No journey has a positive weight")
+        self.weights = [j.weight for j in self.journeys]
+        self.seed = seed
+        self.journey_counts = {j.name: {"completed": 0, "aborted": 0} for j in self.journeys}
+
+    async def _run_step(self, tester: AsyncRentMyVroomAPITester, step: Step,
+                        variables: Dict[str, Any], rng: random.Random):
+        token = None
+        if step.auth:
+            token = tester.tokens.get(step.auth)
+            if token is None:
+                raise JourneyAborted(f"No {step.auth} token")
+        path = render(step.path, variables)
+        body = render(step.body, variables) if step.body is not None else None
+        if body is None and step.method in ("POST", "PATCH", "PUT"):
+            body = {}
+
+        response = await tester.make_request(step.method, path, body, token=token)
+        status = response.status_code if response is not None else None
+        success = status is not None and (status in step.expect if step.expect
+                                          else 200 <= status < 300)
+        tester.log_test(step.name, success, f"Status: {status or 'No response'}")
+        if not success:
+            raise JourneyAborted(step.name)
+
+        if step.extract:
+            try:
+                payload = response.json()
+                for variable, path in step.extract.items():
+                    variables[variable] = extract_path(payload, path, rng)
+            except (json.JSONDecodeError, KeyError, IndexError, ValueError, TypeError):
+                tester.log_test(f"{step.name} (extract)", False, str(step.extract))
+                raise JourneyAborted(step.name)
+
+    async def run_journey(self, tester: AsyncRentMyVroomAPITester, journey: Journey,
+                          rng: random.Random, deadline: float,
+                          variables: Dict[str, Any]) -> Optional[bool]:
+        """Run one journey: True if completed, False if a step aborted it, None if cut off"""
+        variables["uid"] = f"{tester.run_tag}-{rng.getrandbits(32):x}"
+        try:
+            for step in journey.steps:
+                if step.weight < 1.0 and rng.random() >= step.weight:
+                    continue
+                for _ in range(step.repeat):
+                    await self._run_step(tester, step, variables, rng)
+                    pause = step.think_time(rng)
+                    if pause:
+                        remaining = deadline - time.perf_counter()
+                        if pause >= remaining:
+                            await asyncio.sleep(max(0.0, remaining))
+                            return None
+                        await asyncio.sleep(pause)
+        except JourneyAborted:
+            return False
+        return True
+
+    async def _run_user(self, tester: AsyncRentMyVroomAPITester, delay: float, deadline: float):
+        await asyncio.sleep(delay)
+        if not await tester.test_authentication_system():
+            return
+        if tester.token_pool is None:
+            await tester.test_user_management()
+
+        rng = random.Random(f"{self.seed}:{tester.user_index}" if self.seed is not None else None)
+        user_variables = {"user_index": tester.user_index}
+        user_variables.update({f"{role}_id": user_id for role, user_id in tester.user_ids.items()})
+        if self.setup is not None:
+            if not await self.run_journey(tester, self.setup, rng, deadline, user_variables):
+                return
+
+        while time.perf_counter() < deadline:
+            if tester.token_pool is not None:
+                await tester.refresh_tokens()
+            journey = rng.choices(self.journeys, weights=self.weights)[0]
+            completed = await self.run_journey(tester, journey, rng, deadline,
+                                               dict(user_variables))
+            if completed is None:
+                break
+            self.journey_counts[journey.name]["completed" if completed else "aborted"] += 1
+
+    def print_summary(self, results: Dict[str, Any]):
+        """Print per-journey completion counts, then the usual load summary"""
+        print("\n" + "=" * 60)
+        print("🧭 JOURNEYS")
+        print("=" * 60)
+        total_weight = sum(self.weights)
+        for journey in self.journeys:
+            counts = self.journey_counts[journey.name]
+            print(f"{journey.name:<24} mix {100 * journey.weight / total_weight:5.1f}%  "
+                  f"completed {counts['completed']:>7}  aborted {counts['aborted']:>6}")
+        super().print_summary(results)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rent My Vroom journey-based load test")
+    parser.add_argument("journeys", nargs="?", default="journeys.yaml", help="journey YAML file")
+    parser.add_argument("--mix", help="named traffic mix from the YAML file")
+    parser.add_argument("--base-url", default="http://localhost:4000")
+    parser.add_argument("--users", type=int, default=100, help="concurrent virtual users")
+    parser.add_argument("--ramp-up", type=float, default=10.0, help="seconds to start all users")
+    parser.add_argument("--duration", type=float, default=60.0, help="seconds at full load")
+    parser.add_argument("--rps", type=float, default=0, help="aggregate target RPS (0 = unthrottled)")
+    parser.add_argument("--connections", type=int, default=100, help="HTTP connection pool size")
+    parser.add_argument("--token-pool", help="pre-authenticated user pool file (see token_pool.py)")
+    parser.add_argument("--seed", type=int, help="seed journey and step choices")
+    parser.add_argument("--verbose", action="store_true", help="print every check")
+    parser.add_argument("--save-results", help="write the run to this results file (see run_results.py)")
+    parser.add_argument("--dataset", help="dataset label stored with saved results, e.g. a seed scale")
+    parser.add_argument("--live", action="store_true", help="show per-second live metrics")
+    parser.add_argument("--metrics-port", type=int,
+                        help="serve live Prometheus metrics on this port at /metrics")
+    parser.add_argument("--request-log", help="write each request's ID, route and latency to this "
+                                              "JSON lines file (see query_profile.py)")
+    parser.add_argument("--analyze-payloads", type=int, metavar="N", nargs="?", const=20,
+                        help="report size, shape and repeated embedded objects of N "
+                             "successful responses per endpoint, sampled across the whole run "
+                             "(default 20)")
+    args = parser.parse_args()
+
+    token_pool = TokenPool(args.token_pool, args.base_url) if args.token_pool else None
+    if token_pool is not None and args.users > token_pool.capacity():
+        parser.error(f"--users {args.users} exceeds the token pool's {token_pool.capacity()} "
+                     f"renter/merchant pairs; top it up with token_pool.py")
+    journeys, setup = load_scenario(args.journeys, args.mix)
+    recorder, live = make_recorder(args.save_results, args.live, args.metrics_port)
+    runner = JourneyRunner(journeys, setup, seed=args.seed,
+                           base_url=args.base_url, users=args.users, ramp_up=args.ramp_up,
+                           duration=args.duration, rps=args.rps, connections=args.connections,
+                           verbose=args.verbose, token_pool=token_pool,
+                           recorder=recorder, live=live,
+                           request_log=RequestLog(args.request_log) if args.request_log else None,
+                           payload_analyzer=(PayloadAnalyzer(args.analyze_payloads)
+                                             if args.analyze_payloads else None))
+    print("🚀 Starting Rent My Vroom Journey Load Test")
+    print("=" * 60)
+    results = asyncio.run(runner.run())
+    runner.print_summary(results)
+    if args.save_results:
+        save_run(args.save_results, runner.recorder, run_metadata(
+            "scenario_engine", baseUrl=args.base_url,
+            concurrency={"users": args.users, "connections": args.connections, "rps": args.rps},
+            dataset=args.dataset, journeys=args.journeys, mix=args.mix,
+            elapsed=results["elapsed"]))
+        print(f"💾 Results saved to {args.save_results}")
+
+
+if __name__ == "__main__":
+    main()
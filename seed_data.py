@@ -0,0 +1,498 @@
+#!/usr/bin/env python3
+"""
+Bulk Fixture Seeding for Rent My Vroom Benchmarks
+Generates deterministic, skewed datasets and loads them as Postgres COPY files or through the API
+"""
+
+import argparse
+import asyncio
+import math
+import os
+import random
+import time
+from array import array
+from datetime import datetime, timedelta
+from typing import Dict, Any, List, Optional, Iterator, Tuple
+
+import aiohttp
+
+from load_test import AsyncRentMyVroomAPITester, RateLimiter
+
+SEED_EMAIL_DOMAIN = "seed.rentmyvroom.test"
+SEED_PASSWORD = "Test123!"
+# bcrypt (cost 10, same as AuthService.register) of SEED_PASSWORD, so seeded users can log in
+SEED_PASSWORD_HASH = "$2b$10$1P2no8IkgkAuRnXbErqRCe3MOyqBqKxLaZkrW5GCULUi0OTCCPMey"
+
+MAKES = {
+    "Toyota": ["Camry", "Corolla", "RAV4", "Prius"],
+    "Honda": ["Civic", "Accord", "CR-V", "Jazz"],
+    "Ford": ["Focus", "Fiesta", "Mustang", "Ranger"],
+    "Tesla": ["Model 3", "Model Y"],
+    "BMW": ["3 Series", "X3", "i4"],
+    "Volkswagen": ["Golf", "Polo", "Tiguan"],
+    "Hyundai": ["i20", "Tucson", "Kona"],
+    "Kia": ["Picanto", "Sportage", "EV6"],
+}
+COLORS = ["Black", "White", "Silver", "Blue", "Red", "Grey", "Green"]
+FUEL_TYPES = ["Petrol", "Diesel", "Hybrid", "Electric"]
+TRANSMISSIONS = ["Automatic", "Manual"]
+FEATURES = ["AC", "GPS", "Bluetooth", "Heated Seats", "Sunroof", "Child Seat",
+            "Apple CarPlay", "Android Auto", "Cruise Control", "Parking Sensors"]
+FIRST_NAMES = ["Jane", "Mike", "Aisha", "Carlos", "Mei", "Tom", "Priya", "Olu", "Sara", "Ivan"]
+LAST_NAMES = ["Smith", "Johnson", "Khan", "Garcia", "Chen", "Brown", "Patel", "Adeyemi", "Novak"]
+MESSAGES = ["What time can I pick up?", "9am tomorrow works", "Is there a child seat?",
+            "Running 10 minutes late", "Where do I leave the keys?", "Thanks, all good!"]
+REVIEW_COMMENTS = ["Excellent service!", "Car was clean", "Smooth pickup", "Would rent again", None]
+
+# Column order of each COPY file; matches prisma/schema.prisma
+COLUMNS = {
+    "User": ["id", "email", "password", "firstName", "lastName", "phone", "role", "licenseUrl",
+             "licenseStatus", "licenseApprovedAt", "businessName", "businessAddress",
+             "createdAt", "updatedAt"],
+    "Vehicle": ["id", "merchantId", "make", "model", "year", "color", "licensePlate",
+                "pricePerHour", "pricePerDay", "seats", "fuelType", "transmission", "mileage",
+                "description", "features", "images", "isAvailable", "createdAt", "updatedAt"],
+    "Booking": ["id", "renterId", "merchantId", "vehicleId", "startDate", "endDate",
+                "totalPrice", "status", "renterNotes", "merchantNotes", "createdAt",
+                "updatedAt", "acceptedAt", "rejectedAt", "completedAt"],
+    "Message": ["id", "bookingId", "senderId", "receiverId", "content", "isRead", "createdAt"],
+    "Review": ["id", "bookingId", "reviewerId", "rating", "comment", "createdAt", "updatedAt"],
+}
+
+SCALES = {
+    "small": dict(merchants=100, renters=1_000, vehicles=2_000, bookings=20_000, messages=60_000),
+    "medium": dict(merchants=1_000, renters=20_000, vehicles=50_000, bookings=500_000,
+                   messages=1_500_000),
+    "large": dict(merchants=10_000, renters=200_000, vehicles=500_000, bookings=5_000_000,
+                  messages=5_000_000),
+}
+
+
+def zipf_cum_weights(n: int, exponent: float) -> List[float]:
+    """Cumulative Zipf weights for ranks 1..n, for random.choices(cum_weights=...)"""
+    total = 0.0
+    cum = []
+    for rank in range(1, n + 1):
+        total += 1.0 / rank ** exponent
+        cum.append(total)
+    return cum
+
+
+class SeedGenerator:
+    """Deterministic row generator: the same seed and volumes always yield the same rows
+
+    Ids are assigned densely from 1 in generation order: merchants first, then
+    renters, so user ids 1..merchants are merchants. Fleet size per merchant,
+    bookings per vehicle and per renter all follow Zipf distributions, and
+    message threads have geometric lengths averaging messages / bookings.
+    """
+
+    def __init__(self, merchants: int, renters: int, vehicles: int, bookings: int,
+                 messages: int, seed: int = 42, skew: float = 1.1,
+                 epoch: datetime = datetime(2026, 1, 1)):
+        self.merchants = merchants
+        self.renters = renters
+        self.vehicles = vehicles
+        self.bookings = bookings
+        self.messages = messages
+        self.seed = seed
+        self.skew = skew
+        self.epoch = epoch
+
+        # Filled by vehicle_rows(); booking_rows() needs owner and price per vehicle
+        self.vehicle_merchant = array("I")
+        self.vehicle_price_day = array("d")
+
+    def _rng(self, stream: str) -> random.Random:
+        # Independent stream per table, so changing one volume leaves the others stable
+        return random.Random(f"{self.seed}:{stream}")
+
+    def _popularity(self, rng: random.Random, ids: List[int]) -> Tuple[List[int], List[float]]:
+        population = list(ids)
+        rng.shuffle(population)
+        return population, zipf_cum_weights(len(population), self.skew)
+
+    def user_rows(self) -> Iterator[tuple]:
+        rng = self._rng("users")
+        for user_id in range(1, self.merchants + self.renters + 1):
+            is_merchant = user_id <= self.merchants
+            created = self.epoch - timedelta(days=rng.uniform(30, 730))
+            first = rng.choice(FIRST_NAMES)
+            last = rng.choice(LAST_NAMES)
+            if is_merchant:
+                yield (user_id, f"merchant{user_id}@{SEED_EMAIL_DOMAIN}", SEED_PASSWORD_HASH,
+                       first, last, None, "MERCHANT", None, "PENDING", None,
+                       f"{last}'s Rentals", f"{rng.randint(1, 999)} Oak St", created, created)
+            else:
+                yield (user_id, f"renter{user_id}@{SEED_EMAIL_DOMAIN}", SEED_PASSWORD_HASH,
+                       first, last, f"+1555{user_id:07d}", "RENTER",
+                       f"https://example.com/licenses/{user_id}.jpg", "APPROVED",
+                       created + timedelta(days=1), None, None, created, created)
+
+    def vehicle_rows(self) -> Iterator[tuple]:
+        rng = self._rng("vehicles")
+        merchants, cum = self._popularity(rng, range(1, self.merchants + 1))
+        makes = list(MAKES)
+        self.vehicle_merchant = array("I")
+        self.vehicle_price_day = array("d")
+
+        for start in range(0, self.vehicles, 100_000):
+            chunk = min(100_000, self.vehicles - start)
+            owners = rng.choices(merchants, cum_weights=cum, k=chunk)
+            for offset, merchant_id in enumerate(owners):
+                vehicle_id = start + offset + 1
+                make = rng.choice(makes)
+                price_day = float(rng.randint(30, 300))
+                price_hour = round(price_day / rng.uniform(5, 8), 2)
+                created = self.epoch - timedelta(days=rng.uniform(1, 700))
+                self.vehicle_merchant.append(merchant_id)
+                self.vehicle_price_day.append(price_day)
+                yield (vehicle_id, merchant_id, make, rng.choice(MAKES[make]),
+                       rng.randint(2012, 2026), rng.choice(COLORS), f"SEED-{vehicle_id:07d}",
+                       price_hour, price_day, rng.choice([2, 4, 5, 5, 5, 7]),
+                       rng.choice(FUEL_TYPES), rng.choice(TRANSMISSIONS),
+                       rng.randint(1_000, 150_000), f"{make} in great condition",
+                       rng.sample(FEATURES, rng.randint(1, 5)),
+                       [f"https://cdn.example.com/vehicles/{vehicle_id}/{n}.jpg"
+                        for n in range(rng.randint(1, 4))],
+                       rng.random() > 0.1, created, created)
+
+    def booking_rows(self) -> Iterator[Tuple[tuple, List[tuple], Optional[tuple]]]:
+        """Yield (booking, messages, review-or-None); call after vehicle_rows()"""
+        if len(self.vehicle_merchant) != self.vehicles:
+            for _ in self.vehicle_rows():
+                pass
+
+        rng = self._rng("bookings")
+        vehicles, vehicle_cum = self._popularity(rng, range(1, self.vehicles + 1))
+        renters, renter_cum = self._popularity(
+            rng, range(self.merchants + 1, self.merchants + self.renters + 1))
+        mean_thread = self.messages / self.bookings if self.bookings else 0
+        # Geometric thread length with the requested mean (p = 1 / (mean + 1))
+        stop = 1.0 / (mean_thread + 1.0)
+        message_id = 0
+        review_id = 0
+
+        for start in range(0, self.bookings, 100_000):
+            chunk = min(100_000, self.bookings - start)
+            picked_vehicles = rng.choices(vehicles, cum_weights=vehicle_cum, k=chunk)
+            picked_renters = rng.choices(renters, cum_weights=renter_cum, k=chunk)
+            for offset in range(chunk):
+                booking_id = start + offset + 1
+                vehicle_id = picked_vehicles[offset]
+                renter_id = picked_renters[offset]
+                merchant_id = self.vehicle_merchant[vehicle_id - 1]
+
+                start_date = self.epoch + timedelta(hours=rng.randint(-365 * 24, 90 * 24))
+                if rng.random() < 0.3:
+                    end_date = start_date + timedelta(hours=rng.randint(1, 12))
+                else:
+                    end_date = start_date + timedelta(days=rng.randint(1, 14))
+                days = math.ceil((end_date - start_date).total_seconds() / 86400)
+                total_price = self.vehicle_price_day[vehicle_id - 1] * days
+                created = start_date - timedelta(hours=rng.randint(1, 30 * 24))
+
+                roll = rng.random()
+                accepted_at = rejected_at = completed_at = None
+                if start_date < self.epoch:
+                    status = "COMPLETED" if roll < 0.7 else "CANCELLED" if roll < 0.8 else "REJECTED"
+                else:
+                    status = "ACCEPTED" if roll < 0.5 else "PENDING" if roll < 0.9 else "REJECTED"
+                if status in ("ACCEPTED", "COMPLETED", "CANCELLED"):
+                    accepted_at = created + timedelta(hours=rng.randint(1, 24))
+                if status == "REJECTED":
+                    rejected_at = created + timedelta(hours=rng.randint(1, 24))
+                if status == "COMPLETED":
+                    completed_at = end_date
+                updated = completed_at or rejected_at or accepted_at or created
+
+                booking = (booking_id, renter_id, merchant_id, vehicle_id, start_date, end_date,
+                           total_price, status, "Need for trip", None, created, updated,
+                           accepted_at, rejected_at, completed_at)
+
+                messages = []
+                sent_at = created
+                while mean_thread and rng.random() > stop:
+                    message_id += 1
+                    sent_at += timedelta(minutes=rng.randint(1, 600))
+                    from_renter = rng.random() < 0.5
+                    sender, receiver = ((renter_id, merchant_id) if from_renter
+                                        else (merchant_id, renter_id))
+                    messages.append((message_id, booking_id, sender, receiver,
+                                     rng.choice(MESSAGES), sent_at < self.epoch, sent_at))
+
+                review = None
+                if status == "COMPLETED" and rng.random() < 0.6:
+                    review_id += 1
+                    reviewed_at = end_date + timedelta(hours=rng.randint(1, 72))
+                    review = (review_id, booking_id, renter_id,
+                              rng.choices([1, 2, 3, 4, 5], weights=[2, 3, 10, 35, 50])[0],
+                              rng.choice(REVIEW_COMMENTS), reviewed_at, reviewed_at)
+
+                yield booking, messages, review
+
+
+def _copy_value(value: Any) -> str:
+    """Render one value in Postgres COPY text format"""
+    if value is None:
+        return "\\N"
+    if isinstance(value, bool):
+        return "t" if value else "f"
+    if isinstance(value, datetime):
+        return value.strftime("%Y-%m-%d %H:%M:%S")
+    if isinstance(value, list):
+        items = ",".join('"' + str(v).replace("\\", "\\\\").replace('"', '\\"') + '"'
+                         for v in value)
+        value = "{" + items + "}"
+    return (str(value).replace("\\", "\\\\").replace("\t", "\\t")
+            .replace("\n", "\\n").replace("\r", "\\r"))
+
+
+class CopyWriter:
+    """Writes generated rows as one COPY text file per table plus a psql load script"""
+
+    def __init__(self, out_dir: str, batch_size: int = 10_000):
+        self.out_dir = out_dir
+        self.batch_size = batch_size
+        self.counts = {table: 0 for table in COLUMNS}
+        os.makedirs(out_dir, exist_ok=True)
+        self.files = {table: open(os.path.join(out_dir, f"{table}.copy"), "w",
+                                  encoding="utf-8", buffering=1 << 20)
+                      for table in COLUMNS}
+        self.buffers = {table: [] for table in COLUMNS}
+
+    def write(self, table: str, row: tuple):
+        buffer = self.buffers[table]
+        buffer.append("\t".join(map(_copy_value, row)))
+        if len(buffer) >= self.batch_size:
+            self._flush(table)
+
+    def _flush(self, table: str):
+        buffer = self.buffers[table]
+        if buffer:
+            self.files[table].write("\n".join(buffer) + "\n")
+            self.counts[table] += len(buffer)
+            buffer.clear()
+
+    def close(self):
+        for table, handle in self.files.items():
+            self._flush(table)
+            handle.close()
+
+        # Parents before children so foreign keys hold; sequences resume after the seeded ids
+        with open(os.path.join(self.out_dir, "load.sql"), "w", encoding="utf-8") as script:
+            script.write("BEGIN;\n")
+            for table, columns in COLUMNS.items():
+                column_list = ", ".join(f'"{c}"' for c in columns)
+                script.write(f'\\copy "{table}" ({column_list}) FROM \'{table}.copy\'\n')
+            for table in COLUMNS:
+                script.write(f"SELECT setval(pg_get_serial_sequence('\"{table}\"', 'id'), "
+                             f"COALESCE((SELECT MAX(id) FROM \"{table}\"), 1));\n")
+            script.write("COMMIT;\n")
+
+
+def write_copy_files(generator: SeedGenerator, out_dir: str) -> Dict[str, int]:
+    """Generate every table into out_dir; load with `cd out_dir && psql $DATABASE_URL -f load.sql`"""
+    writer = CopyWriter(out_dir)
+    try:
+        for row in generator.user_rows():
+            writer.write("User", row)
+        for row in generator.vehicle_rows():
+            writer.write("Vehicle", row)
+        for booking, messages, review in generator.booking_rows():
+            writer.write("Booking", booking)
+            for message in messages:
+                writer.write("Message", message)
+            if review:
+                writer.write("Review", review)
+    finally:
+        writer.close()
+    return writer.counts
+
+
+class ApiSeeder:
+    """Replays generated rows through the public API in concurrent batches
+
+    Server ids differ from generated ids, so each created row's real id is
+    mapped back before dependent rows are sent. Renter licenses are approved
+    with the same direct-SQL workaround backend_test.py uses.
+    """
+
+    def __init__(self, generator: SeedGenerator, base_url: str = "http://localhost:4000",
+                 concurrency: int = 64, rps: float = 0, backend_dir: str = "/app/backend"):
+        self.generator = generator
+        self.base_url = base_url
+        self.concurrency = concurrency
+        self.rps = rps
+        self.backend_dir = backend_dir
+        self.tokens: Dict[int, str] = {}
+        self.user_ids: Dict[int, int] = {}
+        self.vehicle_ids: Dict[int, int] = {}
+        self.counts = {table: 0 for table in COLUMNS}
+
+    async def _batched(self, items: Iterator[Any], handler, batch_size: int = 1_000):
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def bounded(item):
+            async with semaphore:
+                await handler(item)
+
+        batch = []
+        for item in items:
+            batch.append(bounded(item))
+            if len(batch) >= batch_size:
+                await asyncio.gather(*batch)
+                batch = []
+        if batch:
+            await asyncio.gather(*batch)
+
+    async def _create_user(self, row: tuple):
+        user = dict(zip(COLUMNS["User"], row))
+        payload = {"email": user["email"], "password": SEED_PASSWORD,
+                   "firstName": user["firstName"], "lastName": user["lastName"],
+                   "role": user["role"]}
+        if user["role"] == "MERCHANT":
+            payload.update(businessName=user["businessName"],
+                           businessAddress=user["businessAddress"])
+        else:
+            payload["phone"] = user["phone"]
+
+        response = await self.client.make_request("POST", "/auth/register", payload)
+        if response is None or response.status_code not in (200, 201):
+            return
+        result = response.json()
+        self.user_ids[user["id"]] = result["user"]["id"]
+        self.tokens[user["id"]] = result["accessToken"]
+        self.counts["User"] += 1
+        if user["role"] == "RENTER":
+            await self.client.make_request("POST", "/users/upload-license",
+                                           {"licenseUrl": user["licenseUrl"]},
+                                           token=result["accessToken"])
+
+    async def _create_vehicle(self, row: tuple):
+        vehicle = dict(zip(COLUMNS["Vehicle"], row))
+        token = self.tokens.get(vehicle["merchantId"])
+        if token is None:
+            return
+        payload = {key: vehicle[key] for key in
+                   ("make", "model", "year", "color", "licensePlate", "pricePerHour",
+                    "pricePerDay", "seats", "fuelType", "transmission", "mileage",
+                    "description", "features", "images", "isAvailable")}
+        response = await self.client.make_request("POST", "/vehicles", payload, token=token)
+        if response is not None and response.status_code in (200, 201):
+            self.vehicle_ids[vehicle["id"]] = response.json()["id"]
+            self.counts["Vehicle"] += 1
+
+    async def _create_booking(self, item):
+        row, messages, review = item
+        booking = dict(zip(COLUMNS["Booking"], row))
+        renter_token = self.tokens.get(booking["renterId"])
+        merchant_token = self.tokens.get(booking["merchantId"])
+        vehicle_id = self.vehicle_ids.get(booking["vehicleId"])
+        if renter_token is None or merchant_token is None or vehicle_id is None:
+            return
+
+        response = await self.client.make_request("POST", "/bookings", {
+            "vehicleId": vehicle_id,
+            "startDate": booking["startDate"].isoformat(),
+            "endDate": booking["endDate"].isoformat(),
+            "renterNotes": booking["renterNotes"],
+        }, token=renter_token)
+        if response is None or response.status_code not in (200, 201):
+            return
+        booking_id = response.json()["id"]
+        self.counts["Booking"] += 1
+
+        status = booking["status"]
+        if status in ("ACCEPTED", "COMPLETED", "CANCELLED"):
+            await self.client.make_request("PATCH", f"/bookings/{booking_id}/accept", {},
+                                           token=merchant_token)
+        elif status == "REJECTED":
+            await self.client.make_request("PATCH", f"/bookings/{booking_id}/reject", {},
+                                           token=merchant_token)
+
+        for message in messages:
+            token = renter_token if message[2] == booking["renterId"] else merchant_token
+            response = await self.client.make_request("POST", f"/messages/{booking_id}",
+                                                      {"content": message[4]}, token=token)
+            if response is not None and response.status_code in (200, 201):
+                self.counts["Message"] += 1
+
+        if status == "COMPLETED":
+            await self.client.make_request("PATCH", f"/bookings/{booking_id}/complete", {},
+                                           token=merchant_token)
+            if review:
+                response = await self.client.make_request("POST", "/reviews", {
+                    "bookingId": booking_id, "rating": review[3],
+                    "comment": review[4] or "",
+                }, token=renter_token)
+                if response is not None and response.status_code in (200, 201):
+                    self.counts["Review"] += 1
+
+    async def _approve_licenses(self):
+        cmd = (f"cd {self.backend_dir} && npx prisma db execute --stdin <<< "
+               f"\"UPDATE \\\"User\\\" SET \\\"licenseStatus\\\" = 'APPROVED', "
+               f"\\\"licenseApprovedAt\\\" = NOW() WHERE \\\"role\\\" = 'RENTER' "
+               f"AND \\\"email\\\" LIKE '%@{SEED_EMAIL_DOMAIN}';\"")
+        process = await asyncio.create_subprocess_shell(
+            cmd, executable="/bin/bash",
+            stdout=asyncio.subprocess.DEVNULL, stderr=asyncio.subprocess.DEVNULL)
+        await process.wait()
+
+    async def run(self) -> Dict[str, int]:
+        connector = aiohttp.TCPConnector(limit=self.concurrency, limit_per_host=0)
+        timeout = aiohttp.ClientTimeout(total=60)
+        async with aiohttp.ClientSession(connector=connector, timeout=timeout) as session:
+            self.client = AsyncRentMyVroomAPITester(session, 0, self.base_url,
+                                                    RateLimiter(self.rps))
+            await self._batched(self.generator.user_rows(), self._create_user)
+            await self._approve_licenses()
+            await self._batched(self.generator.vehicle_rows(), self._create_vehicle)
+            await self._batched(self.generator.booking_rows(), self._create_booking)
+        return self.counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Seed Rent My Vroom with benchmark fixtures")
+    parser.add_argument("mode", choices=["copy", "api"],
+                        help="write COPY files for psql, or create rows through the API")
+    parser.add_argument("--scale", choices=sorted(SCALES), default="small")
+    parser.add_argument("--merchants", type=int)
+    parser.add_argument("--renters", type=int)
+    parser.add_argument("--vehicles", type=int)
+    parser.add_argument("--bookings", type=int)
+    parser.add_argument("--messages", type=int)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--skew", type=float, default=1.1, help="Zipf exponent for popularity")
+    parser.add_argument("--out", default="seed_output", help="COPY output directory")
+    parser.add_argument("--base-url", default="http://localhost:4000")
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--rps", type=float, default=0, help="API mode RPS cap (0 = unthrottled)")
+    parser.add_argument("--backend-dir", default="/app/backend",
+                        help="backend checkout used to approve seeded licenses")
+    args = parser.parse_args()
+
+    volumes = dict(SCALES[args.scale])
+    for key in volumes:
+        if getattr(args, key) is not None:
+            volumes[key] = getattr(args, key)
+    generator = SeedGenerator(seed=args.seed, skew=args.skew, **volumes)
+
+    print(f"🌱 Seeding {args.mode}: " + ", ".join(f"{k}={v:,}" for k, v in volumes.items()))
+    started = time.perf_counter()
+    if args.mode == "copy":
+        counts = write_copy_files(generator, args.out)
+    else:
+        counts = asyncio.run(ApiSeeder(generator, args.base_url, args.concurrency,
+                                       args.rps, args.backend_dir).run())
+    elapsed = time.perf_counter() - started
+
+    for table, count in counts.items():
+        print(f"   {table:<8} {count:>12,}")
+    print(f"Done in {elapsed:.1f}s ({sum(counts.values()) / elapsed:,.0f} rows/s)")
+    if args.mode == "copy":
+        print(f"Load with: cd {args.out} && psql \"$DATABASE_URL\" -f load.sql")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,830 @@
+#!/usr/bin/env python3
+"""
+In-process Stand-in Backend for Rent My Vroom NestJS Application
+Serves the API surface the harness uses from an in-memory store, with injectable latency and errors
+"""
+
+import argparse
+import asyncio
+import base64
+import hashlib
+import hmac
+import itertools
+import json
+import random
+import re
+import secrets
+import smtplib
+import time
+from datetime import datetime, timezone
+from email.message import EmailMessage
+from typing import Dict, Any, List, Optional, Tuple
+
+from aiohttp import web
+
+ROLES = ("MERCHANT", "RENTER", "ADMIN")
+LICENSE_STATUSES = ("PENDING", "APPROVED", "REJECTED")
+FILE_TYPES = ("vehicle-image", "license")
+
+ACCESS_TTL = 15 * 60
+REFRESH_TTL = 7 * 24 * 3600
+
+HTTP_ERRORS = {400: "Bad Request", 401: "Unauthorized", 403: "Forbidden", 404: "Not Found",
+               409: "Conflict", 500: "Internal Server Error"}
+
+# Request DTOs as (kind, required, constraints); unknown properties are rejected like
+# the backend's ValidationPipe({whitelist: true, forbidNonWhitelisted: true})
+REGISTER_DTO = {
+    "email": ("email", True, {}), "password": ("str", True, {"min_length": 8}),
+    "firstName": ("str", True, {}), "lastName": ("str", True, {}),
+    "phone": ("str", False, {}), "role": ("enum", True, {"values": ROLES}),
+    "businessName": ("str", False, {}), "businessAddress": ("str", False, {}),
+}
+LOGIN_DTO = {"email": ("email", True, {}), "password": ("str", True, {})}
+REFRESH_DTO = {"refreshToken": ("str", True, {})}
+UPLOAD_LICENSE_DTO = {"licenseUrl": ("str", True, {})}
+APPROVE_LICENSE_DTO = {"status": ("enum", True, {"values": LICENSE_STATUSES})}
+UPDATE_PROFILE_DTO = {name: ("str", False, {}) for name in
+                      ("firstName", "lastName", "phone", "businessName", "businessAddress")}
+CREATE_VEHICLE_DTO = {
+    "make": ("str", True, {}), "model": ("str", True, {}),
+    "year": ("int", True, {"min": 1900}), "color": ("str", True, {}),
+    "licensePlate": ("str", True, {}),
+    "pricePerHour": ("number", True, {"min": 0}), "pricePerDay": ("number", True, {"min": 0}),
+    "seats": ("int", True, {"min": 1}), "fuelType": ("str", True, {}),
+    "transmission": ("str", True, {}), "mileage": ("int", False, {}),
+    "description": ("str", False, {}), "features": ("str[]", False, {}),
+    "images": ("str[]", False, {}), "isAvailable": ("bool", False, {}),
+}
+UPDATE_VEHICLE_DTO = {name: (kind, False, constraints)
+                      for name, (kind, _, constraints) in CREATE_VEHICLE_DTO.items()
+                      if name != "licensePlate"}
+CREATE_BOOKING_DTO = {
+    "vehicleId": ("int", True, {}), "startDate": ("date", True, {}),
+    "endDate": ("date", True, {}), "renterNotes": ("str", False, {}),
+}
+UPDATE_BOOKING_STATUS_DTO = {"merchantNotes": ("str", False, {})}
+CREATE_MESSAGE_DTO = {"content": ("str", True, {})}
+CREATE_REVIEW_DTO = {
+    "bookingId": ("int", True, {}), "rating": ("int", True, {"min": 1, "max": 5}),
+    "comment": ("str", False, {}),
+}
+PRESIGN_DTO = {
+    "fileName": ("str", True, {}), "contentType": ("str", True, {}),
+    "fileType": ("enum", True, {"values": FILE_TYPES}),
+}
+
+_EMAIL = re.compile(r"^[^@\s]+@[^@\s]+\.[^@\s]+$")
+_ISO_DATE = re.compile(r"^\d{4}-\d{2}-\d{2}([T ]\d{2}:\d{2}(:\d{2}(\.\d+)?)?(Z|[+-]\d{2}:?\d{2})?)?$")
+
+USER_BRIEF = ("id", "firstName", "lastName")
+
+# Subjects NotificationsService sends after each transition
+EMAIL_SUBJECTS = {
+    "PENDING": "New Booking Request Received",
+    "ACCEPTED": "Your Booking Has Been Accepted!",
+    "REJECTED": "Booking Request Update",
+    "COMPLETED": "Booking Completed - Please Leave a Review",
+    "APPROVED": "Your Driving License Has Been Approved!",
+}
+EMAIL_FROM = "noreply@rentmyvroom.test"
+
+
+class ApiError(Exception):
+    """An HTTP error rendered the way Nest's exception filter renders it"""
+
+    def __init__(self, status: int, message: Any = None):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+    def body(self) -> Dict[str, Any]:
+        if self.message is None:
+            return {"statusCode": self.status, "message": HTTP_ERRORS.get(self.status, "Error")}
+        return {"statusCode": self.status, "message": self.message,
+                "error": HTTP_ERRORS.get(self.status, "Error")}
+
+
+def now_iso() -> str:
+    return datetime.now(timezone.utc).isoformat(timespec="milliseconds").replace("+00:00", "Z")
+
+
+def parse_date(value: str) -> datetime:
+    moment = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    return moment if moment.tzinfo else moment.replace(tzinfo=timezone.utc)
+
+
+def decimal_json(value: float) -> str:
+    """Prisma serializes Decimal columns as strings: 100 -> "100", 12.5 -> "12.5" """
+    return f"{value:.2f}".rstrip("0").rstrip(".")
+
+
+def pick(record: Dict[str, Any], fields) -> Dict[str, Any]:
+    return {field: record.get(field) for field in fields}
+
+
+def validate(body: Any, dto: Dict[str, tuple]) -> Dict[str, Any]:
+    """Check a JSON body against a DTO spec, raising 400 with class-validator style messages"""
+    if not isinstance(body, dict):
+        body = {}
+    errors = [f"property {name} should not exist" for name in body if name not in dto]
+    for name, (kind, required, constraints) in dto.items():
+        if name not in body or body[name] is None:
+            if required:
+                errors.append(f"{name} should not be empty")
+            continue
+        value = body[name]
+        if kind == "number" and isinstance(value, str):
+            try:
+                value = body[name] = float(value)
+            except ValueError:
+                pass
+
+        if kind in ("str", "email", "date") and not isinstance(value, str):
+            errors.append(f"{name} must be a string")
+        elif kind == "email" and not _EMAIL.match(value):
+            errors.append(f"{name} must be an email")
+        elif kind == "date" and not _ISO_DATE.match(value):
+            errors.append(f"{name} must be a valid ISO 8601 date string")
+        elif kind == "int" and (isinstance(value, bool) or not isinstance(value, int)):
+            errors.append(f"{name} must be an integer number")
+        elif kind == "number" and (isinstance(value, bool) or not isinstance(value, (int, float))):
+            errors.append(f"{name} must be a number conforming to the specified constraints")
+        elif kind == "bool" and not isinstance(value, bool):
+            errors.append(f"{name} must be a boolean value")
+        elif kind == "str[]" and (not isinstance(value, list)
+                                  or not all(isinstance(v, str) for v in value)):
+            errors.append(f"each value in {name} must be a string")
+        elif kind == "enum" and value not in constraints["values"]:
+            errors.append(f"{name} must be one of the following values: "
+                          f"{', '.join(constraints['values'])}")
+        elif "min_length" in constraints and len(value) < constraints["min_length"]:
+            errors.append(f"{name} must be longer than or equal to "
+                          f"{constraints['min_length']} characters")
+        elif "min" in constraints and value < constraints["min"]:
+            errors.append(f"{name} must not be less than {constraints['min']}")
+        elif "max" in constraints and value > constraints["max"]:
+            errors.append(f"{name} must not be greater than {constraints['max']}")
+    if errors:
+        raise ApiError(400, errors)
+    return body
+
+
+class InMemoryStore:
+    """Tables as id-keyed dicts plus the lookups the services need"""
+
+    def __init__(self):
+        self.ids = {table: itertools.count(1)
+                    for table in ("users", "vehicles", "bookings", "messages", "reviews")}
+        self.users: Dict[int, Dict[str, Any]] = {}
+        self.users_by_email: Dict[str, Dict[str, Any]] = {}
+        self.vehicles: Dict[int, Dict[str, Any]] = {}
+        self.plates: Dict[str, int] = {}
+        self.bookings: Dict[int, Dict[str, Any]] = {}
+        self.bookings_by_renter: Dict[int, List[int]] = {}
+        self.bookings_by_merchant: Dict[int, List[int]] = {}
+        self.messages_by_booking: Dict[int, List[Dict[str, Any]]] = {}
+        self.reviews_by_booking: Dict[int, Dict[str, Any]] = {}
+        self.refresh_tokens: Dict[str, Dict[str, Any]] = {}
+        self.uploads: Dict[str, int] = {}
+
+    def next_id(self, table: str) -> int:
+        return next(self.ids[table])
+
+
+class StubBackend:
+    """aiohttp application mirroring the NestJS controllers, guards and services
+
+    Status codes, role checks and response shapes follow backend/src; there
+    is no Postgres, no bcrypt and no SMTP. Every request first sleeps for
+    `latency` seconds (plus up to `jitter` more, uniformly) and then fails
+    with `error_status` with probability `error_rate`; both draw from one
+    seeded RNG so a single-connection run is reproducible.
+
+    With `auto_approve` a renter's license is approved as soon as it is
+    uploaded, standing in for the `prisma db execute` approval the testers
+    run against the real database.
+
+    With `smtp` (host, port) the booking and license transitions await an
+    email like NotificationsService does: one connection per message, and a
+    failed send is logged, never raised.
+    """
+
+    def __init__(self, latency: float = 0.0, jitter: float = 0.0, error_rate: float = 0.0,
+                 error_status: int = 500, auto_approve: bool = True,
+                 seed: Optional[int] = None, secret: Optional[bytes] = None,
+                 smtp: Optional[Tuple[str, int]] = None):
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.auto_approve = auto_approve
+        self.smtp = smtp
+        self.rng = random.Random(seed)
+        self.secret = secret or secrets.token_bytes(32)
+        self.store = InMemoryStore()
+        self.requests_served = 0
+        self.errors_injected = 0
+        self.base_url = ""
+
+        self.app = web.Application(middlewares=[self._middleware])
+        self.app.add_routes([
+            web.get("/api", self.docs),
+            web.post("/auth/register", self.register),
+            web.post("/auth/login", self.login),
+            web.post("/auth/refresh", self.refresh),
+            web.post("/auth/logout", self.logout),
+            web.get("/auth/profile", self.auth_profile),
+            web.post("/users/upload-license", self.upload_license),
+            web.patch("/users/approve/{userId}", self.approve_license),
+            web.get("/users/me", self.get_profile),
+            web.patch("/users/me", self.update_profile),
+            web.get("/users/pending-licenses", self.pending_licenses),
+            web.post("/vehicles", self.create_vehicle),
+            web.get("/vehicles", self.list_vehicles),
+            web.get("/vehicles/my", self.my_vehicles),
+            web.get("/vehicles/{id}", self.get_vehicle),
+            web.patch("/vehicles/{id}", self.update_vehicle),
+            web.delete("/vehicles/{id}", self.delete_vehicle),
+            web.post("/bookings", self.create_booking),
+            web.get("/bookings/renter", self.renter_bookings),
+            web.get("/bookings/merchant", self.merchant_bookings),
+            web.patch("/bookings/{id}/accept", self.accept_booking),
+            web.patch("/bookings/{id}/reject", self.reject_booking),
+            web.patch("/bookings/{id}/complete", self.complete_booking),
+            web.post("/messages/{bookingId}", self.create_message),
+            web.get("/messages/{bookingId}", self.list_messages),
+            web.post("/reviews", self.create_review),
+            web.get("/reviews/merchant/{merchantId}", self.merchant_reviews),
+            web.post("/uploads/presign", self.presign),
+            web.put("/_uploads/{key:.+}", self.receive_upload),
+        ])
+
+    # ----- plumbing -------------------------------------------------------
+
+    @web.middleware
+    async def _middleware(self, request: web.Request, handler):
+        self.requests_served += 1
+        delay = self.latency + (self.rng.uniform(0, self.jitter) if self.jitter else 0.0)
+        if delay:
+            await asyncio.sleep(delay)
+        try:
+            if self.error_rate and self.rng.random() < self.error_rate:
+                self.errors_injected += 1
+                raise ApiError(self.error_status, "Internal server error"
+                               if self.error_status == 500 else "Injected failure")
+            return await handler(request)
+        except ApiError as e:
+            return web.json_response(e.body(), status=e.status)
+        except web.HTTPNotFound:
+            return web.json_response({"message": f"Cannot {request.method} {request.path}",
+                                      "error": "Not Found", "statusCode": 404}, status=404)
+        except web.HTTPMethodNotAllowed:
+            return web.json_response({"message": f"Cannot {request.method} {request.path}",
+                                      "error": "Not Found", "statusCode": 404}, status=404)
+
+    async def _body(self, request: web.Request, dto: Dict[str, tuple]) -> Dict[str, Any]:
+        raw = await request.read()
+        try:
+            body = json.loads(raw) if raw else {}
+        except ValueError:
+            raise ApiError(400, "Unexpected token in JSON")
+        return validate(body, dto)
+
+    @staticmethod
+    def _int_param(request: web.Request, name: str) -> int:
+        try:
+            return int(request.match_info[name])
+        except ValueError:
+            raise ApiError(400, "Validation failed (numeric string is expected)")
+
+    def _signature(self, signing_input: str) -> str:
+        digest = hmac.new(self.secret, signing_input.encode(), hashlib.sha256).digest()
+        return base64.urlsafe_b64encode(digest).decode().rstrip("=")
+
+    def _sign(self, payload: Dict[str, Any]) -> str:
+        """HS256 JWT, so token_pool.jwt_expiry and friends can read it like the real thing"""
+        signing_input = ".".join(
+            base64.urlsafe_b64encode(part).decode().rstrip("=")
+            for part in (b'{"alg":"HS256","typ":"JWT"}',
+                         json.dumps(payload, separators=(",", ":")).encode()))
+        return f"{signing_input}.{self._signature(signing_input)}"
+
+    def _verify(self, token: str) -> Optional[Dict[str, Any]]:
+        try:
+            signing_input, signature = token.rsplit(".", 1)
+            if not hmac.compare_digest(self._signature(signing_input), signature):
+                return None
+            encoded = signing_input.split(".")[1]
+            payload = json.loads(base64.urlsafe_b64decode(encoded + "=" * (-len(encoded) % 4)))
+        except (ValueError, IndexError):
+            return None
+        return payload if payload.get("exp", 0) > time.time() else None
+
+    def _generate_tokens(self, user: Dict[str, Any]) -> Dict[str, str]:
+        # Like AuthService.generateTokens: a user keeps only their latest refresh token
+        store = self.store
+        for token in [t for t, entry in store.refresh_tokens.items() if entry["userId"] == user["id"]]:
+            del store.refresh_tokens[token]
+        issued = int(time.time())
+        payload = {"sub": user["id"], "email": user["email"], "role": user["role"],
+                   "iat": issued, "jti": secrets.token_hex(8)}
+        access = self._sign(dict(payload, typ="access", exp=issued + ACCESS_TTL))
+        refresh = self._sign(dict(payload, typ="refresh", exp=issued + REFRESH_TTL))
+        store.refresh_tokens[refresh] = {"userId": user["id"], "expiresAt": issued + REFRESH_TTL}
+        return {"accessToken": access, "refreshToken": refresh}
+
+    def _current_user(self, request: web.Request, *roles: str) -> Dict[str, Any]:
+        """JwtAuthGuard, then RolesGuard when roles are given"""
+        header = request.headers.get("Authorization", "")
+        payload = self._verify(header[7:]) if header.startswith("Bearer ") else None
+        if payload is None or payload.get("typ") != "access":
+            raise ApiError(401)
+        user = self.store.users.get(payload["sub"])
+        if user is None:
+            raise ApiError(401)
+        if roles and user["role"] not in roles:
+            raise ApiError(403, "Forbidden resource")
+        return user
+
+    @staticmethod
+    def _json(data: Any, status: int = 200) -> web.Response:
+        return web.json_response(data, status=status)
+
+    # ----- serializers ----------------------------------------------------
+
+    def _vehicle_json(self, vehicle: Dict[str, Any], merchant_fields=None) -> Dict[str, Any]:
+        data = dict(vehicle, pricePerHour=decimal_json(vehicle["pricePerHour"]),
+                    pricePerDay=decimal_json(vehicle["pricePerDay"]))
+        if merchant_fields:
+            data["merchant"] = pick(self.store.users[vehicle["merchantId"]], merchant_fields)
+        return data
+
+    def _booking_json(self, booking: Dict[str, Any], **relations) -> Dict[str, Any]:
+        """relations: name -> True for the whole row, or a tuple of selected fields"""
+        data = dict(booking, totalPrice=decimal_json(booking["totalPrice"]))
+        for name, fields in relations.items():
+            if name == "vehicle":
+                vehicle = self.store.vehicles.get(booking["vehicleId"], {})
+                data["vehicle"] = (self._vehicle_json(vehicle) if fields is True
+                                   else pick(vehicle, fields))
+            else:
+                user = self.store.users[booking[f"{name}Id"]]
+                data[name] = dict(user) if fields is True else pick(user, fields)
+        return data
+
+    def _send_mail(self, to: str, subject: str, html: str):
+        message = EmailMessage()
+        message["From"], message["To"], message["Subject"] = EMAIL_FROM, to, subject
+        message.set_content(html, subtype="html")
+        with smtplib.SMTP(*self.smtp, timeout=30) as client:
+            client.send_message(message)
+
+    async def _notify(self, user: Dict[str, Any], subject: str, booking_id: Optional[int] = None):
+        if not self.smtp:
+            return
+        html = f"<h1>Hello {user['firstName']},</h1><p>Booking {booking_id}</p>"
+        try:
+            await asyncio.to_thread(self._send_mail, user["email"], subject, html)
+        except (OSError, smtplib.SMTPException) as e:
+            print(f"Failed to send email: {e}")
+
+    def _message_json(self, message: Dict[str, Any], receiver: bool = False) -> Dict[str, Any]:
+        data = dict(message, sender=pick(self.store.users[message["senderId"]], USER_BRIEF))
+        if receiver:
+            data["receiver"] = pick(self.store.users[message["receiverId"]], USER_BRIEF)
+        return data
+
+    async def docs(self, request: web.Request) -> web.Response:
+        """Placeholder for the Swagger UI the connectivity check requests"""
+        return web.Response(text="<html><title>RentMyVroom API (stand-in)</title></html>",
+                            content_type="text/html")
+
+    # ----- auth -----------------------------------------------------------
+
+    async def register(self, request: web.Request) -> web.Response:
+        dto = await self._body(request, REGISTER_DTO)
+        store = self.store
+        if dto["email"] in store.users_by_email:
+            raise ApiError(409, "Email already registered")
+        stamp = now_iso()
+        user = {
+            "id": store.next_id("users"), "email": dto["email"],
+            "password": hashlib.sha256(dto["password"].encode()).hexdigest(),
+            "firstName": dto["firstName"], "lastName": dto["lastName"],
+            "phone": dto.get("phone"), "role": dto["role"], "licenseUrl": None,
+            "licenseStatus": "PENDING", "licenseApprovedAt": None,
+            "businessName": dto.get("businessName"), "businessAddress": dto.get("businessAddress"),
+            "createdAt": stamp, "updatedAt": stamp,
+        }
+        store.users[user["id"]] = user
+        store.users_by_email[user["email"]] = user
+        return self._json({"user": pick(user, ("id", "email", "firstName", "lastName", "role",
+                                               "createdAt")),
+                           **self._generate_tokens(user)}, 201)
+
+    async def login(self, request: web.Request) -> web.Response:
+        dto = await self._body(request, LOGIN_DTO)
+        user = self.store.users_by_email.get(dto["email"])
+        if user is None or user["password"] != hashlib.sha256(dto["password"].encode()).hexdigest():
+            raise ApiError(401, "Invalid credentials")
+        return self._json({"user": pick(user, ("id", "email", "firstName", "lastName", "role")),
+                           **self._generate_tokens(user)})
+
+    async def refresh(self, request: web.Request) -> web.Response:
+        dto = await self._body(request, REFRESH_DTO)
+        token = dto["refreshToken"]
+        payload = self._verify(token)
+        stored = self.store.refresh_tokens.pop(token, None)
+        if payload is None or stored is None or stored["expiresAt"] < time.time():
+            raise ApiError(401, "Invalid refresh token")
+        user = self.store.users.get(stored["userId"])
+        if user is None:
+            raise ApiError(401, "Invalid refresh token")
+        return self._json(self._generate_tokens(user))
+
+    async def logout(self, request: web.Request) -> web.Response:
+        self._current_user(request)
+        dto = await self._body(request, REFRESH_DTO)
+        self.store.refresh_tokens.pop(dto["refreshToken"], None)
+        return self._json({"message": "Logged out successfully"})
+
+    async def auth_profile(self, request: web.Request) -> web.Response:
+        user = self._current_user(request)
+        return self._json(pick(user, ("id", "email", "firstName", "lastName", "role",
+                                      "licenseStatus")))
+
+    # ----- users ----------------------------------------------------------
+
+    async def upload_license(self, request: web.Request) -> web.Response:
+        user = self._current_user(request)
+        dto = await self._body(request, UPLOAD_LICENSE_DTO)
+        if user["role"] != "RENTER":
+            raise ApiError(403, "Only renters can upload licenses")
+        user.update(licenseUrl=dto["licenseUrl"], licenseStatus="PENDING", updatedAt=now_iso())
+        response = pick(user, ("id", "email", "firstName", "lastName", "licenseUrl",
+                               "licenseStatus"))
+        if self.auto_approve:
+            self.approve(user["id"])
+        return self._json(response, 201)
+
+    def approve(self, user_id: int) -> bool:
+        """Approve a license in-process, as the testers' database workaround does for real"""
+        user = self.store.users.get(user_id)
+        if user is None:
+            return False
+        user.update(licenseStatus="APPROVED", licenseApprovedAt=now_iso())
+        return True
+
+    async def approve_license(self, request: web.Request) -> web.Response:
+        self._current_user(request, "ADMIN")
+        user_id = self._int_param(request, "userId")
+        dto = await self._body(request, APPROVE_LICENSE_DTO)
+        user = self.store.users.get(user_id)
+        if user is None:
+            raise ApiError(404, "User not found")
+        user.update(licenseStatus=dto["status"], updatedAt=now_iso(),
+                    licenseApprovedAt=now_iso() if dto["status"] == "APPROVED" else None)
+        if dto["status"] == "APPROVED":
+            await self._notify(user, EMAIL_SUBJECTS["APPROVED"])
+        return self._json(pick(user, ("id", "email", "firstName", "lastName", "licenseUrl",
+                                      "licenseStatus", "licenseApprovedAt")))
+
+    async def get_profile(self, request: web.Request) -> web.Response:
+        user = self._current_user(request)
+        return self._json({key: value for key, value in user.items() if key != "password"})
+
+    async def update_profile(self, request: web.Request) -> web.Response:
+        user = self._current_user(request)
+        dto = await self._body(request, UPDATE_PROFILE_DTO)
+        user.update(dto, updatedAt=now_iso())
+        return self._json(pick(user, ("id", "email", "firstName", "lastName", "phone", "role",
+                                      "businessName", "businessAddress")))
+
+    async def pending_licenses(self, request: web.Request) -> web.Response:
+        self._current_user(request, "ADMIN")
+        pending = [pick(user, ("id", "email", "firstName", "lastName", "licenseUrl",
+                               "licenseStatus", "createdAt"))
+                   for user in reversed(list(self.store.users.values()))
+                   if user["role"] == "RENTER" and user["licenseStatus"] == "PENDING"]
+        return self._json(pending)
+
+    # ----- vehicles -------------------------------------------------------
+
+    async def create_vehicle(self, request: web.Request) -> web.Response:
+        merchant = self._current_user(request, "MERCHANT")
+        dto = await self._body(request, CREATE_VEHICLE_DTO)
+        store = self.store
+        if dto["licensePlate"] in store.plates:
+            raise ApiError(409, "Vehicle with this license plate already exists")
+        stamp = now_iso()
+        vehicle = {
+            "id": store.next_id("vehicles"), "merchantId": merchant["id"],
+            "make": dto["make"], "model": dto["model"], "year": dto["year"],
+            "color": dto["color"], "licensePlate": dto["licensePlate"],
+            "pricePerHour": float(dto["pricePerHour"]), "pricePerDay": float(dto["pricePerDay"]),
+            "seats": dto["seats"], "fuelType": dto["fuelType"],
+            "transmission": dto["transmission"], "mileage": dto.get("mileage"),
+            "description": dto.get("description"), "features": dto.get("features") or [],
+            "images": dto.get("images") or [], "isAvailable": dto.get("isAvailable", True),
+            "createdAt": stamp, "updatedAt": stamp,
+        }
+        store.vehicles[vehicle["id"]] = vehicle
+        store.plates[vehicle["licensePlate"]] = vehicle["id"]
+        return self._json(self._vehicle_json(
+            vehicle, ("id", "firstName", "lastName", "businessName")), 201)
+
+    async def list_vehicles(self, request: web.Request) -> web.Response:
+        available = request.query.get("isAvailable")
+        vehicles = [self._vehicle_json(v, ("id", "firstName", "lastName", "businessName"))
+                    for v in reversed(list(self.store.vehicles.values()))
+                    if available is None or v["isAvailable"] == (available == "true")]
+        return self._json(vehicles)
+
+    async def my_vehicles(self, request: web.Request) -> web.Response:
+        merchant = self._current_user(request, "MERCHANT")
+        return self._json([self._vehicle_json(v) for v in reversed(list(self.store.vehicles.values()))
+                           if v["merchantId"] == merchant["id"]])
+
+    async def get_vehicle(self, request: web.Request) -> web.Response:
+        vehicle = self.store.vehicles.get(self._int_param(request, "id"))
+        if vehicle is None:
+            raise ApiError(404, "Vehicle not found")
+        data = self._vehicle_json(vehicle, ("id", "firstName", "lastName", "businessName",
+                                            "businessAddress", "phone"))
+        data["bookings"] = [pick(b, ("id", "startDate", "endDate", "status"))
+                            for b in self.store.bookings.values()
+                            if b["vehicleId"] == vehicle["id"]
+                            and b["status"] in ("ACCEPTED", "PENDING")]
+        return self._json(data)
+
+    def _own_vehicle(self, request: web.Request, merchant: Dict[str, Any], action: str):
+        vehicle = self.store.vehicles.get(self._int_param(request, "id"))
+        if vehicle is None:
+            raise ApiError(404, "Vehicle not found")
+        if vehicle["merchantId"] != merchant["id"]:
+            raise ApiError(403, f"You can only {action} your own vehicles")
+        return vehicle
+
+    async def update_vehicle(self, request: web.Request) -> web.Response:
+        merchant = self._current_user(request, "MERCHANT")
+        dto = await self._body(request, UPDATE_VEHICLE_DTO)
+        vehicle = self._own_vehicle(request, merchant, "update")
+        for price in ("pricePerHour", "pricePerDay"):
+            if price in dto:
+                dto[price] = float(dto[price])
+        vehicle.update(dto, updatedAt=now_iso())
+        return self._json(self._vehicle_json(vehicle))
+
+    async def delete_vehicle(self, request: web.Request) -> web.Response:
+        merchant = self._current_user(request, "MERCHANT")
+        vehicle = self._own_vehicle(request, merchant, "delete")
+        store = self.store
+        del store.vehicles[vehicle["id"]]
+        del store.plates[vehicle["licensePlate"]]
+        # onDelete: Cascade
+        for booking_id in [b for b, booking in store.bookings.items()
+                           if booking["vehicleId"] == vehicle["id"]]:
+            booking = store.bookings.pop(booking_id)
+            store.bookings_by_renter[booking["renterId"]].remove(booking_id)
+            store.bookings_by_merchant[booking["merchantId"]].remove(booking_id)
+            store.messages_by_booking.pop(booking_id, None)
+            store.reviews_by_booking.pop(booking_id, None)
+        return self._json({"message": "Vehicle deleted successfully"})
+
+    # ----- bookings -------------------------------------------------------
+
+    async def create_booking(self, request: web.Request) -> web.Response:
+        renter = self._current_user(request, "RENTER")
+        dto = await self._body(request, CREATE_BOOKING_DTO)
+        if renter["licenseStatus"] != "APPROVED":
+            raise ApiError(403, "Your driving license must be approved before booking")
+        store = self.store
+        vehicle = store.vehicles.get(dto["vehicleId"])
+        if vehicle is None:
+            raise ApiError(404, "Vehicle not found")
+        if not vehicle["isAvailable"]:
+            raise ApiError(400, "Vehicle is not available")
+
+        start, end = parse_date(dto["startDate"]), parse_date(dto["endDate"])
+        days = -(-(end - start).total_seconds() // 86400)
+        stamp = now_iso()
+        booking = {
+            "id": store.next_id("bookings"), "renterId": renter["id"],
+            "merchantId": vehicle["merchantId"], "vehicleId": vehicle["id"],
+            "startDate": start.isoformat(timespec="milliseconds").replace("+00:00", "Z"),
+            "endDate": end.isoformat(timespec="milliseconds").replace("+00:00", "Z"),
+            "totalPrice": vehicle["pricePerDay"] * days, "status": "PENDING",
+            "renterNotes": dto.get("renterNotes"), "merchantNotes": None,
+            "createdAt": stamp, "updatedAt": stamp,
+            "acceptedAt": None, "rejectedAt": None, "completedAt": None,
+        }
+        store.bookings[booking["id"]] = booking
+        store.bookings_by_renter.setdefault(renter["id"], []).append(booking["id"])
+        store.bookings_by_merchant.setdefault(vehicle["merchantId"], []).append(booking["id"])
+        await self._notify(store.users[vehicle["merchantId"]], EMAIL_SUBJECTS["PENDING"],
+                           booking["id"])
+        return self._json(self._booking_json(booking, vehicle=True, renter=True, merchant=True), 201)
+
+    async def renter_bookings(self, request: web.Request) -> web.Response:
+        renter = self._current_user(request, "RENTER")
+        store = self.store
+        return self._json([self._booking_json(store.bookings[b], vehicle=True, merchant=(
+            "id", "firstName", "lastName", "businessName", "phone"))
+            for b in reversed(store.bookings_by_renter.get(renter["id"], []))])
+
+    async def merchant_bookings(self, request: web.Request) -> web.Response:
+        merchant = self._current_user(request, "MERCHANT")
+        store = self.store
+        return self._json([self._booking_json(store.bookings[b], vehicle=True, renter=(
+            "id", "firstName", "lastName", "phone", "email"))
+            for b in reversed(store.bookings_by_merchant.get(merchant["id"], []))])
+
+    async def _transition(self, request: web.Request, required: str, status: str,
+                          verb: str, stamp_field: str, dto_spec=None) -> web.Response:
+        merchant = self._current_user(request, "MERCHANT")
+        booking_id = self._int_param(request, "id")
+        dto = await self._body(request, dto_spec) if dto_spec else {}
+        booking = self.store.bookings.get(booking_id)
+        if booking is None:
+            raise ApiError(404, "Booking not found")
+        if booking["merchantId"] != merchant["id"]:
+            raise ApiError(403, "You can only manage your own bookings")
+        if booking["status"] != required:
+            raise ApiError(400, f"Only {required.lower()} bookings can be {verb}")
+        stamp = now_iso()
+        booking.update({"status": status, stamp_field: stamp, "updatedAt": stamp})
+        if dto_spec:
+            booking["merchantNotes"] = dto.get("merchantNotes")
+        await self._notify(self.store.users[booking["renterId"]], EMAIL_SUBJECTS[status],
+                           booking_id)
+        return self._json(self._booking_json(booking, vehicle=True, renter=True))
+
+    async def accept_booking(self, request: web.Request) -> web.Response:
+        return await self._transition(request, "PENDING", "ACCEPTED", "accepted", "acceptedAt",
+                                      UPDATE_BOOKING_STATUS_DTO)
+
+    async def reject_booking(self, request: web.Request) -> web.Response:
+        return await self._transition(request, "PENDING", "REJECTED", "rejected", "rejectedAt",
+                                      UPDATE_BOOKING_STATUS_DTO)
+
+    async def complete_booking(self, request: web.Request) -> web.Response:
+        return await self._transition(request, "ACCEPTED", "COMPLETED", "completed",
+                                      "completedAt")
+
+    # ----- messages -------------------------------------------------------
+
+    def _participant_booking(self, request: web.Request, user: Dict[str, Any], action: str):
+        booking = self.store.bookings.get(self._int_param(request, "bookingId"))
+        if booking is None:
+            raise ApiError(404, "Booking not found")
+        if user["id"] not in (booking["renterId"], booking["merchantId"]):
+            raise ApiError(403, f"You can only {action} messages for your own bookings")
+        return booking
+
+    async def create_message(self, request: web.Request) -> web.Response:
+        user = self._current_user(request)
+        dto = await self._body(request, CREATE_MESSAGE_DTO)
+        booking = self._participant_booking(request, user, "send")
+        receiver = booking["merchantId"] if user["id"] == booking["renterId"] else booking["renterId"]
+        message = {"id": self.store.next_id("messages"), "bookingId": booking["id"],
+                   "senderId": user["id"], "receiverId": receiver, "content": dto["content"],
+                   "isRead": False, "createdAt": now_iso()}
+        self.store.messages_by_booking.setdefault(booking["id"], []).append(message)
+        return self._json(self._message_json(message, receiver=True), 201)
+
+    async def list_messages(self, request: web.Request) -> web.Response:
+        user = self._current_user(request)
+        booking = self._participant_booking(request, user, "view")
+        messages = self.store.messages_by_booking.get(booking["id"], [])
+        response = [self._message_json(message) for message in messages]
+        # Read receipts are written after the thread is read, as in MessagesService
+        for message in messages:
+            if message["receiverId"] == user["id"]:
+                message["isRead"] = True
+        return self._json(response)
+
+    # ----- reviews --------------------------------------------------------
+
+    async def create_review(self, request: web.Request) -> web.Response:
+        reviewer = self._current_user(request, "RENTER")
+        dto = await self._body(request, CREATE_REVIEW_DTO)
+        store = self.store
+        booking = store.bookings.get(dto["bookingId"])
+        if booking is None:
+            raise ApiError(404, "Booking not found")
+        if booking["renterId"] != reviewer["id"]:
+            raise ApiError(403, "Only the renter can review this booking")
+        if booking["status"] != "COMPLETED":
+            raise ApiError(400, "Can only review completed bookings")
+        if booking["id"] in store.reviews_by_booking:
+            raise ApiError(400, "Booking already has a review")
+        stamp = now_iso()
+        review = {"id": store.next_id("reviews"), "bookingId": booking["id"],
+                  "reviewerId": reviewer["id"], "rating": dto["rating"],
+                  "comment": dto.get("comment"), "createdAt": stamp, "updatedAt": stamp}
+        store.reviews_by_booking[booking["id"]] = review
+        return self._json(dict(review, reviewer=pick(reviewer, USER_BRIEF),
+                               booking=self._booking_json(booking, vehicle=True)), 201)
+
+    async def merchant_reviews(self, request: web.Request) -> web.Response:
+        merchant_id = self._int_param(request, "merchantId")
+        store = self.store
+        reviews = [dict(review, reviewer=pick(store.users[review["reviewerId"]], USER_BRIEF),
+                        booking=self._booking_json(store.bookings[review["bookingId"]],
+                                                   vehicle=("id", "make", "model", "year")))
+                   for review in reversed(list(store.reviews_by_booking.values()))
+                   if store.bookings[review["bookingId"]]["merchantId"] == merchant_id]
+        average = sum(r["rating"] for r in reviews) / len(reviews) if reviews else 0
+        return self._json({"reviews": reviews, "averageRating": round(average * 10) / 10,
+                           "totalReviews": len(reviews)})
+
+    # ----- uploads --------------------------------------------------------
+
+    async def presign(self, request: web.Request) -> web.Response:
+        user = self._current_user(request)
+        dto = await self._body(request, PRESIGN_DTO)
+        extension = dto["fileName"].split(".")[-1]
+        key = (f"{dto['fileType']}/{user['id']}/{int(time.time() * 1000)}-"
+               f"{secrets.token_hex(3)}.{extension}")
+        base = self.base_url or f"{request.scheme}://{request.host}"
+        return self._json({"uploadUrl": f"{base}/_uploads/{key}",
+                           "publicUrl": f"{base}/_uploads/{key}", "key": key}, 201)
+
+    async def receive_upload(self, request: web.Request) -> web.Response:
+        """Object-store stand-in: drains the PUT body and remembers only its size
+
+        Like S3 and R2, a presigned PUT without a Content-Length is refused.
+        """
+        if request.content_length is None:
+            return web.Response(status=411, text="MissingContentLength")
+        size = 0
+        async for chunk in request.content.iter_chunked(1 << 16):
+            size += len(chunk)
+        self.store.uploads[request.match_info["key"]] = size
+        return web.Response(status=200)
+
+    # ----- lifecycle ------------------------------------------------------
+
+    async def start(self, host: str = "127.0.0.1", port: int = 0) -> str:
+        """Serve on the running event loop; returns the base URL (port 0 = any free port)"""
+        self.runner = web.AppRunner(self.app, access_log=None)
+        await self.runner.setup()
+        site = web.TCPSite(self.runner, host, port)
+        await site.start()
+        bound_port = site._server.sockets[0].getsockname()[1]
+        self.base_url = f"http://{host}:{bound_port}"
+        return self.base_url
+
+    async def stop(self):
+        await self.runner.cleanup()
+
+    async def __aenter__(self) -> "StubBackend":
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="In-memory stand-in for the Rent My Vroom API")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=4000)
+    parser.add_argument("--latency", type=float, default=0.0, help="ms added to every request")
+    parser.add_argument("--jitter", type=float, default=0.0, help="up to this many extra ms, uniform")
+    parser.add_argument("--error-rate", type=float, default=0.0,
+                        help="fraction of requests failed with --error-status")
+    parser.add_argument("--error-status", type=int, default=500)
+    parser.add_argument("--manual-approval", action="store_true",
+                        help="keep uploaded licenses PENDING until an ADMIN approves them")
+    parser.add_argument("--seed", type=int, help="seed latency and error injection")
+    parser.add_argument("--smtp", metavar="HOST:PORT",
+                        help="send booking emails inline here (see notification_bench.py sink)")
+    args = parser.parse_args()
+
+    smtp = None
+    if args.smtp:
+        host, port = args.smtp.rsplit(":", 1)
+        smtp = (host, int(port))
+    backend = StubBackend(args.latency / 1000, args.jitter / 1000, args.error_rate,
+                          args.error_status, not args.manual_approval, args.seed, smtp=smtp)
+
+    async def serve():
+        base_url = await backend.start(args.host, args.port)
+        print(f"🧪 Stand-in backend listening on {base_url}")
+        try:
+            await asyncio.Event().wait()
+        finally:
+            await backend.stop()
+            print(f"Served {backend.requests_served} requests "
+                  f"({backend.errors_injected} injected errors)")
+
+    try:
+        asyncio.run(serve())
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
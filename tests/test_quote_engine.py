@@ -0,0 +1,68 @@
+"""Differential tests for quote_engine: vectorized engine vs the scalar formulas"""
+
+import pytest
+
+from quote_engine import (DAY_MS, HOUR_MS, PricingPolicy, QuoteEngine, VehicleCatalog,
+                          backend_total, quote_row, random_windows, sample_records, to_ms)
+
+SEED = 7
+START = to_ms("2026-03-14T09:30:00Z")
+
+# Whole days, a millisecond either side of them, and sub-day windows
+BOUNDARY_LENGTHS = [
+    length
+    for days in (1, 2, 3, 7, 28)
+    for length in (days * DAY_MS - 1, days * DAY_MS, days * DAY_MS + 1)
+] + [1, HOUR_MS - 1, HOUR_MS, HOUR_MS + 1, 6 * HOUR_MS, DAY_MS // 2]
+
+
+@pytest.fixture(scope="module")
+def records():
+    return sample_records(60, SEED)
+
+
+@pytest.fixture(scope="module")
+def catalog(records):
+    return VehicleCatalog.from_records(records)
+
+
+def _windows():
+    starts, ends = random_windows(40, SEED)
+    starts = list(starts) + [START] * len(BOUNDARY_LENGTHS)
+    ends = list(ends) + [START + length for length in BOUNDARY_LENGTHS]
+    return starts, ends
+
+
+def test_legacy_matches_backend_formula(records, catalog):
+    starts, ends = _windows()
+    quotes = QuoteEngine(catalog, PricingPolicy.named("legacy")).quote_windows(starts, ends)
+    for w, (start, end) in enumerate(zip(starts, ends)):
+        for v, record in enumerate(records):
+            expected = backend_total(record["pricePerDay"], int(start), int(end))
+            assert quotes[w, v] == int(expected * 100), (record["pricePerDay"], end - start)
+
+
+@pytest.mark.parametrize("grace_minutes", [0, 30])
+def test_hourly_matches_quote_row(catalog, grace_minutes):
+    policy = PricingPolicy.named("hourly", grace_minutes=grace_minutes)
+    starts, ends = _windows()
+    quotes = QuoteEngine(catalog, policy).quote_windows(starts, ends)
+    for w, (start, end) in enumerate(zip(starts, ends)):
+        for v in range(len(catalog)):
+            expected = quote_row(int(catalog.hour_cents[v]), int(catalog.day_cents[v]),
+                                 int(start), int(end), policy)
+            assert quotes[w, v] == expected, (v, end - start)
+
+
+@pytest.mark.parametrize("length", BOUNDARY_LENGTHS)
+def test_legacy_bills_every_started_day(length):
+    catalog = VehicleCatalog.from_records([{"id": 1, "pricePerDay": "100.00",
+                                            "pricePerHour": "0"}])
+    quote = QuoteEngine(catalog, PricingPolicy.named("legacy")).quote(START, START + length)
+    assert quote[0] == -(-length // DAY_MS) * 10_000
+
+
+def test_hourly_rejects_empty_window(catalog):
+    engine = QuoteEngine(catalog, PricingPolicy.named("hourly"))
+    with pytest.raises(ValueError):
+        engine.quote(START, START)
@@ -0,0 +1,240 @@
+#!/usr/bin/env python3
+"""
+Pre-authenticated User Pool for Rent My Vroom Load Tests
+Keeps registered renters and merchants with cached tokens on disk, refreshed lazily
+"""
+
+import argparse
+import asyncio
+import base64
+import fcntl
+import json
+import os
+import time
+from typing import Dict, Any, List, Optional
+
+import aiohttp
+import requests
+
+POOL_EMAIL_DOMAIN = "pool.rentmyvroom.test"
+POOL_PASSWORD = "Test123!"
+
+
+def jwt_expiry(token: str) -> float:
+    """Unix time a JWT expires at, read from its (unverified) payload"""
+    try:
+        payload = token.split(".")[1]
+        payload += "=" * (-len(payload) % 4)
+        return float(json.loads(base64.urlsafe_b64decode(payload))["exp"])
+    except (IndexError, KeyError, ValueError):
+        return 0.0
+
+
+class TokenPool:
+    """Registered users with cached access and refresh tokens, stored as JSON
+
+    AuthService.generateTokens deletes a user's other refresh tokens on every
+    login or refresh, so an entry must only ever be refreshed by one holder.
+    Leases are therefore handed out by virtual-user index, and processes
+    running disjoint index ranges can safely share one pool file. The pool
+    size caps concurrency: each virtual user needs its own renter and
+    merchant, so top the pool up before raising --users past capacity().
+    """
+
+    def __init__(self, path: str = "token_pool.json", base_url: str = "http://localhost:4000",
+                 refresh_margin: float = 60.0, backend_dir: str = "/app/backend"):
+        self.path = path
+        self.base_url = base_url
+        self.refresh_margin = refresh_margin
+        self.backend_dir = backend_dir
+        self.entries: Dict[str, List[Dict[str, Any]]] = {"renter": [], "merchant": []}
+        self.locks: Dict[str, asyncio.Lock] = {}
+        self.refreshes = 0
+        self.logins = 0
+        self.load()
+
+    def load(self):
+        if os.path.exists(self.path):
+            with open(self.path, encoding="utf-8") as f:
+                self.entries.update(json.load(f))
+
+    def save(self):
+        """Merge with the file on disk (newest tokens win) and replace it atomically"""
+        with open(f"{self.path}.lock", "w") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            on_disk = {"renter": [], "merchant": []}
+            if os.path.exists(self.path):
+                with open(self.path, encoding="utf-8") as f:
+                    on_disk.update(json.load(f))
+            for role, entries in self.entries.items():
+                merged = {e["email"]: e for e in on_disk.get(role, [])}
+                for entry in entries:
+                    current = merged.get(entry["email"])
+                    if current is None or entry["accessExpiresAt"] >= current["accessExpiresAt"]:
+                        merged[entry["email"]] = entry
+                on_disk[role] = sorted(merged.values(), key=lambda e: e["index"])
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(on_disk, f, indent=1)
+            os.replace(tmp_path, self.path)
+
+    def _store_tokens(self, entry: Dict[str, Any], result: Dict[str, Any]):
+        entry["accessToken"] = result["accessToken"]
+        entry["refreshToken"] = result["refreshToken"]
+        entry["accessExpiresAt"] = jwt_expiry(result["accessToken"])
+        entry["refreshExpiresAt"] = jwt_expiry(result["refreshToken"])
+
+    async def _post(self, session: aiohttp.ClientSession, endpoint: str,
+                    data: Dict) -> Optional[Dict[str, Any]]:
+        try:
+            async with session.post(f"{self.base_url}{endpoint}", json=data) as response:
+                if response.status in (200, 201):
+                    return await response.json()
+        except (aiohttp.ClientError, asyncio.TimeoutError):
+            pass
+        return None
+
+    async def _login(self, session: aiohttp.ClientSession, entry: Dict[str, Any]) -> bool:
+        result = await self._post(session, "/auth/login",
+                                  {"email": entry["email"], "password": entry["password"]})
+        if result is None:
+            return False
+        entry["userId"] = result["user"]["id"]
+        self._store_tokens(entry, result)
+        self.logins += 1
+        return True
+
+    async def _register(self, session: aiohttp.ClientSession, role: str, index: int,
+                        semaphore: asyncio.Semaphore) -> Optional[Dict[str, Any]]:
+        entry = {"index": index, "role": role.upper(), "password": POOL_PASSWORD,
+                 "email": f"{role}{index}@{POOL_EMAIL_DOMAIN}"}
+        payload = {"email": entry["email"], "password": POOL_PASSWORD,
+                   "firstName": "Pool", "lastName": f"{role.title()}{index}",
+                   "role": entry["role"]}
+        if role == "merchant":
+            payload.update(businessName=f"Pool Rentals {index}", businessAddress="1 Load St")
+
+        async with semaphore:
+            result = await self._post(session, "/auth/register", payload)
+            if result is not None:
+                entry["userId"] = result["user"]["id"]
+                self._store_tokens(entry, result)
+            elif not await self._login(session, entry):
+                # Neither a fresh registration nor an existing account
+                return None
+            if role == "renter":
+                async with session.post(f"{self.base_url}/users/upload-license",
+                                        json={"licenseUrl": "https://example.com/license.jpg"},
+                                        headers={"Authorization": f"Bearer {entry['accessToken']}"}):
+                    pass
+        return entry
+
+    async def _approve_licenses(self):
+        # Same test-only workaround as backend_test.py: there is no admin user to approve with
+        cmd = (f"cd {self.backend_dir} && npx prisma db execute --stdin <<< "
+               f"\"UPDATE \\\"User\\\" SET \\\"licenseStatus\\\" = 'APPROVED', "
+               f"\\\"licenseApprovedAt\\\" = NOW() WHERE \\\"role\\\" = 'RENTER' "
+               f"AND \\\"email\\\" LIKE '%@{POOL_EMAIL_DOMAIN}';\"")
+        process = await asyncio.create_subprocess_shell(
+            cmd, executable="/bin/bash",
+            stdout=asyncio.subprocess.DEVNULL, stderr=asyncio.subprocess.DEVNULL)
+        await process.wait()
+
+    async def ensure(self, renters: int, merchants: int, concurrency: int = 32):
+        """Register whatever is missing so the pool holds at least this many users"""
+        semaphore = asyncio.Semaphore(concurrency)
+        async with aiohttp.ClientSession() as session:
+            for role, wanted in (("renter", renters), ("merchant", merchants)):
+                existing = {e["index"] for e in self.entries[role]}
+                missing = [i for i in range(wanted) if i not in existing]
+                created = await asyncio.gather(*(self._register(session, role, i, semaphore)
+                                                 for i in missing))
+                self.entries[role].extend(e for e in created if e is not None)
+        await self._approve_licenses()
+        self.save()
+
+    def capacity(self) -> int:
+        """How many virtual users can hold a renter and a merchant of their own"""
+        return min(len(self.entries["renter"]), len(self.entries["merchant"]))
+
+    def lease(self, role: str, index: int, shared: bool = False) -> Dict[str, Any]:
+        """The pool entry reserved for virtual user `index`
+
+        An index past the end of the pool is an error, since wrapping around
+        would give one refresh token several holders. Callers that reuse
+        entries within this process only (token() serializes refreshes per
+        entry) pass shared=True to wrap instead.
+        """
+        entries = self.entries[role]
+        if not entries:
+            raise ValueError(f"Token pool {self.path} has no {role} users; run token_pool.py first")
+        if index >= len(entries) and not shared:
+            raise ValueError(f"Token pool {self.path} has {len(entries)} {role} users, too few for "
+                             f"virtual user {index}; run token_pool.py --{role}s {index + 1}")
+        return entries[index % len(entries)]
+
+    async def token(self, session: aiohttp.ClientSession, entry: Dict[str, Any]) -> str:
+        """Entry's access token, refreshed (or re-logged-in) first if it is about to expire"""
+        if entry["accessExpiresAt"] - time.time() > self.refresh_margin:
+            return entry["accessToken"]
+
+        lock = self.locks.setdefault(entry["email"], asyncio.Lock())
+        async with lock:
+            if entry["accessExpiresAt"] - time.time() > self.refresh_margin:
+                return entry["accessToken"]
+            result = None
+            if entry["refreshExpiresAt"] - time.time() > self.refresh_margin:
+                result = await self._post(session, "/auth/refresh",
+                                          {"refreshToken": entry["refreshToken"]})
+            if result is not None:
+                self._store_tokens(entry, result)
+                self.refreshes += 1
+            else:
+                await self._login(session, entry)
+        return entry["accessToken"]
+
+    def token_sync(self, session: requests.Session, entry: Dict[str, Any]) -> str:
+        """token() for blocking tools on a requests.Session; no network while still fresh"""
+        if entry["accessExpiresAt"] - time.time() > self.refresh_margin:
+            return entry["accessToken"]
+
+        def post(endpoint: str, data: Dict) -> Optional[Dict[str, Any]]:
+            try:
+                response = session.post(f"{self.base_url}{endpoint}", json=data, timeout=30)
+            except requests.RequestException:
+                return None
+            return response.json() if response.status_code in (200, 201) else None
+
+        result = None
+        if entry["refreshExpiresAt"] - time.time() > self.refresh_margin:
+            result = post("/auth/refresh", {"refreshToken": entry["refreshToken"]})
+            self.refreshes += result is not None
+        if result is None:
+            result = post("/auth/login", {"email": entry["email"], "password": entry["password"]})
+            if result is not None:
+                entry["userId"] = result["user"]["id"]
+                self.logins += 1
+        if result is not None:
+            self._store_tokens(entry, result)
+        return entry["accessToken"]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Create or top up the load-test token pool")
+    parser.add_argument("--path", default="token_pool.json")
+    parser.add_argument("--base-url", default="http://localhost:4000")
+    parser.add_argument("--renters", type=int, default=100)
+    parser.add_argument("--merchants", type=int, default=100)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--backend-dir", default="/app/backend",
+                        help="backend checkout used to approve pool licenses")
+    args = parser.parse_args()
+
+    pool = TokenPool(args.path, args.base_url, backend_dir=args.backend_dir)
+    asyncio.run(pool.ensure(args.renters, args.merchants, args.concurrency))
+    print(f"🔑 Token pool {args.path}: {len(pool.entries['renter'])} renters, "
+          f"{len(pool.entries['merchant'])} merchants")
+
+
+if __name__ == "__main__":
+    main()
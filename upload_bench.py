@@ -0,0 +1,259 @@
+#!/usr/bin/env python3
+"""
+Vehicle Image Upload Benchmark for Rent My Vroom NestJS Application
+Runs the add-vehicle flow (presign, PUT each photo, POST /vehicles) with photos streamed from mmap'd files
+"""
+
+import argparse
+import asyncio
+import mmap
+import os
+import resource
+import shutil
+import tempfile
+import time
+from typing import Dict, Any, List, Optional
+
+import aiohttp
+
+from latency_stats import LatencyRecorder
+from load_test import AsyncRentMyVroomAPITester
+from stub_backend import StubBackend
+from token_pool import TokenPool
+
+CONTENT_TYPES = {"jpg": "image/jpeg", "jpeg": "image/jpeg", "png": "image/png",
+                 "webp": "image/webp", "heic": "image/heic"}
+
+# A JPEG start-of-image marker, so object stores sniffing content see an image
+_JPEG_HEADER = b"\xff\xd8\xff\xe0\x00\x10JFIF\x00"
+
+
+class MappedImage:
+    """A photo on disk, mapped read-only once and shared by every upload of it
+
+    Request bodies are memoryview slices of the mapping: no base64, no
+    read() into a Python buffer, and concurrent uploads of the same file
+    share the page cache instead of holding private copies.
+    """
+
+    def __init__(self, path: str, chunk_size: int = 256 * 1024):
+        self.path = path
+        self.name = os.path.basename(path)
+        self.extension = self.name.rsplit(".", 1)[-1].lower()
+        self.content_type = CONTENT_TYPES.get(self.extension, "application/octet-stream")
+        self.chunk_size = chunk_size
+        with open(path, "rb") as f:
+            self.size = os.fstat(f.fileno()).st_size
+            self.map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self.view = memoryview(self.map)
+
+    async def chunks(self):
+        for offset in range(0, self.size, self.chunk_size):
+            yield self.view[offset:offset + self.chunk_size]
+
+    def close(self):
+        self.view.release()
+        self.map.close()
+
+
+def generate_images(directory: str, count: int, size: int) -> List[str]:
+    """Write `count` synthetic JPEGs of `size` bytes, one megabyte at a time"""
+    paths = []
+    for index in range(count):
+        path = os.path.join(directory, f"vehicle-{index:03d}.jpg")
+        with open(path, "wb") as f:
+            f.write(_JPEG_HEADER)
+            remaining = size - len(_JPEG_HEADER)
+            while remaining > 0:
+                block = os.urandom(min(remaining, 1 << 20))
+                f.write(block)
+                remaining -= len(block)
+        paths.append(path)
+    return paths
+
+
+class UploadBenchmark:
+    """Merchants concurrently listing vehicles with `photos` images each
+
+    One listing is the app's add-vehicle flow: POST /uploads/presign and a
+    PUT to the returned uploadUrl per photo (up to `parallel_uploads` at a
+    time), then POST /vehicles carrying the public URLs. Its end-to-end time
+    is recorded next to the per-request latencies.
+    """
+
+    def __init__(self, images: List[MappedImage], base_url: str = "http://localhost:4000",
+                 merchants: int = 4, listings: int = 5, photos: int = 6,
+                 parallel_uploads: int = 3, connections: int = 100,
+                 token_pool: Optional[TokenPool] = None):
+        self.images = images
+        self.base_url = base_url
+        self.merchants = merchants
+        self.listings = listings
+        self.photos = photos
+        self.parallel_uploads = parallel_uploads
+        self.connections = connections
+        self.token_pool = token_pool
+
+        self.recorder = LatencyRecorder()
+        self.flow_recorder = LatencyRecorder()
+        self.bytes_uploaded = 0
+        self.uploads = 0
+        self.failed_listings = 0
+        self.upload_busy = 0.0
+
+    async def _put(self, client: AsyncRentMyVroomAPITester, image: MappedImage,
+                   upload_url: str) -> bool:
+        # An explicit Content-Length keeps aiohttp from falling back to chunked encoding,
+        # which presigned S3/R2 PUTs reject
+        headers = {"Content-Type": image.content_type, "Content-Length": str(image.size)}
+        started = time.perf_counter()
+        status = None
+        try:
+            async with client.session.put(upload_url, data=image.chunks(),
+                                          headers=headers) as response:
+                await response.read()
+                status = response.status
+        except (aiohttp.ClientError, asyncio.TimeoutError):
+            pass
+        elapsed = time.perf_counter() - started
+        self.recorder.record_route("PUT <uploadUrl>", status, int(elapsed * 1_000_000),
+                                   image.size, 0)
+        if status is not None and 200 <= status < 300:
+            self.uploads += 1
+            self.bytes_uploaded += image.size
+            self.upload_busy += elapsed
+            return True
+        return False
+
+    async def _upload_photo(self, client: AsyncRentMyVroomAPITester, image: MappedImage,
+                            semaphore: asyncio.Semaphore) -> Optional[str]:
+        async with semaphore:
+            response = await client.make_request("POST", "/uploads/presign", {
+                "fileName": image.name, "contentType": image.content_type,
+                "fileType": "vehicle-image",
+            }, token=client.tokens["merchant"])
+            if not client._check("Presign Upload", response, [200, 201]):
+                return None
+            presigned = response.json()
+            if not await self._put(client, image, presigned["uploadUrl"]):
+                client.log_test("Image PUT", False, presigned["key"])
+                return None
+            return presigned["publicUrl"]
+
+    async def add_vehicle(self, client: AsyncRentMyVroomAPITester, listing: int) -> bool:
+        started = time.perf_counter()
+        semaphore = asyncio.Semaphore(self.parallel_uploads)
+        first = listing * self.photos
+        photos = [self.images[(first + i) % len(self.images)] for i in range(self.photos)]
+        urls = await asyncio.gather(*(self._upload_photo(client, image, semaphore)
+                                      for image in photos))
+        success = all(urls)
+        if success:
+            response = await client.make_request("POST", "/vehicles", {
+                "make": "Toyota", "model": "RAV4", "year": 2023, "color": "Grey",
+                "licensePlate": f"UP{client.run_tag}-{listing}", "pricePerHour": 20,
+                "pricePerDay": 120, "seats": 5, "fuelType": "Hybrid",
+                "transmission": "Automatic", "images": urls,
+            }, token=client.tokens["merchant"])
+            success = client._check("Create Listing", response, [200, 201])
+        elapsed = time.perf_counter() - started
+        self.flow_recorder.record_route(f"add-vehicle ({self.photos} photos)",
+                                        200 if success else 0, int(elapsed * 1_000_000),
+                                        sum(image.size for image in photos))
+        return success
+
+    async def _run_merchant(self, session: aiohttp.ClientSession, index: int):
+        client = AsyncRentMyVroomAPITester(session, index, self.base_url,
+                                           recorder=self.recorder, token_pool=self.token_pool)
+        if not await client.test_authentication_system():
+            self.failed_listings += self.listings
+            return
+        for listing in range(self.listings):
+            if client.token_pool is not None:
+                await client.refresh_tokens()
+            if not await self.add_vehicle(client, listing):
+                self.failed_listings += 1
+
+    async def run(self) -> Dict[str, Any]:
+        connector = aiohttp.TCPConnector(limit=self.connections, limit_per_host=0)
+        timeout = aiohttp.ClientTimeout(total=600)
+        async with aiohttp.ClientSession(connector=connector, timeout=timeout) as session:
+            started = time.perf_counter()
+            await asyncio.gather(*(self._run_merchant(session, i) for i in range(self.merchants)))
+            elapsed = time.perf_counter() - started
+        if self.token_pool is not None:
+            self.token_pool.save()
+        return {"elapsed": elapsed}
+
+    def print_summary(self, results: Dict[str, Any]):
+        elapsed = results["elapsed"]
+        listings = self.merchants * self.listings
+        print("\n" + "=" * 60)
+        print("🏁 UPLOAD BENCHMARK SUMMARY")
+        print("=" * 60)
+        print(f"Listings:        {listings - self.failed_listings}/{listings} created "
+              f"({self.photos} photos each, {self.parallel_uploads} in parallel)")
+        print(f"Uploads:         {self.uploads} ({self.bytes_uploaded / 1_048_576:.1f} MB)")
+        print(f"Throughput:      {self.bytes_uploaded / 1_048_576 / elapsed:.1f} MB/s aggregate, "
+              f"{self.bytes_uploaded / 1_048_576 / self.upload_busy if self.upload_busy else 0:.1f}"
+              f" MB/s per PUT")
+        # ru_maxrss is KiB on Linux; it should stay flat however large the photos are
+        print(f"Peak client RSS: {resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024:.1f} MB")
+        self.recorder.print_report(elapsed)
+        print("\nEnd-to-end add-vehicle flow:")
+        self.flow_recorder.print_report(elapsed)
+
+
+async def run_against_stub(benchmark: UploadBenchmark) -> Dict[str, Any]:
+    async with StubBackend() as backend:
+        benchmark.base_url = backend.base_url
+        return await benchmark.run()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rent My Vroom vehicle image upload benchmark")
+    parser.add_argument("images", nargs="*", help="photo files to upload (default: synthetic JPEGs)")
+    parser.add_argument("--base-url", default="http://localhost:4000")
+    parser.add_argument("--merchants", type=int, default=4, help="concurrent merchants")
+    parser.add_argument("--listings", type=int, default=5, help="vehicles listed per merchant")
+    parser.add_argument("--photos", type=int, default=6, help="photos per listing")
+    parser.add_argument("--parallel-uploads", type=int, default=3,
+                        help="photos uploaded at once within a listing")
+    parser.add_argument("--image-size", type=float, default=4.0,
+                        help="MB per synthetic photo when no files are given")
+    parser.add_argument("--chunk-size", type=int, default=256, help="KB per body chunk")
+    parser.add_argument("--connections", type=int, default=100, help="HTTP connection pool size")
+    parser.add_argument("--token-pool", help="pre-authenticated user pool file (see token_pool.py)")
+    parser.add_argument("--stub", action="store_true",
+                        help="upload to an in-process stand-in backend and object store")
+    args = parser.parse_args()
+    if args.stub and args.token_pool:
+        parser.error("--token-pool users do not exist on the stand-in backend")
+
+    scratch = None
+    paths = args.images
+    if not paths:
+        scratch = tempfile.mkdtemp(prefix="rmv-upload-")
+        paths = generate_images(scratch, args.photos, int(args.image_size * 1_048_576))
+    images = [MappedImage(path, args.chunk_size * 1024) for path in paths]
+
+    token_pool = TokenPool(args.token_pool, args.base_url) if args.token_pool else None
+    if token_pool is not None and args.merchants > token_pool.capacity():
+        parser.error(f"--merchants {args.merchants} exceeds the token pool's "
+                     f"{token_pool.capacity()} renter/merchant pairs; top it up with token_pool.py")
+    benchmark = UploadBenchmark(images, args.base_url, args.merchants, args.listings,
+                                args.photos, args.parallel_uploads, args.connections, token_pool)
+    print("🚀 Starting Rent My Vroom Upload Benchmark")
+    print("=" * 60)
+    try:
+        results = asyncio.run(run_against_stub(benchmark) if args.stub else benchmark.run())
+        benchmark.print_summary(results)
+    finally:
+        for image in images:
+            image.close()
+        if scratch:
+            shutil.rmtree(scratch)
+
+
+if __name__ == "__main__":
+    main()
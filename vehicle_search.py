@@ -0,0 +1,684 @@
+#!/usr/bin/env python3
+"""
+Vehicle Search Index for Rent My Vroom
+Inverted indexes with faceted counts, ranked pagination and change-feed updates, benchmarked against GET /vehicles
+"""
+
+import argparse
+import bisect
+import csv
+import json
+import random
+import time
+from collections import OrderedDict
+from typing import Dict, Any, List, Optional, Iterable, Iterator, Sequence, Tuple
+
+import numpy as np
+import requests
+
+from availability_index import to_timestamp
+from latency_stats import LatencyHistogram
+from seed_data import COLUMNS, FEATURES, FUEL_TYPES, MAKES, SeedGenerator
+
+TERM_FIELDS = ("make", "model", "fuelType", "transmission", "seats")
+# Day-rate facet buckets in whole currency units: <50, 50-100, ..., 300+
+PRICE_EDGES = [50, 100, 150, 200, 300]
+SORTS = ("relevance", "price", "-price", "newest")
+
+
+def _price_label(bucket: int) -> str:
+    if bucket == 0:
+        return f"<{PRICE_EDGES[0]}"
+    if bucket == len(PRICE_EDGES):
+        return f"{PRICE_EDGES[-1]}+"
+    return f"{PRICE_EDGES[bucket - 1]}-{PRICE_EDGES[bucket]}"
+
+
+def _merge_sorted(rows: np.ndarray, extra: List[int]) -> np.ndarray:
+    """Insert rows into a sorted posting, skipping ones it holds: one copy, no re-sort"""
+    extra = np.unique(np.array(extra, dtype=np.int32))
+    if len(rows):
+        at = np.searchsorted(rows, extra)
+        extra = extra[rows[np.minimum(at, len(rows) - 1)] != extra]
+    return np.insert(rows, np.searchsorted(rows, extra), extra)
+
+
+class TermIndex:
+    """Dictionary-encoded values of one field and their posting lists
+
+    Postings are sorted int32 row arrays. Rows added since the last rebuild
+    wait in a per-term list that is folded in once it grows, so an update
+    never rewrites a large array. A row that moved to another value stays
+    in its old posting until the next rebuild; queries verify every
+    candidate against the current codes, so stale entries only cost a check.
+    """
+
+    FOLD_AFTER = 256
+
+    def __init__(self, casefold: bool = True):
+        self.casefold = casefold
+        self.code_of: Dict[Any, int] = {}
+        self.values: List[Any] = []
+        self.postings: List[np.ndarray] = []
+        self.pending: List[List[int]] = []
+
+    def _key(self, value: Any) -> Any:
+        return value.casefold() if self.casefold and isinstance(value, str) else value
+
+    def code(self, value: Any) -> int:
+        key = self._key(value)
+        code = self.code_of.get(key)
+        if code is None:
+            code = self.code_of[key] = len(self.values)
+            self.values.append(value)
+            self.postings.append(np.empty(0, dtype=np.int32))
+            self.pending.append([])
+        return code
+
+    def find(self, value: Any) -> Optional[int]:
+        return self.code_of.get(self._key(value))
+
+    def add(self, code: int, row: int):
+        pending = self.pending[code]
+        pending.append(row)
+        if len(pending) >= self.FOLD_AFTER:
+            self.postings[code] = _merge_sorted(self.postings[code], pending)
+            pending.clear()
+
+    def posting(self, code: int) -> np.ndarray:
+        if self.pending[code]:
+            return _merge_sorted(self.postings[code], self.pending[code])
+        return self.postings[code]
+
+    def estimate(self, code: int) -> int:
+        return len(self.postings[code]) + len(self.pending[code])
+
+    def rebuild(self, rows: np.ndarray, codes: np.ndarray):
+        """Postings from scratch for the given live rows and their codes"""
+        order = np.argsort(codes, kind="stable")
+        bounds = np.cumsum(np.bincount(codes, minlength=len(self.values)))
+        sorted_rows = rows[order].astype(np.int32)
+        start = 0
+        for code, end in enumerate(bounds):
+            self.postings[code] = sorted_rows[start:end]
+            self.pending[code] = []
+            start = end
+
+
+class VehicleSearchIndex:
+    """Listings as NumPy columns (doc values) plus inverted indexes for filtering
+
+    A query starts from its most selective condition (a posting list, the
+    union of postings for a multi-value filter, or a slice of the rows
+    sorted by price) and checks the remaining conditions on the columns of
+    just those candidates. Facet counts are bincounts over the matches and
+    a page is a partial sort of them, so the cost follows the size of the
+    result, not the catalog. When even the best condition matches more than
+    1/SCAN_FRACTION of the rows, all conditions run over the whole columns.
+    Facet counts depend only on the filters, not on sort or page, so they
+    are cached per filter signature until the next write; above
+    FACET_SAMPLE matches they are estimated from an evenly strided sample
+    of that many rows and the result says so.
+    """
+
+    SCAN_FRACTION = 8
+    FACET_CACHE_SIZE = 4096
+    FACET_SAMPLE = 65_536
+
+    def __init__(self, capacity: int = 1024):
+        self.size = 0
+        self.row_of: Dict[int, int] = {}
+        self.terms = {field: TermIndex(casefold=field != "seats") for field in TERM_FIELDS}
+        self.features = TermIndex()
+        self._allocate(capacity, 1)
+        self.price_rows = np.empty(0, dtype=np.int32)
+        self.price_sorted = np.empty(0, dtype=np.int64)
+        self.price_pending: List[int] = []
+        self.stale = 0
+        # Bumped by every write; facet counts cached at an older version are stale
+        self.version = 0
+        self._facet_version = 0
+        self._facet_cache: "OrderedDict[tuple, Tuple[Dict[str, Any], bool]]" = OrderedDict()
+
+    def _allocate(self, capacity: int, words: int):
+        def grow(old: Optional[np.ndarray], shape, dtype):
+            new = np.zeros(shape, dtype=dtype)
+            if old is not None:
+                new[tuple(slice(0, n) for n in old.shape)] = old
+            return new
+
+        existing = getattr(self, "ids", None) is not None
+        self.ids = grow(self.ids if existing else None, capacity, np.int64)
+        self.alive = grow(self.alive if existing else None, capacity, bool)
+        self.available = grow(self.available if existing else None, capacity, bool)
+        self.price = grow(self.price if existing else None, capacity, np.int64)
+        self.price_bucket = grow(self.price_bucket if existing else None, capacity, np.int8)
+        self.created = grow(self.created if existing else None, capacity, np.int64)
+        self.codes = {field: grow(self.codes[field] if existing else None, capacity, np.int32)
+                      for field in TERM_FIELDS}
+        self.bits = grow(self.bits if existing else None, (capacity, words), np.uint64)
+
+    def __len__(self) -> int:
+        return int(self.alive[:self.size].sum())
+
+    @classmethod
+    def from_vehicles(cls, vehicles: Iterable[Dict[str, Any]]) -> "VehicleSearchIndex":
+        """Build in one pass, then lay out every posting list at once"""
+        index = cls()
+        for vehicle in vehicles:
+            index._store(vehicle)
+        index.rebuild()
+        return index
+
+    def _store(self, vehicle: Dict[str, Any]) -> Tuple[int, bool]:
+        """Write a listing's columns; returns its row and whether the row is new"""
+        vehicle_id = int(vehicle["id"])
+        self.version += 1
+        row = self.row_of.get(vehicle_id)
+        new = row is None
+        if new:
+            if self.size == len(self.ids):
+                self._allocate(2 * len(self.ids), self.bits.shape[1])
+            row = self.row_of[vehicle_id] = self.size
+            self.size += 1
+        self.ids[row] = vehicle_id
+        self.alive[row] = True
+        self.available[row] = vehicle.get("isAvailable", True) in (True, "t", "true")
+        self.price[row] = int(round(float(vehicle["pricePerDay"]) * 100))
+        self.price_bucket[row] = bisect.bisect_right(PRICE_EDGES, self.price[row] / 100)
+        self.created[row] = int(to_timestamp(vehicle["createdAt"])) if vehicle.get("createdAt") else 0
+        for field in TERM_FIELDS:
+            value = int(vehicle[field]) if field == "seats" else vehicle[field]
+            self.codes[field][row] = self.terms[field].code(value)
+        self.bits[row] = 0
+        for feature in vehicle.get("features") or ():
+            bit = self.features.code(feature)
+            if bit >= 64 * self.bits.shape[1]:
+                self._allocate(len(self.ids), self.bits.shape[1] + 1)
+            self.bits[row, bit // 64] |= np.uint64(1 << (bit % 64))
+        return row, new
+
+    def rebuild(self):
+        """Rewrite all postings and the price order from the columns, dropping stale entries"""
+        rows = np.flatnonzero(self.alive[:self.size])
+        for field, terms in self.terms.items():
+            terms.rebuild(rows, self.codes[field][rows])
+        for bit in range(len(self.features.values)):
+            word, mask = bit // 64, np.uint64(1 << (bit % 64))
+            self.features.postings[bit] = rows[(self.bits[rows, word] & mask) != 0].astype(np.int32)
+            self.features.pending[bit] = []
+        self.price_rows = rows[np.argsort(self.price[rows], kind="stable")].astype(np.int32)
+        self.price_sorted = self.price[self.price_rows]
+        self.price_pending = []
+        self.stale = 0
+
+    # -- change feed --------------------------------------------------------
+
+    def upsert(self, vehicle: Dict[str, Any]):
+        row, new = self._store(vehicle)
+        self.stale += not new
+        for field in TERM_FIELDS:
+            self.terms[field].add(int(self.codes[field][row]), row)
+        for feature in vehicle.get("features") or ():
+            self.features.add(self.features.find(feature), row)
+        self.price_pending.append(row)
+        self._maybe_rebuild()
+
+    def delete(self, vehicle_id: int):
+        row = self.row_of.get(int(vehicle_id))
+        if row is not None and self.alive[row]:
+            self.alive[row] = False
+            self.version += 1
+            self.stale += 1
+            self._maybe_rebuild()
+
+    def _maybe_rebuild(self):
+        # Stale postings and an unsorted price tail slow queries down; start over past a quarter
+        if self.stale + len(self.price_pending) > max(1024, self.size // 4):
+            self.rebuild()
+
+    def apply(self, change: Dict[str, Any]):
+        """One change: {"op": "upsert"|"delete", "vehicle": {...}} or a wal2json v1 message"""
+        if "change" in change:
+            for item in change["change"]:
+                if item.get("table") != "Vehicle":
+                    continue
+                if item["kind"] == "delete":
+                    keys = item["oldkeys"]
+                    self.delete(dict(zip(keys["keynames"], keys["keyvalues"]))["id"])
+                else:
+                    self.upsert(_from_columns(item["columnnames"], item["columnvalues"]))
+        elif change["op"] == "delete":
+            self.delete(change.get("id") or change["vehicle"]["id"])
+        else:
+            self.upsert(change["vehicle"])
+
+    # -- queries ------------------------------------------------------------
+
+    def search(self, filters: Optional[Dict[str, Sequence[Any]]] = None,
+               features: Sequence[str] = (), price_min: Optional[float] = None,
+               price_max: Optional[float] = None, sort: str = "relevance",
+               prefer: Sequence[str] = (), page: int = 1, page_size: int = 20,
+               facets: bool = True, available_only: bool = True) -> Dict[str, Any]:
+        """One page of matching vehicle ids, the total and (optionally) facet counts
+
+        `filters` maps a term field to accepted values (any of them);
+        `features` must all be present; `prefer` features raise relevance.
+        """
+        if sort not in SORTS:
+            raise ValueError(f"Unknown sort: {sort}")
+        conditions = []
+        for field, values in (filters or {}).items():
+            codes = [c for c in (self.terms[field].find(v) for v in values) if c is not None]
+            if not codes:
+                return self._result([], 0, page, page_size, {})
+            conditions.append(("term", field, codes))
+        feature_bits = []
+        for feature in features:
+            bit = self.features.find(feature)
+            if bit is None:
+                return self._result([], 0, page, page_size, {})
+            feature_bits.append(bit)
+        lo = int(round(price_min * 100)) if price_min is not None else None
+        hi = int(round(price_max * 100)) if price_max is not None else None
+
+        candidates = self._candidates(conditions, feature_bits, lo, hi)
+        # A broad query reads whole columns instead: a sequential pass beats gathering by row id
+        rows = slice(0, self.size) if candidates is None else candidates
+        keep = self.alive[rows].copy()
+        if available_only:
+            keep &= self.available[rows]
+        for _, field, codes in conditions:
+            column = self.codes[field][rows]
+            if len(codes) == 1:
+                keep &= column == codes[0]
+            else:
+                accepted = np.zeros(len(self.terms[field].values), dtype=bool)
+                accepted[codes] = True
+                keep &= accepted[column]
+        if feature_bits:
+            for word, mask in self._word_masks(feature_bits).items():
+                keep &= (self.bits[rows, word] & mask) == mask
+        if lo is not None:
+            keep &= self.price[rows] >= lo
+        if hi is not None:
+            keep &= self.price[rows] <= hi
+        matches = np.flatnonzero(keep) if candidates is None else candidates[keep]
+
+        page_rows = self._page(matches, sort, prefer, page, page_size)
+        counts, exact = {}, True
+        if facets:
+            signature = (tuple(sorted((field, tuple(sorted(codes)))
+                                      for _, field, codes in conditions)),
+                         tuple(sorted(feature_bits)), lo, hi, available_only)
+            counts, exact = self._cached_facets(signature, matches)
+        return self._result(self.ids[page_rows].tolist(), len(matches), page, page_size, counts,
+                            exact)
+
+    def _cached_facets(self, signature: tuple,
+                       matches: np.ndarray) -> Tuple[Dict[str, Any], bool]:
+        """Browse traffic repeats the same filters page after page; reuse counts until a write"""
+        cache = self._facet_cache
+        if self._facet_version != self.version:
+            cache.clear()
+            self._facet_version = self.version
+        cached = cache.get(signature)
+        if cached is not None:
+            cache.move_to_end(signature)
+            return cached
+        if len(matches) > self.FACET_SAMPLE:
+            step = -(-len(matches) // self.FACET_SAMPLE)
+            sample = matches[::step]
+            scale = len(matches) / len(sample)
+            cached = ({facet: {value: int(round(n * scale)) for value, n in counts.items()}
+                       for facet, counts in self.facet_counts(sample).items()}, False)
+        else:
+            cached = (self.facet_counts(matches), True)
+        cache[signature] = cached
+        if len(cache) > self.FACET_CACHE_SIZE:
+            cache.popitem(last=False)
+        return cached
+
+    def _candidates(self, conditions, feature_bits, lo, hi) -> Optional[np.ndarray]:
+        """Rows of the most selective condition, or None when a column scan is cheaper"""
+        options = []
+        for _, field, codes in conditions:
+            terms = self.terms[field]
+            options.append((sum(terms.estimate(c) for c in codes),
+                            lambda terms=terms, codes=codes: self._union(terms, codes)))
+        for bit in feature_bits:
+            options.append((self.features.estimate(bit),
+                            lambda bit=bit: self.features.posting(bit)))
+        if lo is not None or hi is not None:
+            first = np.searchsorted(self.price_sorted, lo, "left") if lo is not None else 0
+            last = (np.searchsorted(self.price_sorted, hi, "right") if hi is not None
+                    else len(self.price_sorted))
+            options.append((last - first + len(self.price_pending),
+                            lambda: self._price_slice(first, last)))
+        if not options:
+            return None
+        estimate, fetch = min(options, key=lambda option: option[0])
+        if estimate > self.size // self.SCAN_FRACTION:
+            return None
+        return fetch()
+
+    def _price_slice(self, first: int, last: int) -> np.ndarray:
+        if not self.price_pending:
+            return self.price_rows[first:last]
+        # price_rows is in price order; the merge wants row order to spot rows it already has
+        return _merge_sorted(np.sort(self.price_rows[first:last]), self.price_pending)
+
+    @staticmethod
+    def _union(terms: TermIndex, codes: List[int]) -> np.ndarray:
+        if len(codes) == 1:
+            return terms.posting(codes[0])
+        return np.unique(np.concatenate([terms.posting(code) for code in codes]))
+
+    def _word_masks(self, bits: Iterable[int]) -> Dict[int, np.uint64]:
+        masks: Dict[int, int] = {}
+        for bit in bits:
+            masks[bit // 64] = masks.get(bit // 64, 0) | (1 << (bit % 64))
+        return {word: np.uint64(mask) for word, mask in masks.items()}
+
+    def _page(self, matches: np.ndarray, sort: str, prefer: Sequence[str], page: int,
+              page_size: int) -> np.ndarray:
+        """Rows of the requested page: partial sort of the first page * page_size keys"""
+        if sort == "price":
+            key = self.price[matches]
+        elif sort == "-price":
+            key = -self.price[matches]
+        else:
+            key = -self.created[matches]
+            bits = [b for b in (self.features.find(f) for f in prefer) if b is not None]
+            if sort == "relevance" and bits:
+                score = np.zeros(len(matches), dtype=np.int64)
+                for word, mask in self._word_masks(bits).items():
+                    score += np.bitwise_count(self.bits[matches, word] & mask).astype(np.int64)
+                key = key - (score << 40)
+        start, end = (page - 1) * page_size, page * page_size
+        if start >= len(matches):
+            return matches[:0]
+        if end < len(matches):
+            # Take every row tied with the last kept key, or pages could pick different ties
+            top = np.flatnonzero(key <= np.partition(key, end - 1)[end - 1])
+        else:
+            top = np.arange(len(matches))
+        # Vehicle id breaks ties so pages never overlap
+        ordered = top[np.lexsort((self.ids[matches[top]], key[top]))]
+        return matches[ordered[start:end]]
+
+    def facet_counts(self, rows: np.ndarray) -> Dict[str, Dict[Any, int]]:
+        """Counts per value of every facet over the given rows, most common first"""
+        result = {}
+        for field, terms in self.terms.items():
+            counts = np.bincount(self.codes[field][rows], minlength=len(terms.values))
+            result[field] = {terms.values[code]: int(counts[code])
+                             for code in np.argsort(-counts, kind="stable") if counts[code]}
+        buckets = np.bincount(self.price_bucket[rows], minlength=len(PRICE_EDGES) + 1)
+        result["priceRange"] = {_price_label(b): int(n) for b, n in enumerate(buckets) if n}
+        result["features"] = self._feature_counts(rows)
+        return result
+
+    def _feature_counts(self, rows: np.ndarray) -> Dict[str, int]:
+        # One 256-bin histogram per byte of the bitset instead of one pass per feature
+        counts = np.zeros(64 * self.bits.shape[1], dtype=np.int64)
+        as_bytes = self.bits[rows].view(np.uint8).reshape(len(rows), 8 * self.bits.shape[1])
+        for byte in range((len(self.features.values) + 7) // 8):
+            histogram = np.bincount(as_bytes[:, byte], minlength=256)
+            counts[byte * 8:byte * 8 + 8] = histogram @ _BYTE_BITS
+        names = self.features.values
+        return {names[bit]: int(counts[bit]) for bit in np.argsort(-counts, kind="stable")
+                if bit < len(names) and counts[bit]}
+
+    @staticmethod
+    def _result(ids: List[int], total: int, page: int, page_size: int,
+                facets: Dict[str, Any], facets_exact: bool = True) -> Dict[str, Any]:
+        return {"ids": ids, "total": total, "page": page, "pageSize": page_size,
+                "facets": facets, "facetsExact": facets_exact}
+
+
+# _BYTE_BITS[value, bit] = 1 when that bit of the byte is set (little-endian words)
+_BYTE_BITS = ((np.arange(256)[:, None] >> np.arange(8)) & 1).astype(np.int64)
+
+
+def _from_columns(names: Sequence[str], values: Sequence[Any]) -> Dict[str, Any]:
+    vehicle = dict(zip(names, values))
+    features = vehicle.get("features")
+    if isinstance(features, str):
+        vehicle["features"] = _parse_pg_array(features)
+    return vehicle
+
+
+def _parse_pg_array(text: str) -> List[str]:
+    """Postgres text[] literal, e.g. {AC,"Heated Seats"}"""
+    inner = text.strip()[1:-1]
+    if not inner:
+        return []
+    return next(csv.reader([inner], escapechar="\\"))
+
+
+def load_vehicles(source: str) -> Iterator[Dict[str, Any]]:
+    """Vehicles from a seed_data.py Vehicle.copy file, a JSON array, or a running backend"""
+    if source.startswith("http"):
+        response = requests.get(f"{source}/vehicles", timeout=300)
+        response.raise_for_status()
+        yield from response.json()
+    elif source.endswith(".copy"):
+        with open(source, encoding="utf-8") as f:
+            for line in f:
+                yield _from_columns(COLUMNS["Vehicle"], line.rstrip("\n").split("\t"))
+    else:
+        with open(source, encoding="utf-8") as f:
+            yield from json.load(f)
+
+
+def seed_vehicles(count: int, seed: int = 42) -> Iterator[Dict[str, Any]]:
+    """seed_data.py's vehicle distribution, in memory"""
+    generator = SeedGenerator(merchants=max(1, count // 50), renters=0, vehicles=count,
+                              bookings=0, messages=0, seed=seed)
+    for row in generator.vehicle_rows():
+        yield dict(zip(COLUMNS["Vehicle"], row))
+
+
+def full_scan(vehicles: List[Dict[str, Any]], filters: Dict[str, Sequence[Any]],
+              features: Sequence[str], price_min: Optional[float], price_max: Optional[float],
+              page: int, page_size: int) -> Dict[str, Any]:
+    """What a client of GET /vehicles does today: filter, sort and page the whole list"""
+    wanted = {field: {str(v).casefold() for v in values} for field, values in filters.items()}
+    matches = []
+    for vehicle in vehicles:
+        if not vehicle.get("isAvailable", True):
+            continue
+        if any(str(vehicle[field]).casefold() not in values for field, values in wanted.items()):
+            continue
+        if features and not set(features) <= set(vehicle.get("features") or ()):
+            continue
+        price = float(vehicle["pricePerDay"])
+        if (price_min is not None and price < price_min) or (price_max is not None and price > price_max):
+            continue
+        matches.append(vehicle)
+    matches.sort(key=lambda v: float(v["pricePerDay"]))
+    start = (page - 1) * page_size
+    return {"ids": [v["id"] for v in matches[start:start + page_size]], "total": len(matches)}
+
+
+def random_query(rng: random.Random) -> Dict[str, Any]:
+    """A browse-screen query: a couple of filters, sometimes a price range, a sort and a page"""
+    make = rng.choice(list(MAKES))
+    filters = {}
+    roll = rng.random()
+    if roll < 0.4:
+        filters["make"] = [make]
+    elif roll < 0.6:
+        filters["model"] = [rng.choice(MAKES[make])]
+    if rng.random() < 0.3:
+        filters["fuelType"] = rng.sample(FUEL_TYPES, rng.randint(1, 2))
+    if rng.random() < 0.2:
+        filters["seats"] = [rng.choice([4, 5, 7])]
+    query = {"filters": filters, "features": rng.sample(FEATURES, rng.choice([0, 0, 1, 2])),
+             "page": rng.randint(1, 5), "page_size": 20}
+    if rng.random() < 0.4:
+        low = rng.choice([30, 60, 100, 150])
+        query["price_min"], query["price_max"] = low, low + rng.choice([40, 80, 150])
+    return query
+
+
+def benchmark(vehicles: List[Dict[str, Any]], queries: int, scans: int, updates: int,
+              seed: int = 42):
+    """Build, query with and without facets, stream updates, and compare with a full scan"""
+    started = time.perf_counter()
+    index = VehicleSearchIndex.from_vehicles(vehicles)
+    print(f"Indexed {len(index):,} vehicles in {time.perf_counter() - started:.2f}s")
+
+    rng = random.Random(seed)
+    mix = [random_query(rng) for _ in range(queries)]
+    timings = {"query + facets": LatencyHistogram(), "query only": LatencyHistogram(),
+               "unfiltered + facets": LatencyHistogram()}
+    for query in mix:
+        for name, facets in (("query + facets", True), ("query only", False)):
+            t0 = time.perf_counter()
+            index.search(sort="price", facets=facets, **query)
+            timings[name].record(int((time.perf_counter() - t0) * 1_000_000))
+    for _ in range(max(1, queries // 20)):
+        t0 = time.perf_counter()
+        index.search(sort="newest", page=rng.randint(1, 50))
+        timings["unfiltered + facets"].record(int((time.perf_counter() - t0) * 1_000_000))
+
+    scan_times = LatencyHistogram()
+    for query in mix[:scans]:
+        t0 = time.perf_counter()
+        expected = full_scan(vehicles, query["filters"], query["features"],
+                             query.get("price_min"), query.get("price_max"),
+                             query["page"], query["page_size"])
+        scan_times.record(int((time.perf_counter() - t0) * 1_000_000))
+        got = index.search(sort="price", facets=False, **query)
+        assert got["total"] == expected["total"], (query, got["total"], expected["total"])
+    timings["full scan (client)"] = scan_times
+
+    update_times = LatencyHistogram()
+    latest = {v["id"]: v for v in vehicles}
+    next_id = max(latest) + 1
+    for n in range(updates):
+        vehicle = dict(rng.choice(vehicles))
+        if n % 10 == 9:
+            change = {"op": "delete", "id": vehicle["id"]}
+            latest.pop(vehicle["id"], None)
+        else:
+            if n % 3 == 0:
+                vehicle["id"], next_id = next_id, next_id + 1
+            vehicle["pricePerDay"] = str(rng.randint(30, 300))
+            vehicle["fuelType"] = rng.choice(FUEL_TYPES)
+            change = {"op": "upsert", "vehicle": vehicle}
+            latest[vehicle["id"]] = vehicle
+        t0 = time.perf_counter()
+        index.apply(change)
+        update_times.record(int((time.perf_counter() - t0) * 1_000_000))
+    timings["change feed apply"] = update_times
+
+    current = list(latest.values())
+    for query in mix[:scans]:
+        expected = full_scan(current, query["filters"], query["features"],
+                             query.get("price_min"), query.get("price_max"),
+                             query["page"], query["page_size"])
+        got = index.search(sort="price", facets=False, **query)
+        assert got["total"] == expected["total"], (query, got["total"], expected["total"])
+
+    print(f"{'operation':<24} {'n':>7} {'p50 ms':>9} {'p99 ms':>9} {'max ms':>9}")
+    for name, h in timings.items():
+        print(f"{name:<24} {h.count:>7} {h.percentile(50) / 1000:>9.2f} "
+              f"{h.percentile(99) / 1000:>9.2f} {h.max / 1000:>9.2f}")
+
+
+def benchmark_endpoint(base_url: str, queries: int, seed: int = 42):
+    """Time today's path (GET /vehicles, then a client-side scan) against the index"""
+    rng = random.Random(seed)
+    fetch_times, scan_times, index_times = (LatencyHistogram() for _ in range(3))
+    vehicles: List[Dict[str, Any]] = []
+    size = 0
+    for _ in range(queries):
+        t0 = time.perf_counter()
+        response = requests.get(f"{base_url}/vehicles", params={"isAvailable": "true"}, timeout=300)
+        response.raise_for_status()
+        vehicles = response.json()
+        fetch_times.record(int((time.perf_counter() - t0) * 1_000_000))
+        size = len(response.content)
+        query = random_query(rng)
+        t0 = time.perf_counter()
+        full_scan(vehicles, query["filters"], query["features"], query.get("price_min"),
+                  query.get("price_max"), query["page"], query["page_size"])
+        scan_times.record(int((time.perf_counter() - t0) * 1_000_000))
+
+    index = VehicleSearchIndex.from_vehicles(vehicles)
+    for _ in range(queries * 10):
+        t0 = time.perf_counter()
+        index.search(sort="price", **random_query(rng))
+        index_times.record(int((time.perf_counter() - t0) * 1_000_000))
+    print(f"GET /vehicles returned {len(vehicles):,} listings ({size / 1_048_576:.1f} MB)")
+    for name, h in (("GET /vehicles", fetch_times), ("client-side scan", scan_times),
+                    ("index query + facets", index_times)):
+        print(f"{name:<24} n={h.count:<6} p50 {h.percentile(50) / 1000:.2f} ms  "
+              f"p99 {h.percentile(99) / 1000:.2f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Vehicle search index with faceted filtering")
+    sub = parser.add_subparsers(dest="command", required=True)
+    search = sub.add_parser("search", help="run one query and print the page and facets")
+    search.add_argument("source", help="Vehicle.copy, a JSON array of vehicles or a backend URL")
+    for field in TERM_FIELDS:
+        search.add_argument(f"--{field}", action="append", help=f"accepted {field} (repeatable)")
+    search.add_argument("--feature", action="append", default=[], help="required feature")
+    search.add_argument("--prefer", action="append", default=[], help="feature that ranks higher")
+    search.add_argument("--price-min", type=float)
+    search.add_argument("--price-max", type=float)
+    search.add_argument("--sort", choices=SORTS, default="relevance")
+    search.add_argument("--page", type=int, default=1)
+    search.add_argument("--page-size", type=int, default=20)
+    search.add_argument("--changes", help="JSON lines change feed to apply before querying")
+    bench = sub.add_parser("bench", help="index vs full scan over seed_data.py listings")
+    bench.add_argument("--vehicles", type=int, default=1_000_000)
+    bench.add_argument("--source", help="load listings from here instead of generating them")
+    bench.add_argument("--queries", type=int, default=2_000)
+    bench.add_argument("--scans", type=int, default=20, help="queries also run as a full scan")
+    bench.add_argument("--updates", type=int, default=10_000, help="change-feed upserts to apply")
+    bench.add_argument("--seed", type=int, default=42)
+    endpoint = sub.add_parser("endpoint", help="index vs GET /vehicles on a running backend")
+    endpoint.add_argument("--base-url", default="http://localhost:4000")
+    endpoint.add_argument("--queries", type=int, default=20)
+    endpoint.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    if args.command == "bench":
+        started = time.perf_counter()
+        source = load_vehicles(args.source) if args.source else seed_vehicles(args.vehicles, args.seed)
+        vehicles = list(source)
+        print(f"Loaded {len(vehicles):,} listings in {time.perf_counter() - started:.1f}s")
+        benchmark(vehicles, args.queries, args.scans, args.updates, args.seed)
+        return
+    if args.command == "endpoint":
+        benchmark_endpoint(args.base_url, args.queries, args.seed)
+        return
+
+    index = VehicleSearchIndex.from_vehicles(load_vehicles(args.source))
+    if args.changes:
+        with open(args.changes, encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    index.apply(json.loads(line))
+    filters = {field: ([int(v) for v in values] if field == "seats" else values)
+               for field in TERM_FIELDS if (values := getattr(args, field))}
+    started = time.perf_counter()
+    result = index.search(filters, args.feature, args.price_min, args.price_max, args.sort,
+                          args.prefer, args.page, args.page_size)
+    elapsed = time.perf_counter() - started
+    print(f"{result['total']:,} matches in {elapsed * 1000:.2f} ms; "
+          f"page {result['page']}: {result['ids']}")
+    if not result["facetsExact"]:
+        print(f"   facet counts estimated from a {VehicleSearchIndex.FACET_SAMPLE:,}-row sample")
+    for facet, counts in result["facets"].items():
+        print(f"   {facet:<13} " + ", ".join(f"{value} {count}"
+                                             for value, count in list(counts.items())[:8]))
+
+
+if __name__ == "__main__":
+    main()